@@ -1,21 +1,42 @@
 import argparse
+import sys
+from typing import List
 
 from sacrerouge.common import Registrable
+from sacrerouge.common.registry_manifest import get_registered_module
 from sacrerouge.common.util import import_module_and_submodules
-from sacrerouge.commands import RootSubcommand, metric_command
+from sacrerouge.commands import RootSubcommand
 
 
-def build_argument_parser():
-    # Ensure all of the subcommands have been loaded
-    import_module_and_submodules('sacrerouge')
+def build_argument_parser(argv: List[str] = None) -> argparse.ArgumentParser:
+    """
+    Builds the command line parser. If the command in ``argv`` (by default, the program's arguments) is a root
+    command or a metric, only the module which registers it is imported, so running a command does not pay for
+    importing every metric and dataset and their dependencies. Otherwise, all of the commands are added.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if len(argv) > 0 and not argv[0].startswith('-') else None
 
     parser = argparse.ArgumentParser()
     subparsers = parser.add_subparsers()
 
+    if command is not None and get_registered_module('RootSubcommand', command) is not None:
+        RootSubcommand.by_name(command)().add_subparser(subparsers)
+        return parser
+
+    from sacrerouge.commands import metric_command
+    from sacrerouge.metrics import Metric
+    if command is not None and command in Registrable._registry[Metric]:
+        metric_command.MetricSubcommand(command, Metric.by_name(command)).add_subparser(subparsers)
+        return parser
+
+    # Ensure all of the subcommands have been loaded
+    import_module_and_submodules('sacrerouge')
+
     # Add all of the root-level commands using the registry
     for name, (cls_, _) in sorted(Registrable._registry[RootSubcommand].items()):
         cls_().add_subparser(subparsers)
 
     # Add a command for each individual metric
     metric_command.add_metric_subcommands(subparsers)
-    return parser
\ No newline at end of file
+    return parser
@@ -0,0 +1,371 @@
+import argparse
+import functools
+import json
+import logging
+import numpy as np
+import os
+import time
+import tracemalloc
+from overrides import overrides
+from scipy.stats import kendalltau, pearsonr, spearmanr
+from typing import Any, Callable, Dict, List, Tuple
+
+from sacrerouge.commands import RootSubcommand
+from sacrerouge.common.logging import prepare_global_logging
+from sacrerouge.common.preprocessing_cache import PREPROCESSING_CACHE
+from sacrerouge.data import Metrics, MetricsDict
+from sacrerouge.data.pyramid import Contributor, Pyramid, PyramidAnnotation, SCU, SCUAnnotation
+from sacrerouge.metrics import ChrF, PyramidScore, PythonRouge, SentBleu
+from sacrerouge.stats import bootstrap_both_sample, bootstrap_ci, convert_to_matrices, permutation_diff_test, \
+    permute_both, summary_level_corr
+
+logger = logging.getLogger(__name__)
+
+# A benchmark takes the dataset sizes and a random number generator, prepares its inputs, and returns the number of
+# items which are processed and a function which processes them. Only the function is timed
+Benchmark = Callable[[argparse.Namespace, np.random.RandomState], Tuple[int, Callable[[], Any]]]
+
+
+def generate_texts(num_texts: int, length: int, random_state: np.random.RandomState,
+                   vocab_size: int = 5000, sentence_length: int = 20) -> List[List[str]]:
+    """
+    Generates ``num_texts`` synthetic texts of ``length`` tokens, split into sentences of ``sentence_length`` tokens.
+    The tokens follow a Zipfian distribution over ``vocab_size`` types so that the n-gram overlaps between the texts
+    are similar to natural language.
+    """
+    probabilities = 1.0 / np.arange(1, vocab_size + 1)
+    probabilities /= probabilities.sum()
+    token_ids = random_state.choice(vocab_size, size=(num_texts, length), p=probabilities)
+
+    texts = []
+    for ids in token_ids:
+        tokens = [f'w{token_id}' for token_id in ids]
+        texts.append([' '.join(tokens[i:i + sentence_length]) for i in range(0, length, sentence_length)])
+    return texts
+
+
+def generate_summaries(args: argparse.Namespace,
+                       random_state: np.random.RandomState) -> Tuple[List[List[List[str]]], List[List[List[str]]]]:
+    """Generates the summaries of every system and the references for every input."""
+    num_texts = args.num_systems + args.num_references
+    summaries_list, references_list = [], []
+    for _ in range(args.num_inputs):
+        texts = generate_texts(num_texts, args.summary_length, random_state)
+        summaries_list.append(texts[:args.num_systems])
+        references_list.append(texts[args.num_systems:])
+    return summaries_list, references_list
+
+
+def generate_pyramids(args: argparse.Namespace,
+                      random_state: np.random.RandomState) -> Tuple[List[List[PyramidAnnotation]], List[Pyramid]]:
+    """
+    Generates a pyramid from the references for every input and an annotation of every system's summary. Each
+    reference contributes to about half of the SCUs and each summary contains about a third of them.
+    """
+    num_scus = max(args.summary_length // 5, 1)
+    annotations_list, pyramids = [], []
+    for i in range(args.num_inputs):
+        instance_id = str(i)
+        scus = []
+        for scu_id in range(num_scus):
+            summary_indices = [j for j in range(args.num_references) if random_state.rand() < 0.5] or [0]
+            contributors = [Contributor(j, f'contributor {j}', []) for j in summary_indices]
+            scus.append(SCU(scu_id, f'SCU {scu_id}', contributors))
+        summarizer_ids = [f'reference-{j}' for j in range(args.num_references)]
+        pyramids.append(Pyramid(instance_id, [''] * args.num_references, summarizer_ids, scus))
+
+        annotations = []
+        for j in range(args.num_systems):
+            scu_ids = [scu_id for scu_id in range(num_scus) if random_state.rand() < 1 / 3]
+            scu_annotations = [SCUAnnotation(scu_id, f'SCU {scu_id}', []) for scu_id in scu_ids]
+            annotations.append(PyramidAnnotation(instance_id, f'system-{j}', 'peer', '', scu_annotations))
+        annotations_list.append(annotations)
+    return annotations_list, pyramids
+
+
+def generate_metrics_list(args: argparse.Namespace,
+                          random_state: np.random.RandomState,
+                          metric_names: List[str]) -> List[Metrics]:
+    """Generates correlated scores for every system and input for each name in ``metric_names``."""
+    quality = random_state.rand(args.num_systems, args.num_inputs)
+    metrics_list = []
+    for i in range(args.num_systems):
+        for j in range(args.num_inputs):
+            metrics = MetricsDict({name: quality[i, j] + random_state.rand() for name in metric_names})
+            metrics_list.append(Metrics(str(j), f'system-{i}', 'peer', metrics))
+    return metrics_list
+
+
+def _benchmark_metric(metric: Any, args: argparse.Namespace, random_state: np.random.RandomState):
+    summaries_list, references_list = generate_summaries(args, random_state)
+
+    def run():
+        # The preprocessed texts would otherwise be shared between the repetitions
+        PREPROCESSING_CACHE.clear()
+        metric.score_multi_all(summaries_list, references_list)
+
+    return args.num_systems * args.num_inputs, run
+
+
+def benchmark_python_rouge(args: argparse.Namespace, random_state: np.random.RandomState):
+    return _benchmark_metric(PythonRouge(compute_rouge_l=True), args, random_state)
+
+
+def benchmark_sent_bleu(args: argparse.Namespace, random_state: np.random.RandomState):
+    return _benchmark_metric(SentBleu(), args, random_state)
+
+
+def benchmark_chrf(args: argparse.Namespace, random_state: np.random.RandomState):
+    return _benchmark_metric(ChrF(), args, random_state)
+
+
+def benchmark_pyramid_score(args: argparse.Namespace, random_state: np.random.RandomState):
+    annotations_list, pyramids = generate_pyramids(args, random_state)
+    metric = PyramidScore()
+    return args.num_systems * args.num_inputs, lambda: metric.score_multi_all(annotations_list, pyramids)
+
+
+def benchmark_convert_to_matrices(args: argparse.Namespace, random_state: np.random.RandomState):
+    metric_names = ['metric-1', 'metric-2', 'metric-3']
+    metrics_list = generate_metrics_list(args, random_state, metric_names)
+    return len(metrics_list), lambda: convert_to_matrices(metrics_list, *metric_names)
+
+
+def _get_matrices(args: argparse.Namespace, random_state: np.random.RandomState,
+                  num_matrices: int) -> List[np.ndarray]:
+    metric_names = [f'metric-{i}' for i in range(num_matrices)]
+    return convert_to_matrices(generate_metrics_list(args, random_state, metric_names), *metric_names)
+
+
+def benchmark_summary_level_corr(args: argparse.Namespace, random_state: np.random.RandomState):
+    X, Y = _get_matrices(args, random_state, 2)
+
+    def run():
+        for corr_func in [pearsonr, spearmanr, kendalltau]:
+            summary_level_corr(corr_func, X, Y)
+
+    # Each item is one input's correlation
+    return 3 * args.num_inputs, run
+
+
+def benchmark_bootstrap_ci(args: argparse.Namespace, random_state: np.random.RandomState):
+    X, Y = _get_matrices(args, random_state, 2)
+    corr_func = functools.partial(summary_level_corr, pearsonr)
+    return args.num_samples, lambda: bootstrap_ci(corr_func, X, Y, bootstrap_both_sample, num_samples=args.num_samples)
+
+
+def benchmark_permutation_diff_test(args: argparse.Namespace, random_state: np.random.RandomState):
+    X, Y, Z = _get_matrices(args, random_state, 3)
+    corr_func = functools.partial(summary_level_corr, pearsonr)
+    return args.num_samples, lambda: permutation_diff_test(corr_func, X, Y, Z, permute_both, False,
+                                                           num_permutations=args.num_samples)
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    'python-rouge': benchmark_python_rouge,
+    'sent-bleu': benchmark_sent_bleu,
+    'chrf': benchmark_chrf,
+    'pyramid-score': benchmark_pyramid_score,
+    'convert-to-matrices': benchmark_convert_to_matrices,
+    'summary-level-corr': benchmark_summary_level_corr,
+    'bootstrap-ci': benchmark_bootstrap_ci,
+    'permutation-diff-test': benchmark_permutation_diff_test,
+}
+
+
+def run_benchmark(benchmark: Benchmark, args: argparse.Namespace) -> Dict[str, float]:
+    """
+    Runs ``benchmark`` ``args.num_repeats`` times and returns the fastest wall time, the number of items per
+    second for that time, and the peak memory allocated by one run. The memory is measured in a separate run
+    because tracing the allocations slows the code down.
+    """
+    num_items, run = benchmark(args, np.random.RandomState(args.seed))
+
+    times = []
+    for _ in range(args.num_repeats):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best_time = min(times)
+    return {
+        'num_items': num_items,
+        'wall_time': best_time,
+        'mean_wall_time': sum(times) / len(times),
+        'items_per_second': num_items / best_time if best_time > 0 else float('inf'),
+        'peak_memory_mb': peak_memory / (1024 * 1024)
+    }
+
+
+def compare_to_baseline(output: Dict[str, Any],
+                        baseline: Dict[str, Any],
+                        tolerance: float) -> Dict[str, Dict[str, float]]:
+    """
+    Compares the throughput of each benchmark in ``output`` to the ``baseline`` and returns the ratios for the
+    benchmarks which process fewer than ``1 - tolerance`` times as many items per second. Both are the output
+    of the benchmark command, which must have been run with the same configuration. Benchmarks which are not
+    in the baseline or which processed a different number of items are skipped.
+    """
+    if output['config'] != baseline.get('config'):
+        raise Exception(f'The baseline was run with a different configuration. '
+                        f'Expected {output["config"]}, found {baseline.get("config")}')
+
+    regressions = {}
+    for name, result in output['results'].items():
+        if name not in baseline['results']:
+            continue
+        baseline_result = baseline['results'][name]
+        if baseline_result['num_items'] != result['num_items']:
+            logger.warning(f'Skipping the comparison of "{name}" to the baseline because the number of items differs')
+            continue
+
+        ratio = result['items_per_second'] / baseline_result['items_per_second']
+        if ratio < 1.0 - tolerance:
+            regressions[name] = {
+                'items_per_second': result['items_per_second'],
+                'baseline_items_per_second': baseline_result['items_per_second'],
+                'ratio': ratio
+            }
+    return regressions
+
+
+@RootSubcommand.register('benchmark')
+class BenchmarkSubcommand(RootSubcommand):
+    @overrides
+    def add_subparser(self, parser: argparse._SubParsersAction):
+        description = 'Measure the throughput and memory of the metrics and statistics on synthetic data'
+        self.parser = parser.add_parser('benchmark', description=description, help=description)
+        self.parser.add_argument(
+            '--benchmarks',
+            nargs='+',
+            choices=list(BENCHMARKS.keys()),
+            default=list(BENCHMARKS.keys()),
+            help='The benchmarks to run. All of them are run by default'
+        )
+        self.parser.add_argument(
+            '--num-systems',
+            type=int,
+            default=10,
+            help='The number of systems in the synthetic dataset'
+        )
+        self.parser.add_argument(
+            '--num-inputs',
+            type=int,
+            default=50,
+            help='The number of inputs in the synthetic dataset'
+        )
+        self.parser.add_argument(
+            '--num-references',
+            type=int,
+            default=4,
+            help='The number of references for each input'
+        )
+        self.parser.add_argument(
+            '--summary-length',
+            type=int,
+            default=100,
+            help='The number of tokens in each summary and reference'
+        )
+        self.parser.add_argument(
+            '--num-samples',
+            type=int,
+            default=1000,
+            help='The number of bootstrap samples or permutations'
+        )
+        self.parser.add_argument(
+            '--num-repeats',
+            type=int,
+            default=3,
+            help='The number of times each benchmark is timed. The fastest time is reported'
+        )
+        self.parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='The random seed for the synthetic dataset'
+        )
+        self.parser.add_argument(
+            '--output-file',
+            type=str,
+            help='The json file where the results should be written. It can be used as a baseline for later runs'
+        )
+        self.parser.add_argument(
+            '--baseline',
+            type=str,
+            help='The json file with the results of an earlier run to compare to. It must have been run with the '
+                 'same dataset sizes and seed'
+        )
+        self.parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.1,
+            help='The fraction by which the throughput can be lower than the baseline before it is a regression'
+        )
+        self.parser.add_argument(
+            '--fail-on-regression',
+            action='store_true',
+            help='If provided, the command fails if any benchmark is slower than the baseline'
+        )
+        self.parser.add_argument(
+            '--log-file',
+            type=str,
+            help='The file where the log should be written'
+        )
+        self.parser.add_argument(
+            '--silent',
+            action='store_true',
+            help='Controls whether the log should be written to stdout'
+        )
+        self.parser.set_defaults(func=self.run)
+
+    def run(self, args):
+        prepare_global_logging(file_path=args.log_file, silent=args.silent)
+        if args.num_repeats < 1:
+            raise Exception(f'The number of repeats must be positive: {args.num_repeats}')
+
+        results = {}
+        for name in args.benchmarks:
+            results[name] = run_benchmark(BENCHMARKS[name], args)
+            logger.info(f'{name}: {results[name]["items_per_second"]:.1f} items/sec, '
+                        f'{results[name]["peak_memory_mb"]:.1f} MB')
+
+        output = {
+            'config': {
+                'num_systems': args.num_systems,
+                'num_inputs': args.num_inputs,
+                'num_references': args.num_references,
+                'summary_length': args.summary_length,
+                'num_samples': args.num_samples,
+                'seed': args.seed
+            },
+            'results': results
+        }
+
+        regressions = {}
+        if args.baseline is not None:
+            with open(args.baseline, 'r') as f:
+                baseline = json.load(f)
+            regressions = compare_to_baseline(output, baseline, args.tolerance)
+            for name, regression in regressions.items():
+                logger.warning(f'{name} is {(1 - regression["ratio"]) * 100:.1f}% slower than the baseline')
+            output['regressions'] = regressions
+
+        if args.output_file:
+            dirname = os.path.dirname(args.output_file)
+            if dirname:
+                os.makedirs(dirname, exist_ok=True)
+            with open(args.output_file, 'w') as out:
+                out.write(json.dumps(output, indent=2))
+
+        if not args.silent:
+            logger.info(json.dumps(output, indent=2))
+
+        if args.fail_on_regression and len(regressions) > 0:
+            raise Exception(f'The benchmarks {sorted(regressions.keys())} are slower than the baseline')
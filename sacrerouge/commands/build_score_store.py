@@ -0,0 +1,46 @@
+import argparse
+import logging
+from overrides import overrides
+
+from sacrerouge.commands import RootSubcommand
+from sacrerouge.common.logging import prepare_global_logging
+from sacrerouge.io import ScoreStore
+
+logger = logging.getLogger(__name__)
+
+
+@RootSubcommand.register('build-score-store')
+class BuildScoreStoreSubcommand(RootSubcommand):
+    @overrides
+    def add_subparser(self, parser: argparse._SubParsersAction):
+        description = 'Convert metrics jsonl files into a columnar score store which the "correlate" and ' \
+                      '"stat-sig-test" commands can load faster than the jsonl files'
+        self.parser = parser.add_parser('build-score-store', description=description, help=description)
+        self.parser.add_argument(
+            '--metrics-jsonl-files',
+            nargs='+',
+            help='The jsonl files with the metric values. If the values are split across multiple files, they can all '
+                 'be passed as arguments.',
+            required=True
+        )
+        self.parser.add_argument(
+            '--output-dir',
+            type=str,
+            help='The directory where the score store should be written',
+            required=True
+        )
+        self.parser.add_argument(
+            '--log-file',
+            type=str,
+            help='The file where the log should be written'
+        )
+        self.parser.add_argument(
+            '--silent',
+            action='store_true',
+            help='Controls whether the log should be written to stdout'
+        )
+        self.parser.set_defaults(func=self.run)
+
+    def run(self, args):
+        prepare_global_logging(file_path=args.log_file, silent=args.silent)
+        ScoreStore.build(args.metrics_jsonl_files, args.output_dir)
@@ -3,7 +3,6 @@ import functools
 import itertools
 import json
 import logging
-import matplotlib.pyplot as plt
 import numpy as np
 import os
 from collections import defaultdict
@@ -14,7 +13,7 @@ from typing import Dict, List, Tuple, Union
 from sacrerouge.commands import RootSubcommand
 from sacrerouge.common.logging import prepare_global_logging
 from sacrerouge.data import Metrics, MetricsDict
-from sacrerouge.io import JsonlReader
+from sacrerouge.io import JsonlReader, ScoreStore
 from sacrerouge.stats import convert_to_matrices, corr_ci, global_corr, summary_level_corr, system_level_corr
 
 logger = logging.getLogger(__name__)
@@ -73,13 +72,51 @@ def filter_metrics(metrics_list: List[Metrics], summarizer_type: str, *metric_na
     return filtered
 
 
+def load_score_matrices(metrics_jsonl_files_or_metrics_list: Union[str, List[str], List[Metrics]],
+                        summarizer_type: str,
+                        *metric_names: str) -> List[np.ndarray]:
+    """
+    Loads the N x M score matrices for `metric_names` (see `convert_to_matrices`) from a single metrics jsonl file,
+    a list of metrics jsonl files, a list of `Metrics`, or the directory of a `ScoreStore`. Only the summaries of
+    type `summarizer_type` which have a score for all of the metrics are used.
+    """
+    if isinstance(metrics_jsonl_files_or_metrics_list, str):
+        metrics_jsonl_files_or_metrics_list = [metrics_jsonl_files_or_metrics_list]
+
+    if isinstance(metrics_jsonl_files_or_metrics_list, list) and all(isinstance(item, str) for item in metrics_jsonl_files_or_metrics_list):
+        stores = [path for path in metrics_jsonl_files_or_metrics_list if ScoreStore.is_score_store(path)]
+        if len(stores) > 0:
+            if len(metrics_jsonl_files_or_metrics_list) > 1:
+                raise Exception(f'A score store must be the only input: {metrics_jsonl_files_or_metrics_list}')
+            logger.info(f'Loading metrics from score store {stores[0]}')
+            return ScoreStore(stores[0]).get_matrices(summarizer_type, *metric_names)
+        metrics_list = load_metrics(metrics_jsonl_files_or_metrics_list)
+    else:
+        # A list of metrics
+        assert isinstance(metrics_jsonl_files_or_metrics_list, list) and all(isinstance(item, Metrics) for item in metrics_jsonl_files_or_metrics_list)
+        metrics_list = metrics_jsonl_files_or_metrics_list
+
+    # Merge duplicate metrics objects into one
+    metrics_list = merge_metrics(metrics_list)
+
+    for metrics in metrics_list:
+        metrics.flatten_keys()
+
+    metrics_list = filter_metrics(metrics_list, summarizer_type, *metric_names)
+    for metrics in metrics_list:
+        metrics.select_metrics(list(metric_names))
+        metrics.average_values()
+
+    return convert_to_matrices(metrics_list, *metric_names)
+
+
 def aggregate_metrics(metrics_list: List[Metrics]) -> Dict[str, MetricsDict]:
     # The instances must be sorted by the key in order to use itertools.groupby
     metrics_list = sorted(metrics_list, key=lambda metrics: metrics.summarizer_id)
     key_to_metrics = {}
     for key, group in itertools.groupby(metrics_list, lambda metrics: metrics.summarizer_id):
         group_metrics = [member.metrics for member in group]
-        key_to_metrics[key] = sum(group_metrics) / len(group_metrics)
+        key_to_metrics[key] = MetricsDict.mean(group_metrics)
     return key_to_metrics
 
 
@@ -251,6 +288,9 @@ def _plot_values(values1: List[float],
                  metric2: str,
                  label: str,
                  output_file: str) -> None:
+    # matplotlib is slow to import and only needed for the plots
+    import matplotlib.pyplot as plt
+
     fig = plt.figure()
     plt.xlabel(metric1)
     plt.ylabel(metric2)
@@ -265,22 +305,25 @@ def _plot_values(values1: List[float],
     plt.close()
 
 
-def _plot_system_level_metrics(metrics_list: List[Metrics],
+def _plot_system_level_metrics(X: np.ndarray,
+                               Y: np.ndarray,
                                metric1: str,
                                metric2: str,
                                output_file: str) -> None:
-    metrics_list = list(aggregate_metrics(metrics_list).values())
-    values1 = [metrics[metric1] for metrics in metrics_list]
-    values2 = [metrics[metric2] for metrics in metrics_list]
+    # Each system's score is its average over the inputs, the same as `aggregate_metrics`
+    values1 = np.nanmean(X, axis=1)
+    values2 = np.nanmean(Y, axis=1)
     _plot_values(values1, values2, metric1, metric2, 'Systems', output_file)
 
 
-def _plot_global_metrics(metrics_list: List[Metrics],
+def _plot_global_metrics(X: np.ndarray,
+                         Y: np.ndarray,
                          metric1: str,
                          metric2: str,
                          output_file: str) -> None:
-    values1 = [metrics.metrics[metric1] for metrics in metrics_list]
-    values2 = [metrics.metrics[metric2] for metrics in metrics_list]
+    mask = ~np.isnan(X)
+    values1 = X[mask]
+    values2 = Y[mask]
     _plot_values(values1, values2, metric1, metric2, 'Summaries', output_file)
 
 
@@ -296,38 +339,19 @@ def compute_correlation(metrics_jsonl_files_or_metrics_list: Union[str, List[str
                         ci_method: str = None,
                         alpha: float = 0.05,
                         two_tailed: bool = True,
-                        ci_kwargs: Dict = None):
+                        ci_kwargs: Dict = None,
+                        num_workers: int = None):
     if system_level_output_plot is not None:
         assert not skip_system_level, 'If `system_level_output_plot` is not `None`, system-level correlations must be calculated'
     if global_output_plot is not None:
         assert not skip_global, 'If `global_output_plot` is not `None`, global correlations must be calculated'
 
     ci_kwargs = ci_kwargs or {}
+    if num_workers is not None and ci_method is not None and ci_method.startswith('bootstrap'):
+        ci_kwargs = dict(ci_kwargs, num_workers=num_workers)
     summary_kwargs, system_kwargs, global_kwargs = _split_level_kwargs(ci_kwargs)
 
-    if isinstance(metrics_jsonl_files_or_metrics_list, str):
-        # A single file
-        metrics_list = load_metrics([metrics_jsonl_files_or_metrics_list])
-    elif isinstance(metrics_jsonl_files_or_metrics_list, list) and all(isinstance(item, str) for item in metrics_jsonl_files_or_metrics_list):
-        # A list of files
-        metrics_list = load_metrics(metrics_jsonl_files_or_metrics_list)
-    else:
-        # A list of metrics
-        assert isinstance(metrics_jsonl_files_or_metrics_list, list) and all(isinstance(item, Metrics) for item in metrics_jsonl_files_or_metrics_list)
-        metrics_list = metrics_jsonl_files_or_metrics_list
-
-    # Merge duplicate metrics objects into one
-    metrics_list = merge_metrics(metrics_list)
-
-    for metrics in metrics_list:
-        metrics.flatten_keys()
-
-    metrics_list = filter_metrics(metrics_list, summarizer_type, metric1, metric2)
-    for metrics in metrics_list:
-        metrics.select_metrics([metric1, metric2])
-        metrics.average_values()
-
-    X, Y = convert_to_matrices(metrics_list, metric1, metric2)
+    X, Y = load_score_matrices(metrics_jsonl_files_or_metrics_list, summarizer_type, metric1, metric2)
 
     results = {
         'metric1': metric1,
@@ -342,13 +366,13 @@ def compute_correlation(metrics_jsonl_files_or_metrics_list: Union[str, List[str
         results['system_level'] = compute_system_level_correlations(X, Y, ci_method=ci_method, alpha=alpha,
                                                                     two_tailed=two_tailed, ci_kwargs=system_kwargs)
         if system_level_output_plot is not None:
-            _plot_system_level_metrics(metrics_list, metric1, metric2, system_level_output_plot)
+            _plot_system_level_metrics(X, Y, metric1, metric2, system_level_output_plot)
 
     if not skip_global:
         results['global'] = compute_global_correlations(X, Y, ci_method=ci_method, alpha=alpha, two_tailed=two_tailed,
                                                         ci_kwargs=global_kwargs)
         if global_output_plot is not None:
-            _plot_global_metrics(metrics_list, metric1, metric2, global_output_plot)
+            _plot_global_metrics(X, Y, metric1, metric2, global_output_plot)
 
     return results
 
@@ -363,7 +387,8 @@ class CorrelateSubcommand(RootSubcommand):
             '--metrics-jsonl-files',
             nargs='+',
             help='The jsonl files with the metric values. If the values are split across multiple files, they can all '
-                 'be passed as arguments.',
+                 'be passed as arguments. A single score store directory created by "build-score-store" can be '
+                 'passed instead.',
             required=True
         )
         self.parser.add_argument(
@@ -403,6 +428,12 @@ class CorrelateSubcommand(RootSubcommand):
             default='{}',
             help='A serialized JSON string that will be parsed and passed as kwargs to the confidence interval calculation'
         )
+        self.parser.add_argument(
+            '--num-workers',
+            type=int,
+            help='The number of processes to use for the bootstrap resampling. If provided, the results are the same '
+                 'for any number of workers, but they will be different from running without this argument'
+        )
         self.parser.add_argument(
             '--output-file',
             type=str,
@@ -461,7 +492,8 @@ class CorrelateSubcommand(RootSubcommand):
                                       ci_method=args.confidence_interval_method,
                                       alpha=alpha,
                                       two_tailed=two_tailed,
-                                      ci_kwargs=ci_kwargs)
+                                      ci_kwargs=ci_kwargs,
+                                      num_workers=args.num_workers)
 
         if args.output_file:
             dirname = os.path.dirname(args.output_file)
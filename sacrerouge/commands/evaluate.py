@@ -3,16 +3,22 @@ import jsons
 import logging
 import os
 from overrides import overrides
-from typing import List, Tuple
+from typing import Any, List, Optional, Tuple
 
 from sacrerouge.commands import RootSubcommand
+from sacrerouge.commands.score import add_cache_arguments, add_parallel_arguments, add_profile_arguments, \
+    get_metric_cache, read_instances
 from sacrerouge.common import Params
 from sacrerouge.common.logging import prepare_global_logging
+from sacrerouge.common.metric_cache import MetricCache
+from sacrerouge.common.metric_scheduler import run_metric_tasks
+from sacrerouge.common.profiler import PROFILER, profile_command
 from sacrerouge.common.util import import_module_and_submodules
 from sacrerouge.data import EvalInstance, Metrics, MetricsDict
 from sacrerouge.data.dataset_readers import DatasetReader
 from sacrerouge.io import JsonlWriter
 from sacrerouge.metrics import Metric
+from sacrerouge.metrics.metric import scores_summaries_independently
 
 logger = logging.getLogger(__name__)
 
@@ -32,24 +38,86 @@ def get_initial_micro_list(instances: List[EvalInstance]) -> List[Metrics]:
     return micro_list
 
 
-def evaluate_instances(instances: List[EvalInstance], metrics: List[Metric]) -> Tuple[MetricsDict, List[Metrics]]:
-    macro = MetricsDict()
-    micro_list = get_initial_micro_list(instances)
+def _evaluate_with_cache(metric: Metric,
+                         summary_args: List[List[Any]],
+                         context_args: List[List[Any]],
+                         cache: MetricCache,
+                         metric_key: str) -> Tuple[MetricsDict, List[MetricsDict]]:
+    if not scores_summaries_independently(metric):
+        # The metric's results cannot be computed one summary at a time, so the whole call is cached
+        key = cache.get_key(metric_key, 'evaluate', *summary_args, *context_args)
+        results = cache.get(key)
+        if results is not None:
+            logger.info(f'Loaded the results from the cache')
+            return MetricsDict(results['macro']), [MetricsDict(micro) for micro in results['micro']]
+
+        macro, micro_list = metric.evaluate(*summary_args, *context_args)
+        cache.put(key, {'macro': macro, 'micro': micro_list})
+        return macro, micro_list
+
+    # These keys are the same as the ones used by "score", so the results are shared between the commands
+    micro_list = [None] * len(summary_args[0])
+    miss_indices, miss_keys = [], []
+    for i in range(len(micro_list)):
+        context_key = cache.get_key(metric_key, *[context_arg[i] for context_arg in context_args])
+        key = cache.get_key(context_key, *[summary_arg[i] for summary_arg in summary_args])
+        results = cache.get(key)
+        if results is None:
+            miss_indices.append(i)
+            miss_keys.append(key)
+        else:
+            micro_list[i] = MetricsDict(results)
+    logger.info(f'Loaded {len(micro_list) - len(miss_indices)} of {len(micro_list)} results from the cache')
+
+    if len(miss_indices) > 0:
+        miss_summary_args = [[summary_arg[i] for i in miss_indices] for summary_arg in summary_args]
+        miss_context_args = [[context_arg[i] for i in miss_indices] for context_arg in context_args]
+        miss_micro_list = metric.score_all(*miss_summary_args, *miss_context_args)
+        for i, key, micro in zip(miss_indices, miss_keys, miss_micro_list):
+            cache.put(key, micro)
+            micro_list[i] = micro
+
+    macro = metric.aggregate(micro_list)
+    return macro, micro_list
+
+
+def _evaluate_metric_task(metric: Metric,
+                          instances: List[EvalInstance],
+                          cache: Optional[MetricCache],
+                          metric_key: Optional[str]) -> Tuple[MetricsDict, List[MetricsDict]]:
+    # Prepare the input arguments
+    summary_args = []
+    for field in metric.required_summary_fields:
+        summary_args.append([instance.fields[field].to_input() for instance in instances])
 
-    for metric in metrics:
-        # Prepare the input arguments
-        summary_args = []
-        for field in metric.required_summary_fields:
-            summary_args.append([instance.fields[field].to_input() for instance in instances])
+    context_args = []
+    for field in metric.required_context_fields:
+        context_args.append([instance.fields[field].to_input() for instance in instances])
 
-        context_args = []
-        for field in metric.required_context_fields:
-            context_args.append([instance.fields[field].to_input() for instance in instances])
+    # Score all the summaries
+    with PROFILER.stage(f'{type(metric).__name__}/evaluate', len(instances)):
+        if cache is None:
+            return metric.evaluate(*summary_args, *context_args)
+        return _evaluate_with_cache(metric, summary_args, context_args, cache, metric_key)
+
+
+def evaluate_instances(instances: List[EvalInstance],
+                       metrics: List[Metric],
+                       cache: MetricCache = None,
+                       metric_keys: List[str] = None,
+                       max_parallel_metrics: int = 1) -> Tuple[MetricsDict, List[Metrics]]:
+    if cache is not None and (metric_keys is None or len(metric_keys) != len(metrics)):
+        raise Exception(f'A metric key must be provided for every metric in order to use the cache')
+    metric_keys = metric_keys or [None] * len(metrics)
+
+    macro = MetricsDict()
+    micro_list = get_initial_micro_list(instances)
 
-        # Score all the summaries
-        this_macro, this_micro_list = metric.evaluate(*summary_args, *context_args)
+    args_list = [(instances, cache, metric_key) for metric_key in metric_keys]
+    results_list = run_metric_tasks(_evaluate_metric_task, metrics, args_list, max_parallel_metrics)
 
-        # Update the global metrics dictionaries
+    # Update the global metrics dictionaries in the order of the metrics
+    for this_macro, this_micro_list in results_list:
         macro.update(this_macro)
         for micro, this_micro in zip(micro_list, this_micro_list):
             micro.metrics.update(this_micro)
@@ -66,15 +134,16 @@ def save_evaluation_results(macro_results: MetricsDict,
     if dirname:
         os.makedirs(dirname, exist_ok=True)
 
-    serialized_macro = jsons.dumps({'metrics': macro_results}, jdkwargs={'indent': 2})
-    with open(macro_output_json, 'w') as out:
-        out.write(serialized_macro)
-    if not silent:
-        logger.info(serialized_macro)
+    with PROFILER.stage('write_results', len(micro_results_list)):
+        serialized_macro = jsons.dumps({'metrics': macro_results}, jdkwargs={'indent': 2})
+        with open(macro_output_json, 'w') as out:
+            out.write(serialized_macro)
+        if not silent:
+            logger.info(serialized_macro)
 
-    with JsonlWriter(micro_output_jsonl) as out:
-        for metrics_dict in micro_results_list:
-            out.write(metrics_dict)
+        with JsonlWriter(micro_output_jsonl) as out:
+            for metrics_dict in micro_results_list:
+                out.write(metrics_dict)
 
 
 def add_evaluate_arguments(parser: argparse.ArgumentParser, include_config_arguments: bool) -> None:
@@ -90,6 +159,7 @@ def add_evaluate_arguments(parser: argparse.ArgumentParser, include_config_argum
             type=str,
             help='A serialized json that will override the parameters passed in "config"'
         )
+        add_parallel_arguments(parser)
 
     parser.add_argument(
         '--macro-output-json',
@@ -118,6 +188,8 @@ def add_evaluate_arguments(parser: argparse.ArgumentParser, include_config_argum
         nargs='+',
         help='A list of additional packages to include'
     )
+    add_cache_arguments(parser)
+    add_profile_arguments(parser)
 
 
 @RootSubcommand.register('evaluate')
@@ -133,20 +205,22 @@ class EvaluateSubcommand(RootSubcommand):
     def run(self, args):
         prepare_global_logging(file_path=args.log_file, silent=args.silent)
 
-        import_module_and_submodules('sacrerouge')
         include_packages = args.include_packages or []
         for package in include_packages:
             import_module_and_submodules(package)
 
         params = Params.from_file(args.config, args.overrides)
         dataset_reader = DatasetReader.from_params(params.pop('dataset_reader'))
+        metric_keys = [MetricCache.get_metric_key(metric_params) for metric_params in params.as_dict(quiet=True)['metrics']]
         metrics = load_metrics(params)
 
         input_files = params.pop('input_files')
         if isinstance(input_files, str):
             input_files = [input_files]
 
-        instances = dataset_reader.read(*input_files)
-        macro, micro_list = evaluate_instances(instances, metrics)
+        with profile_command(args.profile, args.macro_output_json):
+            instances = read_instances(dataset_reader, *input_files)
+            macro, micro_list = evaluate_instances(instances, metrics, cache=get_metric_cache(args),
+                                                   metric_keys=metric_keys, max_parallel_metrics=args.max_parallel_metrics)
 
-        save_evaluation_results(macro, micro_list, args.macro_output_json, args.micro_output_jsonl, args.silent)
+            save_evaluation_results(macro, micro_list, args.macro_output_json, args.micro_output_jsonl, args.silent)
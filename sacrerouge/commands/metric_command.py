@@ -1,13 +1,16 @@
 import argparse
+import inspect
 from overrides import overrides
 from typing import Type
 
 from sacrerouge.commands import Subcommand
 from sacrerouge.commands.evaluate import add_evaluate_arguments, evaluate_instances, save_evaluation_results
-from sacrerouge.commands.score import add_score_arguments, save_score_results, score_instances
+from sacrerouge.commands.score import add_score_arguments, get_metric_cache, read_instances, run_score
 from sacrerouge.common import Registrable
 from sacrerouge.common.arguments import add_metric_arguments, get_dataset_reader_from_argument, get_metric_from_arguments
 from sacrerouge.common.logging import prepare_global_logging
+from sacrerouge.common.metric_cache import MetricCache
+from sacrerouge.common.profiler import profile_command
 from sacrerouge.common.util import import_module_and_submodules
 from sacrerouge.metrics import Metric
 
@@ -60,10 +63,17 @@ class MetricSubcommand(Subcommand):
         add_dataset_reader_arguments(self.score_parser)
         self.score_parser.set_defaults(func=self.run_score)
 
+    def _get_metric_key(self, args: argparse.Namespace) -> str:
+        # The metric is identified by its name and the (unparsed) values of its constructor's arguments
+        metric_params = {'type': self.name}
+        for name in inspect.signature(self.metric_type.__init__).parameters:
+            if name not in ['self', 'args', 'kwargs']:
+                metric_params[name] = getattr(args, name)
+        return MetricCache.get_metric_key(metric_params)
+
     def run_evaluate(self, args: argparse.Namespace) -> None:
         prepare_global_logging(file_path=args.log_file, silent=args.silent)
 
-        import_module_and_submodules('sacrerouge')
         include_packages = args.include_packages or []
         for package in include_packages:
             import_module_and_submodules(package)
@@ -72,15 +82,16 @@ class MetricSubcommand(Subcommand):
         metric = get_metric_from_arguments(self.metric_type, args)
         input_files = args.input_files
 
-        instances = dataset_reader.read(*input_files)
-        macro, micro_list = evaluate_instances(instances, [metric])
+        with profile_command(args.profile, args.macro_output_json):
+            instances = read_instances(dataset_reader, *input_files)
+            macro, micro_list = evaluate_instances(instances, [metric], cache=get_metric_cache(args),
+                                                   metric_keys=[self._get_metric_key(args)])
 
-        save_evaluation_results(macro, micro_list, args.macro_output_json, args.micro_output_jsonl, args.silent)
+            save_evaluation_results(macro, micro_list, args.macro_output_json, args.micro_output_jsonl, args.silent)
 
     def run_score(self, args: argparse.Namespace) -> None:
         prepare_global_logging(file_path=args.log_file, silent=args.silent)
 
-        import_module_and_submodules('sacrerouge')
         include_packages = args.include_packages or []
         for package in include_packages:
             import_module_and_submodules(package)
@@ -89,7 +100,5 @@ class MetricSubcommand(Subcommand):
         metric = get_metric_from_arguments(self.metric_type, args)
         input_files = args.input_files
 
-        instances = dataset_reader.read(*input_files)
-        metrics_dicts = score_instances(instances, [metric], args.disable_peer_jackknifing)
-
-        save_score_results(metrics_dicts, args.output_jsonl, args.silent)
\ No newline at end of file
+        with profile_command(args.profile, args.output_jsonl):
+            run_score(dataset_reader, input_files, [metric], [self._get_metric_key(args)], args)
\ No newline at end of file
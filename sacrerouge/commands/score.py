@@ -1,17 +1,24 @@
 import argparse
+import hashlib
+import json
 import logging
+import os
 from collections import defaultdict
 from overrides import overrides
-from typing import Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from sacrerouge.commands import RootSubcommand
 from sacrerouge.common import Params
 from sacrerouge.common.logging import prepare_global_logging
+from sacrerouge.common.metric_cache import MetricCache
+from sacrerouge.common.metric_scheduler import run_metric_tasks
+from sacrerouge.common.profiler import PROFILER, profile_command
 from sacrerouge.common.util import import_module_and_submodules
-from sacrerouge.data import EvalInstance, Metrics
+from sacrerouge.data import EvalInstance, Metrics, MetricsDict
 from sacrerouge.data.dataset_readers import DatasetReader
-from sacrerouge.io import JsonlWriter
-from sacrerouge.metrics import Metric
+from sacrerouge.data.fields import Fields
+from sacrerouge.io import JsonlReader, JsonlWriter
+from sacrerouge.metrics import Metric, ReferenceBasedMetric
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +36,7 @@ def add_score_arguments(parser: argparse.ArgumentParser, include_config_argument
             type=str,
             help='A serialized json that will override the parameters passed in "config"'
         )
+        add_parallel_arguments(parser)
 
     parser.add_argument(
         '--output-jsonl',
@@ -56,20 +64,206 @@ def add_score_arguments(parser: argparse.ArgumentParser, include_config_argument
         action='store_true',
         help='Disable running jackknifing for peer summaries'
     )
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        help='If provided, the instances are read and scored this many at a time, and the metrics for each chunk '
+             'are written before the next chunk is read. The memory usage then depends on the chunk size instead '
+             'of the size of the dataset. The summaries are only grouped by context and sorted within each chunk'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='If provided, the metrics which are already in "--output-jsonl" are kept and only the summaries '
+             'which are new or whose summary, context, or metric parameters changed are scored. The fingerprints '
+             'of the inputs of each result are saved next to the output file'
+    )
+    add_cache_arguments(parser)
+    add_profile_arguments(parser)
+
+
+def add_parallel_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        '--max-parallel-metrics',
+        type=int,
+        default=1,
+        help='The maximum number of metrics which are run at the same time. Metrics which are implemented in '
+             'pure Python run in separate processes and the others run in threads'
+    )
 
 
-def _load_metrics(params: Params) -> List[Metric]:
+def add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        help='The directory of a persistent cache of the metric results for each summary. Summaries which were '
+             'already scored with the same metric parameters and context are loaded from the cache instead of '
+             'being scored again'
+    )
+    parser.add_argument(
+        '--cache-max-size',
+        type=float,
+        help='The maximum size of the cache directory in megabytes. The least recently used results are removed '
+             'when the cache is larger than this size'
+    )
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='If provided, the wall time, CPU time, peak memory, and number of items of each stage and metric '
+             'are saved to a json file next to the output file with the extension ".profile.json"'
+    )
+
+
+def get_metric_cache(args: argparse.Namespace) -> Optional[MetricCache]:
+    if args.cache_dir is None:
+        return None
+    max_size = int(args.cache_max_size * 1024 * 1024) if args.cache_max_size is not None else None
+    return MetricCache(args.cache_dir, max_size=max_size)
+
+
+def _load_metrics(params: Params) -> Tuple[List[Metric], List[str]]:
     metrics = []
+    metric_keys = []
     for metric_params in params.pop('metrics'):
+        # The key must be computed before `from_params` removes the parameters
+        metric_keys.append(MetricCache.get_metric_key(metric_params.as_dict(quiet=True)))
         metric = Metric.from_params(metric_params)
         metrics.append(metric)
-    return metrics
+    return metrics, metric_keys
+
+
+def _get_input_key(value: Any) -> Any:
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _score_fields_by_reference(metric: ReferenceBasedMetric,
+                               fields_list: List[Fields],
+                               summary_fields_lists: List[List[Fields]]) -> List[List[MetricsDict]]:
+    # The summaries are often scored against many overlapping sets of references (e.g., every leave-one-out set
+    # during jackknifing), so the statistics for each unique (summary, reference) pair are computed once and
+    # then combined for every set of references
+    summary_name = metric.required_summary_fields[0]
+    references_name = metric.required_context_fields[0]
+
+    # The unique summaries and the unique references that each one is compared to
+    summary_to_index = {}
+    summaries = []
+    references_list = []
+    reference_to_index_list = []
+
+    # The index of the summary and its references in `references_list` for every (context, summary) pair
+    locations_list = []
+    for fields, summary_fields_list in zip(fields_list, summary_fields_lists):
+        references = fields[references_name].to_input()
+        reference_keys = [_get_input_key(reference) for reference in references]
+        locations = []
+        for summary_fields in summary_fields_list:
+            summary_field = summary_fields[summary_name]
+            if summary_field not in summary_to_index:
+                summary_to_index[summary_field] = len(summaries)
+                summaries.append(summary_field.to_input())
+                references_list.append([])
+                reference_to_index_list.append({})
+
+            index = summary_to_index[summary_field]
+            reference_to_index = reference_to_index_list[index]
+            reference_indices = []
+            for key, reference in zip(reference_keys, references):
+                if key not in reference_to_index:
+                    reference_to_index[key] = len(references_list[index])
+                    references_list[index].append(reference)
+                reference_indices.append(reference_to_index[key])
+            locations.append((index, reference_indices))
+        locations_list.append(locations)
+
+    name = type(metric).__name__
+    num_pairs = sum(len(references) for references in references_list)
+    with PROFILER.stage(f'{name}/score_reference_statistics_all', num_pairs):
+        statistics_list = metric.score_reference_statistics_all(summaries, references_list)
+
+    with PROFILER.stage(f'{name}/combine_reference_statistics', sum(len(locations) for locations in locations_list)):
+        results_lists = []
+        for locations in locations_list:
+            results_lists.append([])
+            for index, reference_indices in locations:
+                statistics = [statistics_list[index][j] for j in reference_indices]
+                results_lists[-1].append(metric.combine_reference_statistics(statistics))
+    return results_lists
+
+
+def _score_fields(metric: Metric,
+                  fields_list: List[Fields],
+                  summary_fields_lists: List[List[Fields]]) -> List[List[MetricsDict]]:
+    if isinstance(metric, ReferenceBasedMetric) and metric.decomposes_by_reference:
+        return _score_fields_by_reference(metric, fields_list, summary_fields_lists)
+
+    # Construct the arguments that will be passed to the scoring method
+    summary_args = []
+    for name in metric.required_summary_fields:
+        summary_args.append([[summary_fields[name].to_input() for summary_fields in summary_fields_list] for summary_fields_list in summary_fields_lists])
+
+    context_args = []
+    for name in metric.required_context_fields:
+        context_args.append([fields[name].to_input() for fields in fields_list])
+
+    num_summaries = sum(len(summary_fields_list) for summary_fields_list in summary_fields_lists)
+    with PROFILER.stage(f'{type(metric).__name__}/score_multi_all', num_summaries):
+        return metric.score_multi_all(*summary_args, *context_args)
+
+
+def _score_fields_with_cache(metric: Metric,
+                             fields_list: List[Fields],
+                             summary_fields_lists: List[List[Fields]],
+                             cache: MetricCache,
+                             metric_key: str) -> List[List[MetricsDict]]:
+    results_lists = [[None] * len(summary_fields_list) for summary_fields_list in summary_fields_lists]
+
+    # The contexts and summaries which are not in the cache and their (context, summary) indices in `results_lists`
+    miss_fields_list = []
+    miss_summary_fields_lists = []
+    miss_locations_list = []
+
+    num_hits = 0
+    for i, (fields, summary_fields_list) in enumerate(zip(fields_list, summary_fields_lists)):
+        context_key = cache.get_key(metric_key, *[fields[name].to_input() for name in metric.required_context_fields])
+        miss_summary_fields_list = []
+        miss_locations = []
+        for j, summary_fields in enumerate(summary_fields_list):
+            key = cache.get_key(context_key, *[summary_fields[name].to_input() for name in metric.required_summary_fields])
+            results = cache.get(key)
+            if results is None:
+                miss_summary_fields_list.append(summary_fields)
+                miss_locations.append((j, key))
+            else:
+                results_lists[i][j] = MetricsDict(results)
+                num_hits += 1
+
+        if len(miss_summary_fields_list) > 0:
+            miss_fields_list.append(fields)
+            miss_summary_fields_lists.append(miss_summary_fields_list)
+            miss_locations_list.append((i, miss_locations))
+
+    num_total = sum(len(summary_fields_list) for summary_fields_list in summary_fields_lists)
+    logger.info(f'Loaded {num_hits} of {num_total} results from the cache')
+
+    if len(miss_fields_list) > 0:
+        miss_results_lists = _score_fields(metric, miss_fields_list, miss_summary_fields_lists)
+        for (i, miss_locations), miss_results_list in zip(miss_locations_list, miss_results_lists):
+            for (j, key), results in zip(miss_locations, miss_results_list):
+                cache.put(key, results)
+                results_lists[i][j] = results
+    return results_lists
 
 
 def _score_with_metric(metric: Metric,
                        instances: List[EvalInstance],
                        metrics_dicts: Dict[str, Dict[str, Metrics]],
-                       disable_peer_jackknifing: bool = False) -> None:
+                       disable_peer_jackknifing: bool = False,
+                       cache: MetricCache = None,
+                       metric_key: str = None) -> None:
     # The summaries need to be grouped based on identical context. For instance, we group all of the summaries
     # that have the same reference documents together. This can sometimes make calculating the metric faster. The
     # following variables assist doing this.
@@ -92,75 +286,72 @@ def _score_with_metric(metric: Metric,
     # pair represents jackknifing or not
     jackknifing_flags = []
 
-    for instance in instances:
-        # Select just the relevant fields for this metric
-        summary_fields = instance.fields.select_fields(metric.required_summary_fields)
-        context_fields = instance.fields.select_fields(metric.required_context_fields)
-
-        # Score the instance normally using all of the fields. However,
-        # if the metric requires jackknifing and this is a reference summary,
-        # the metric is comparable to the jackknifing metrics.
-        is_jackknifing = metric.requires_jackknifing() and instance.summarizer_type == 'reference'
-
-        if context_fields not in field_to_index:
-            field_to_index[context_fields] = len(field_to_index)
-            fields_list.append(context_fields)
-            instances_list.append([])
-            summary_fields_lists.append([])
-            jackknifing_flags.append([])
-
-        index = field_to_index[context_fields]
-        instances_list[index].append(instance)
-        summary_fields_lists[index].append(summary_fields)
-        jackknifing_flags[index].append(is_jackknifing)
-
-        # Potentially run jackknifing for the peers
-        if not disable_peer_jackknifing and metric.requires_jackknifing() and instance.summarizer_type == 'peer':
-            jk_fields_list = metric.jackknifer.get_jackknifing_fields_list(context_fields)
-            if jk_fields_list:
-                for jk_fields in jk_fields_list:
-                    if jk_fields not in field_to_index:
-                        field_to_index[jk_fields] = len(field_to_index)
-                        fields_list.append(jk_fields)
-                        instances_list.append([])
-                        summary_fields_lists.append([])
-                        jackknifing_flags.append([])
-
-                    index = field_to_index[jk_fields]
-                    instances_list[index].append(instance)
-                    summary_fields_lists[index].append(summary_fields)
-                    jackknifing_flags[index].append(True)
-
-    # Construct the arguments that will be passed to the scoring method
-    summary_args = []
-    for name in metric.required_summary_fields:
-        summary_args.append([[summary_fields[name].to_input() for summary_fields in summary_fields_list] for summary_fields_list in summary_fields_lists])
-
-    context_args = []
-    for name in metric.required_context_fields:
-        context_args.append([fields[name].to_input() for fields in fields_list])
-
-    # Score the summaries
-    results_lists = metric.score_multi_all(*summary_args, *context_args)
-
-    # Used to aggregate the jk results
-    jk_results = defaultdict(lambda: defaultdict(list))
-
-    for i, results_list in enumerate(results_lists):
-        for j, results in enumerate(results_list):
-            instance = instances_list[i][j]
-            is_jackknifing = jackknifing_flags[i][j]
-            if is_jackknifing:
-                jk_results[instance.instance_id][instance.summarizer_id].append(results)
-            else:
-                metrics_dicts[instance.instance_id][instance.summarizer_id].metrics.update(results)
-
-    # Aggregate the jk results
-    for instance_id in jk_results.keys():
-        for summarizer_id, results in jk_results[instance_id].items():
-            result = sum(results) / len(results)
-            for name, value in result.items():
-                metrics_dicts[instance_id][summarizer_id].metrics[name + '_jk'] = value
+    name = type(metric).__name__
+    with PROFILER.stage(f'{name}/group_by_context', len(instances)):
+        for instance in instances:
+            # Select just the relevant fields for this metric
+            summary_fields = instance.fields.select_fields(metric.required_summary_fields)
+            context_fields = instance.fields.select_fields(metric.required_context_fields)
+
+            # Score the instance normally using all of the fields. However,
+            # if the metric requires jackknifing and this is a reference summary,
+            # the metric is comparable to the jackknifing metrics.
+            is_jackknifing = metric.requires_jackknifing() and instance.summarizer_type == 'reference'
+
+            if context_fields not in field_to_index:
+                field_to_index[context_fields] = len(field_to_index)
+                fields_list.append(context_fields)
+                instances_list.append([])
+                summary_fields_lists.append([])
+                jackknifing_flags.append([])
+
+            index = field_to_index[context_fields]
+            instances_list[index].append(instance)
+            summary_fields_lists[index].append(summary_fields)
+            jackknifing_flags[index].append(is_jackknifing)
+
+            # Potentially run jackknifing for the peers
+            if not disable_peer_jackknifing and metric.requires_jackknifing() and instance.summarizer_type == 'peer':
+                jk_fields_list = metric.jackknifer.get_jackknifing_fields_list(context_fields)
+                if jk_fields_list:
+                    for jk_fields in jk_fields_list:
+                        if jk_fields not in field_to_index:
+                            field_to_index[jk_fields] = len(field_to_index)
+                            fields_list.append(jk_fields)
+                            instances_list.append([])
+                            summary_fields_lists.append([])
+                            jackknifing_flags.append([])
+
+                        index = field_to_index[jk_fields]
+                        instances_list[index].append(instance)
+                        summary_fields_lists[index].append(summary_fields)
+                        jackknifing_flags[index].append(True)
+
+    # Score the summaries, only sending the ones which are not cached to the metric
+    if cache is None:
+        results_lists = _score_fields(metric, fields_list, summary_fields_lists)
+    else:
+        results_lists = _score_fields_with_cache(metric, fields_list, summary_fields_lists, cache, metric_key)
+
+    with PROFILER.stage(f'{name}/merge_results', len(instances)):
+        # Used to aggregate the jk results
+        jk_results = defaultdict(lambda: defaultdict(list))
+
+        for i, results_list in enumerate(results_lists):
+            for j, results in enumerate(results_list):
+                instance = instances_list[i][j]
+                is_jackknifing = jackknifing_flags[i][j]
+                if is_jackknifing:
+                    jk_results[instance.instance_id][instance.summarizer_id].append(results)
+                else:
+                    metrics_dicts[instance.instance_id][instance.summarizer_id].metrics.update(results)
+
+        # Aggregate the jk results
+        for instance_id in jk_results.keys():
+            for summarizer_id, results in jk_results[instance_id].items():
+                result = MetricsDict.mean(results)
+                for name, value in result.items():
+                    metrics_dicts[instance_id][summarizer_id].metrics[name + '_jk'] = value
 
 
 def _get_initial_metrics_dicts(instances: List[EvalInstance]) -> Dict[str, Dict[str, Metrics]]:
@@ -171,20 +362,228 @@ def _get_initial_metrics_dicts(instances: List[EvalInstance]) -> Dict[str, Dict[
     return metrics_dicts
 
 
+def _score_metric_task(metric: Metric,
+                       instances: List[EvalInstance],
+                       disable_peer_jackknifing: bool,
+                       cache: Optional[MetricCache],
+                       metric_key: Optional[str]) -> Dict[str, Dict[str, Metrics]]:
+    # Scores the instances with one metric into its own dictionaries so the metrics can be run in parallel
+    metrics_dicts = _get_initial_metrics_dicts(instances)
+    _score_with_metric(metric, instances, metrics_dicts, disable_peer_jackknifing=disable_peer_jackknifing,
+                       cache=cache, metric_key=metric_key)
+    return metrics_dicts
+
+
 def score_instances(instances: List[EvalInstance],
                     metrics: List[Metric],
-                    disable_peer_jackknifing: bool = False) -> Dict[str, Dict[str, Metrics]]:
+                    disable_peer_jackknifing: bool = False,
+                    cache: MetricCache = None,
+                    metric_keys: List[str] = None,
+                    max_parallel_metrics: int = 1) -> Dict[str, Dict[str, Metrics]]:
+    if cache is not None and (metric_keys is None or len(metric_keys) != len(metrics)):
+        raise Exception(f'A metric key must be provided for every metric in order to use the cache')
+    metric_keys = metric_keys or [None] * len(metrics)
+
     metrics_dicts = _get_initial_metrics_dicts(instances)
-    for metric in metrics:
-        _score_with_metric(metric, instances, metrics_dicts, disable_peer_jackknifing=disable_peer_jackknifing)
+    if max_parallel_metrics == 1:
+        for metric, metric_key in zip(metrics, metric_keys):
+            _score_with_metric(metric, instances, metrics_dicts, disable_peer_jackknifing=disable_peer_jackknifing,
+                               cache=cache, metric_key=metric_key)
+        return metrics_dicts
+
+    args_list = [(instances, disable_peer_jackknifing, cache, metric_key) for metric_key in metric_keys]
+    results_list = run_metric_tasks(_score_metric_task, metrics, args_list, max_parallel_metrics)
+
+    # Merge the results in the order of the metrics so the output is the same as running them one at a time
+    for results in results_list:
+        for instance_id, summarizer_to_metrics in results.items():
+            for summarizer_id, metrics in summarizer_to_metrics.items():
+                metrics_dicts[instance_id][summarizer_id].metrics.update(metrics.metrics)
     return metrics_dicts
 
 
-def save_score_results(metrics_dicts: Dict[str, Dict[str, Metrics]], output_file: str, silent: bool) -> None:
+def _get_chunks(instances: Iterable[EvalInstance], chunk_size: int) -> Iterator[List[EvalInstance]]:
+    chunk = []
+    for instance in instances:
+        chunk.append(instance)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if len(chunk) > 0:
+        yield chunk
+
+
+def score_instances_in_chunks(instances: Iterable[EvalInstance],
+                              metrics: List[Metric],
+                              output_file: str,
+                              chunk_size: int,
+                              disable_peer_jackknifing: bool = False,
+                              cache: MetricCache = None,
+                              metric_keys: List[str] = None,
+                              max_parallel_metrics: int = 1) -> None:
+    """
+    Scores the ``instances`` ``chunk_size`` at a time and writes the metrics for each chunk to ``output_file``
+    before the next chunk is read, so ``instances`` can be an iterator over a dataset which does not fit
+    into memory. The summaries are only grouped by their context within each chunk.
+    """
+    if chunk_size < 1:
+        raise Exception(f'The chunk size must be positive: {chunk_size}')
+
+    num_scored = 0
     with JsonlWriter(output_file) as out:
-        for instance_id in sorted(metrics_dicts.keys()):
-            for summarizer_id in sorted(metrics_dicts[instance_id].keys()):
-                out.write(metrics_dicts[instance_id][summarizer_id])
+        chunks = _get_chunks(instances, chunk_size)
+        while True:
+            # The instances are read lazily, so reading is timed by getting each chunk
+            with PROFILER.stage('read_instances') as stage:
+                chunk = next(chunks, None)
+                stage.num_items = len(chunk) if chunk is not None else 0
+            if chunk is None:
+                break
+
+            metrics_dicts = score_instances(chunk, metrics, disable_peer_jackknifing, cache=cache, metric_keys=metric_keys,
+                                            max_parallel_metrics=max_parallel_metrics)
+            with PROFILER.stage('write_results', len(chunk)):
+                _write_metrics_dicts(metrics_dicts, out)
+            num_scored += len(chunk)
+            logger.info(f'Scored {num_scored} instances')
+
+
+def get_fingerprints_file(output_file: str) -> str:
+    return f'{output_file}.fingerprints.json'
+
+
+def _get_fingerprint(metric: Metric, metric_key: str, instance: EvalInstance, disable_peer_jackknifing: bool) -> str:
+    # The results for a summary only depend on the metric, the summary, and its context. The peers' jackknifing
+    # contexts are derived from their context, and a reference summary's context is the other references, so
+    # its jackknifing results change whenever any of the instance's other references change.
+    fields = instance.fields
+    inputs = [fields[name].to_input() for name in metric.required_summary_fields + metric.required_context_fields]
+    return MetricCache.get_key(metric_key, instance.summarizer_type, disable_peer_jackknifing, *inputs)
+
+
+def _get_file_hash(file_path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _load_fingerprints(output_file: str) -> Dict:
+    # The fingerprints are only used if the output file was not changed after they were saved
+    fingerprints_file = get_fingerprints_file(output_file)
+    if not os.path.exists(output_file) or not os.path.exists(fingerprints_file):
+        return {}
+    with open(fingerprints_file, 'r') as f:
+        data = json.load(f)
+    if data.get('output_hash') != _get_file_hash(output_file):
+        logger.warning(f'Ignoring the fingerprints because {output_file} was changed after they were saved')
+        return {}
+    return data['metrics']
+
+
+def score_instances_incrementally(instances: List[EvalInstance],
+                                  metrics: List[Metric],
+                                  output_file: str,
+                                  metric_keys: List[str],
+                                  disable_peer_jackknifing: bool = False,
+                                  cache: MetricCache = None,
+                                  max_parallel_metrics: int = 1) -> None:
+    """
+    Scores only the (summary, metric) pairs which are not already in ``output_file`` or whose inputs changed since
+    it was written, then rewrites ``output_file`` with the metrics for all of the ``instances``. Each result is
+    matched to a fingerprint of the metric's parameters (``metric_keys``), the summary, and its context, which are
+    saved in the file from ``get_fingerprints_file``. The new output does not include summaries which are no longer
+    in ``instances`` or the results of metrics which are no longer in ``metrics``, so it is the same as scoring
+    everything again.
+    """
+    if len(metric_keys) != len(metrics):
+        raise Exception(f'A metric key must be provided for every metric in order to score incrementally')
+
+    existing = {}
+    if os.path.exists(output_file):
+        for record in JsonlReader(output_file, Metrics).read():
+            existing[(record.instance_id, record.summarizer_id)] = record.metrics
+    all_fingerprints = _load_fingerprints(output_file)
+
+    # The previous results of each metric which are still valid and the instances which need to be scored again
+    kept_results_list = []
+    stale_instances_list = []
+    fingerprints_list = []
+    for metric, metric_key in zip(metrics, metric_keys):
+        previous = all_fingerprints.get(MetricCache.get_key(metric_key), {})
+        kept_results = {}
+        stale_instances = []
+        fingerprints = {}
+        for instance in instances:
+            location = (instance.instance_id, instance.summarizer_id)
+            fingerprint = _get_fingerprint(metric, metric_key, instance, disable_peer_jackknifing)
+            fingerprints[location] = fingerprint
+
+            entry = previous.get(instance.instance_id, {}).get(instance.summarizer_id)
+            metrics_dict = existing.get(location)
+            if entry is not None and entry['fingerprint'] == fingerprint and metrics_dict is not None and \
+                    all(name in metrics_dict for name in entry['names']):
+                kept_results[location] = MetricsDict({name: metrics_dict[name] for name in entry['names']})
+            else:
+                stale_instances.append(instance)
+
+        logger.info(f'Scoring {len(stale_instances)} of {len(instances)} summaries with {type(metric).__name__}')
+        kept_results_list.append(kept_results)
+        stale_instances_list.append(stale_instances)
+        fingerprints_list.append(fingerprints)
+
+    # Only the metrics with stale results are run
+    indices = [i for i, stale_instances in enumerate(stale_instances_list) if len(stale_instances) > 0]
+    args_list = [(stale_instances_list[i], disable_peer_jackknifing, cache, metric_keys[i]) for i in indices]
+    results_list = run_metric_tasks(_score_metric_task, [metrics[i] for i in indices], args_list, max_parallel_metrics)
+    scored_results_list = [{} for _ in metrics]
+    for i, results in zip(indices, results_list):
+        for instance_id, summarizer_to_metrics in results.items():
+            for summarizer_id, record in summarizer_to_metrics.items():
+                scored_results_list[i][(instance_id, summarizer_id)] = record.metrics
+
+    # Merge the results in the order of the metrics so the output is the same as scoring all of the summaries
+    metrics_dicts = _get_initial_metrics_dicts(instances)
+    for kept_results, scored_results in zip(kept_results_list, scored_results_list):
+        for instance in instances:
+            location = (instance.instance_id, instance.summarizer_id)
+            results = kept_results[location] if location in kept_results else scored_results[location]
+            metrics_dicts[instance.instance_id][instance.summarizer_id].metrics.update(results)
+
+    # Save the fingerprints together with the names of the metrics each one is for
+    save_score_results(metrics_dicts, output_file, silent=True)
+    new_fingerprints = {}
+    for metric_key, fingerprints, kept_results, scored_results in zip(metric_keys, fingerprints_list,
+                                                                       kept_results_list, scored_results_list):
+        metric_fingerprints = defaultdict(dict)
+        for (instance_id, summarizer_id), fingerprint in fingerprints.items():
+            location = (instance_id, summarizer_id)
+            results = kept_results[location] if location in kept_results else scored_results[location]
+            metric_fingerprints[instance_id][summarizer_id] = {'fingerprint': fingerprint, 'names': list(results.keys())}
+        new_fingerprints[MetricCache.get_key(metric_key)] = metric_fingerprints
+    with open(get_fingerprints_file(output_file), 'w') as out:
+        json.dump({'output_hash': _get_file_hash(output_file), 'metrics': new_fingerprints}, out)
+
+
+def _write_metrics_dicts(metrics_dicts: Dict[str, Dict[str, Metrics]], out: JsonlWriter) -> None:
+    for instance_id in sorted(metrics_dicts.keys()):
+        for summarizer_id in sorted(metrics_dicts[instance_id].keys()):
+            out.write(metrics_dicts[instance_id][summarizer_id])
+
+
+def save_score_results(metrics_dicts: Dict[str, Dict[str, Metrics]], output_file: str, silent: bool) -> None:
+    num_summaries = sum(len(summarizer_to_metrics) for summarizer_to_metrics in metrics_dicts.values())
+    with PROFILER.stage('write_results', num_summaries):
+        with JsonlWriter(output_file) as out:
+            _write_metrics_dicts(metrics_dicts, out)
+
+
+def read_instances(dataset_reader: DatasetReader, *input_files: str) -> List[EvalInstance]:
+    with PROFILER.stage('read_instances') as stage:
+        instances = dataset_reader.read(*input_files)
+        stage.num_items = len(instances)
+    return instances
 
 
 @RootSubcommand.register('score')
@@ -200,20 +599,49 @@ class ScoreSubcommand(RootSubcommand):
     def run(self, args):
         prepare_global_logging(file_path=args.log_file, silent=args.silent)
 
-        import_module_and_submodules('sacrerouge')
         include_packages = args.include_packages or []
         for package in include_packages:
             import_module_and_submodules(package)
 
         params = Params.from_file(args.config, args.overrides)
         dataset_reader = DatasetReader.from_params(params.pop('dataset_reader'))
-        metrics = _load_metrics(params)
+        metrics, metric_keys = _load_metrics(params)
 
         input_files = params.pop('input_files')
         if isinstance(input_files, str):
             input_files = [input_files]
 
-        instances = dataset_reader.read(*input_files)
-        metrics_dicts = score_instances(instances, metrics, args.disable_peer_jackknifing)
-
-        save_score_results(metrics_dicts, args.output_jsonl, args.silent)
+        with profile_command(args.profile, args.output_jsonl):
+            run_score(dataset_reader, input_files, metrics, metric_keys, args)
+
+
+def run_score(dataset_reader: DatasetReader,
+              input_files: List[str],
+              metrics: List[Metric],
+              metric_keys: List[str],
+              args: argparse.Namespace) -> None:
+    """Scores the instances in ``input_files`` with ``metrics`` based on the score command's arguments."""
+    # The metric-specific commands only run one metric, so they do not have this argument
+    max_parallel_metrics = getattr(args, 'max_parallel_metrics', 1)
+    if args.incremental:
+        if args.chunk_size is not None:
+            raise Exception(f'"--incremental" cannot be used with "--chunk-size"')
+        instances = read_instances(dataset_reader, *input_files)
+        score_instances_incrementally(instances, metrics, args.output_jsonl, metric_keys,
+                                      args.disable_peer_jackknifing, cache=get_metric_cache(args),
+                                      max_parallel_metrics=max_parallel_metrics)
+        return
+
+    if args.chunk_size is not None:
+        instances = dataset_reader.iter_instances(*input_files)
+        score_instances_in_chunks(instances, metrics, args.output_jsonl, args.chunk_size,
+                                  args.disable_peer_jackknifing, cache=get_metric_cache(args),
+                                  metric_keys=metric_keys, max_parallel_metrics=max_parallel_metrics)
+        return
+
+    instances = read_instances(dataset_reader, *input_files)
+    metrics_dicts = score_instances(instances, metrics, args.disable_peer_jackknifing,
+                                    cache=get_metric_cache(args), metric_keys=metric_keys,
+                                    max_parallel_metrics=max_parallel_metrics)
+
+    save_score_results(metrics_dicts, args.output_jsonl, args.silent)
@@ -2,6 +2,7 @@ import argparse
 from overrides import overrides
 
 from sacrerouge.common import Registrable
+from sacrerouge.common.registry_manifest import import_registered_modules
 from sacrerouge.commands import RootSubcommand, DatasetSetupSubcommand
 
 
@@ -14,6 +15,7 @@ class SetupDatasetSubcommand(RootSubcommand):
         subparsers = self.parser.add_subparsers()
 
         # Add all of the dataset setup commands using the registry
+        import_registered_modules('DatasetSetupSubcommand')
         for name, (cls_, _) in sorted(Registrable._registry[DatasetSetupSubcommand].items()):
             cls_().add_subparser(subparsers)
 
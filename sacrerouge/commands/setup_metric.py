@@ -2,6 +2,7 @@ import argparse
 from overrides import overrides
 
 from sacrerouge.common import Registrable
+from sacrerouge.common.registry_manifest import import_registered_modules
 from sacrerouge.commands import RootSubcommand, MetricSetupSubcommand
 
 
@@ -14,6 +15,7 @@ class SetupMetricSubcommand(RootSubcommand):
         subparsers = self.parser.add_subparsers()
 
         # Add all of the metric setup commands using the registry
+        import_registered_modules('MetricSetupSubcommand')
         for name, (cls_, _) in sorted(Registrable._registry[MetricSetupSubcommand].items()):
             cls_().add_subparser(subparsers)
 
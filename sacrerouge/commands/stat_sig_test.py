@@ -10,10 +10,10 @@ from scipy.stats import kendalltau, pearsonr, spearmanr
 from typing import Dict, List, Tuple, Union
 
 from sacrerouge.commands import RootSubcommand
-from sacrerouge.commands.correlate import load_metrics, filter_metrics, merge_metrics
+from sacrerouge.commands.correlate import load_score_matrices
 from sacrerouge.common.logging import prepare_global_logging
 from sacrerouge.data import Metrics
-from sacrerouge.stats import convert_to_matrices, corr_diff_test, global_corr, summary_level_corr, system_level_corr
+from sacrerouge.stats import corr_diff_test, global_corr, summary_level_corr, system_level_corr
 
 logger = logging.getLogger(__name__)
 
@@ -34,14 +34,20 @@ def _run_test(corr_func,
               X: np.ndarray, Y: np.ndarray, Z: np.ndarray,
               test_method: str,
               alpha: float,
-              two_tailed: bool) -> Dict:
+              two_tailed: bool,
+              num_workers: int = None) -> Dict:
     pearson = functools.partial(corr_func, pearsonr)
     spearman = functools.partial(corr_func, spearmanr)
     kendall = functools.partial(corr_func, kendalltau)
 
-    r_pvalue = corr_diff_test(pearson, X, Y, Z, test_method, two_tailed)
-    rho_pvalue = corr_diff_test(spearman, X, Y, Z, test_method, two_tailed)
-    tau_pvalue = corr_diff_test(kendall, X, Y, Z, test_method, two_tailed)
+    # The Williams test does not do any resampling, so it does not accept `num_workers`
+    kwargs = {}
+    if num_workers is not None and test_method != 'williams':
+        kwargs['num_workers'] = num_workers
+
+    r_pvalue = corr_diff_test(pearson, X, Y, Z, test_method, two_tailed, kwargs=kwargs)
+    rho_pvalue = corr_diff_test(spearman, X, Y, Z, test_method, two_tailed, kwargs=kwargs)
+    tau_pvalue = corr_diff_test(kendall, X, Y, Z, test_method, two_tailed, kwargs=kwargs)
 
     # For some reason, without casting `pvalue <= alpha` to a bool, the result
     # would be type `bool_` which was not json serializable
@@ -71,33 +77,10 @@ def run_hypothesis_tests(metrics_jsonl_files_or_metrics_list: Union[str, List[st
                          two_tailed: bool = True,
                          skip_summary_level: bool = False,
                          skip_system_level: bool = False,
-                         skip_global: bool = False) -> Dict:
-    if isinstance(metrics_jsonl_files_or_metrics_list, str):
-        # A single file
-        metrics_list = load_metrics([metrics_jsonl_files_or_metrics_list])
-    elif isinstance(metrics_jsonl_files_or_metrics_list, list) and all(
-            isinstance(item, str) for item in metrics_jsonl_files_or_metrics_list):
-        # A list of files
-        metrics_list = load_metrics(metrics_jsonl_files_or_metrics_list)
-    else:
-        # A list of metrics
-        assert isinstance(metrics_jsonl_files_or_metrics_list, list) and all(
-            isinstance(item, Metrics) for item in metrics_jsonl_files_or_metrics_list)
-        metrics_list = metrics_jsonl_files_or_metrics_list
-
-    # Merge duplicate metrics objects into one
-    metrics_list = merge_metrics(metrics_list)
-
-    for metrics in metrics_list:
-        metrics.flatten_keys()
-
-    metrics_list = filter_metrics(metrics_list, summarizer_type, dependent_metric, metric_A, metric_B)
-    for metrics in metrics_list:
-        metrics.select_metrics([dependent_metric, metric_A, metric_B])
-        metrics.average_values()
-
+                         skip_global: bool = False,
+                         num_workers: int = None) -> Dict:
     # Follow the math in the paper: the dependent metric is Z
-    X, Y, Z = convert_to_matrices(metrics_list, metric_A, metric_B, dependent_metric)
+    X, Y, Z = load_score_matrices(metrics_jsonl_files_or_metrics_list, summarizer_type, metric_A, metric_B, dependent_metric)
 
     H0, H1 = _get_hypotheses(two_tailed, dependent_metric, metric_A, metric_B)
     results = {
@@ -112,13 +95,13 @@ def run_hypothesis_tests(metrics_jsonl_files_or_metrics_list: Union[str, List[st
         'H1': H1
     }
     if not skip_summary_level:
-        results['summary_level'] = _run_test(summary_level_corr, X, Y, Z, test_method, alpha, two_tailed)
+        results['summary_level'] = _run_test(summary_level_corr, X, Y, Z, test_method, alpha, two_tailed, num_workers)
 
     if not skip_system_level:
-        results['system_level'] = _run_test(system_level_corr, X, Y, Z, test_method, alpha, two_tailed)
+        results['system_level'] = _run_test(system_level_corr, X, Y, Z, test_method, alpha, two_tailed, num_workers)
 
     if not skip_global:
-        results['global'] = _run_test(global_corr, X, Y, Z, test_method, alpha, two_tailed)
+        results['global'] = _run_test(global_corr, X, Y, Z, test_method, alpha, two_tailed, num_workers)
 
     return results
 
@@ -134,7 +117,8 @@ class StatisticalSignificanceTestSubcommand(RootSubcommand):
             '--metrics-jsonl-files',
             nargs='+',
             help='The jsonl files with the metric values. If the values are split across multiple files, they can all '
-                 'be passed as arguments.',
+                 'be passed as arguments. A single score store directory created by "build-score-store" can be '
+                 'passed instead.',
             required=True
         )
         self.parser.add_argument(
@@ -186,6 +170,12 @@ class StatisticalSignificanceTestSubcommand(RootSubcommand):
             type=int,
             help='The random seed to use for numpy. Python random will be this number plus one'
         )
+        self.parser.add_argument(
+            '--num-workers',
+            type=int,
+            help='The number of processes to use for the resampling-based tests. If provided, the results are the '
+                 'same for any number of workers, but they will be different from running without this argument'
+        )
         self.parser.add_argument(
             '--skip-summary-level',
             action='store_true',
@@ -237,7 +227,8 @@ class StatisticalSignificanceTestSubcommand(RootSubcommand):
                                        two_tailed=two_tailed,
                                        skip_summary_level=args.skip_summary_level,
                                        skip_system_level=args.skip_system_level,
-                                       skip_global=args.skip_global)
+                                       skip_global=args.skip_global,
+                                       num_workers=args.num_workers)
 
         if args.output_file:
             dirname = os.path.dirname(args.output_file)
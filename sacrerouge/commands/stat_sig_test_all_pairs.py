@@ -0,0 +1,241 @@
+import argparse
+import functools
+import json
+import logging
+import numpy as np
+import os
+import random
+from overrides import overrides
+from scipy.stats import kendalltau, pearsonr, spearmanr
+from typing import Dict, List, Tuple, Union
+
+from sacrerouge.commands import RootSubcommand
+from sacrerouge.commands.correlate import load_score_matrices
+from sacrerouge.common.logging import prepare_global_logging
+from sacrerouge.data import Metrics
+from sacrerouge.stats import all_pairs_diff_test, global_corr, summary_level_corr, system_level_corr
+
+logger = logging.getLogger(__name__)
+
+
+def _get_hypotheses(two_tailed: bool, dependent_metric: str) -> Tuple[str, str]:
+    # Entry (i, j) of the p-value matrix compares metric i (A) to metric j (B)
+    if two_tailed:
+        return f'r(A, {dependent_metric}) == r(B, {dependent_metric})', \
+               f'r(A, {dependent_metric}) != r(B, {dependent_metric})'
+    else:
+        return f'r(A, {dependent_metric}) <= r(B, {dependent_metric})', \
+               f'r(A, {dependent_metric}) > r(B, {dependent_metric})'
+
+
+def _to_lists(pvalues: np.ndarray, alpha: float) -> Dict:
+    # The diagonal is NaN, which is not valid json, so it is saved as `None`
+    return {
+        'pvalues': [[None if np.isnan(pvalue) else float(pvalue) for pvalue in row] for row in pvalues],
+        'is_significant': [[None if np.isnan(pvalue) else bool(pvalue <= alpha) for pvalue in row] for row in pvalues]
+    }
+
+
+def _run_all_pairs_test(corr_func,
+                        matrices: List[np.ndarray],
+                        Z: np.ndarray,
+                        test_method: str,
+                        alpha: float,
+                        two_tailed: bool,
+                        num_samples: int,
+                        num_workers: int = None) -> Dict:
+    results = {}
+    for name, coef_func in [('pearson', pearsonr), ('spearman', spearmanr), ('kendall', kendalltau)]:
+        pvalues = all_pairs_diff_test(functools.partial(corr_func, coef_func), matrices, Z, test_method, two_tailed,
+                                      num_samples=num_samples, num_workers=num_workers)
+        results[name] = _to_lists(pvalues, alpha)
+    return results
+
+
+def run_all_pairs_hypothesis_tests(metrics_jsonl_files_or_metrics_list: Union[str, List[str], List[Metrics]],
+                                   dependent_metric: str,
+                                   metric_names: List[str],
+                                   summarizer_type: str,
+                                   test_method: str = 'permutation-both',
+                                   alpha: float = 0.05,
+                                   two_tailed: bool = True,
+                                   num_samples: int = 1000,
+                                   skip_summary_level: bool = False,
+                                   skip_system_level: bool = False,
+                                   skip_global: bool = False,
+                                   num_workers: int = None) -> Dict:
+    """
+    Runs the hypothesis test between every pair of metrics in `metric_names` against the `dependent_metric`. The
+    score matrices are built once and every bootstrap sample or permutation is shared by all of the pairs. Entry
+    (i, j) of each p-value matrix is the result of testing metric i as metric A and metric j as metric B.
+    """
+    if len(set(metric_names)) != len(metric_names):
+        raise Exception(f'The metric names must be unique: {metric_names}')
+    if dependent_metric in metric_names:
+        raise Exception(f'The dependent metric "{dependent_metric}" cannot be one of the tested metrics')
+
+    # Follow the math in the paper: the dependent metric is Z
+    *matrices, Z = load_score_matrices(metrics_jsonl_files_or_metrics_list, summarizer_type,
+                                      *metric_names, dependent_metric)
+
+    H0, H1 = _get_hypotheses(two_tailed, dependent_metric)
+    results = {
+        'dependent_metric': dependent_metric,
+        'metrics': metric_names,
+        'summarizer_type': summarizer_type,
+        'test_method': test_method,
+        'alpha': alpha,
+        'two_tailed': two_tailed,
+        'H0': H0,
+        'H1': H1
+    }
+    if not skip_summary_level:
+        results['summary_level'] = _run_all_pairs_test(summary_level_corr, matrices, Z, test_method, alpha,
+                                                       two_tailed, num_samples, num_workers)
+
+    if not skip_system_level:
+        results['system_level'] = _run_all_pairs_test(system_level_corr, matrices, Z, test_method, alpha,
+                                                      two_tailed, num_samples, num_workers)
+
+    if not skip_global:
+        results['global'] = _run_all_pairs_test(global_corr, matrices, Z, test_method, alpha,
+                                                two_tailed, num_samples, num_workers)
+
+    return results
+
+
+@RootSubcommand.register('stat-sig-test-all-pairs')
+class AllPairsStatisticalSignificanceTestSubcommand(RootSubcommand):
+    @overrides
+    def add_subparser(self, parser: argparse._SubParsersAction):
+        description = 'Run hypothesis testing on the difference between the correlations of every pair of metrics ' \
+                      'and the dependent metric'
+        self.parser = parser.add_parser('stat-sig-test-all-pairs', description=description, help=description)
+        self.parser.add_argument(
+            '--metrics-jsonl-files',
+            nargs='+',
+            help='The jsonl files with the metric values. If the values are split across multiple files, they can all '
+                 'be passed as arguments. A single score store directory created by "build-score-store" can be '
+                 'passed instead.',
+            required=True
+        )
+        self.parser.add_argument(
+            '--dependent-metric',
+            type=str,
+            help='The flattened name of the dependent metric against which the metrics will be correlated',
+            required=True
+        )
+        self.parser.add_argument(
+            '--metrics',
+            nargs='+',
+            type=str,
+            help='The flattened names of the metrics which should be compared. Entry (i, j) of the output p-value '
+                 'matrices tests the i-th metric as metric A and the j-th metric as metric B',
+            required=True
+        )
+        self.parser.add_argument(
+            '--summarizer-type',
+            choices=['all', 'reference', 'peer'],
+            help='The type of summarizer which should be included in the correlation calculation',
+            required=True
+        )
+        self.parser.add_argument(
+            '--hypothesis-test',
+            choices=['bootstrap-system', 'bootstrap-input', 'bootstrap-both', 'permutation-both',
+                     'permutation-input', 'permutation-system', 'williams'],
+            default='permutation-both',
+            help='The hypothesis test to use'
+        )
+        self.parser.add_argument(
+            '--num-samples',
+            type=int,
+            default=1000,
+            help='The number of bootstrap samples or permutations which are shared by all of the pairs'
+        )
+        self.parser.add_argument(
+            '--confidence',
+            type=float,
+            default=95,
+            help='The confidence level of the hypothesis test'
+        )
+        self.parser.add_argument(
+            '--num-tails',
+            type=int,
+            choices=[1, 2],
+            default=1,
+            help='The number of tails to use in the hypothesis test'
+        )
+        self.parser.add_argument(
+            '--random-seed',
+            type=int,
+            help='The random seed to use for numpy. Python random will be this number plus one'
+        )
+        self.parser.add_argument(
+            '--num-workers',
+            type=int,
+            help='The number of processes to use for the resampling-based tests. If provided, the results are the '
+                 'same for any number of workers, but they will be different from running without this argument'
+        )
+        self.parser.add_argument(
+            '--skip-summary-level',
+            action='store_true',
+            help='Indicates the summary-level correlations should not be tested'
+        )
+        self.parser.add_argument(
+            '--skip-system-level',
+            action='store_true',
+            help='Indicates the system-level correlations should not be tested'
+        )
+        self.parser.add_argument(
+            '--skip-global',
+            action='store_true',
+            help='Indicates the global correlations should not be tested'
+        )
+        self.parser.add_argument(
+            '--output-file',
+            type=str,
+            help='The json output file which will contain the test results'
+        )
+        self.parser.add_argument(
+            '--log-file',
+            type=str,
+            help='The file where the log should be written'
+        )
+        self.parser.add_argument(
+            '--silent',
+            action='store_true',
+            help='Controls whether the log should be written to stdout'
+        )
+        self.parser.set_defaults(func=self.run)
+
+    def run(self, args):
+        prepare_global_logging(file_path=args.log_file, silent=args.silent)
+
+        if args.random_seed is not None:
+            np.random.seed(args.random_seed)
+            random.seed(args.random_seed + 1)
+
+        two_tailed = args.num_tails == 2
+        alpha = 1.0 - args.confidence / 100
+        results = run_all_pairs_hypothesis_tests(args.metrics_jsonl_files,
+                                                 args.dependent_metric,
+                                                 args.metrics,
+                                                 args.summarizer_type,
+                                                 test_method=args.hypothesis_test,
+                                                 alpha=alpha,
+                                                 two_tailed=two_tailed,
+                                                 num_samples=args.num_samples,
+                                                 skip_summary_level=args.skip_summary_level,
+                                                 skip_system_level=args.skip_system_level,
+                                                 skip_global=args.skip_global,
+                                                 num_workers=args.num_workers)
+
+        if args.output_file:
+            dirname = os.path.dirname(args.output_file)
+            if dirname:
+                os.makedirs(dirname, exist_ok=True)
+            with open(args.output_file, 'w') as out:
+                out.write(json.dumps(results, indent=2))
+
+        if not args.silent:
+            logger.info(json.dumps(results, indent=2))
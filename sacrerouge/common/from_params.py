@@ -486,6 +486,9 @@ class FromParams(object):
             )
 
         registered_subclasses = Registrable._registry.get(cls)
+        if registered_subclasses is None and is_base_registrable(cls) and cls.list_available():
+            # The subclasses are in the registry manifest but have not been imported yet
+            registered_subclasses = Registrable._registry[cls]
 
         if is_base_registrable(cls) and registered_subclasses is None:
             # NOTE(mattg): There are some potential corner cases in this logic if you have nested
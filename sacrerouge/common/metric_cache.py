@@ -0,0 +1,133 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from sacrerouge.io import codec
+from sacrerouge.version import VERSION
+
+logger = logging.getLogger(__name__)
+
+
+class MetricCache(object):
+    """
+    The ``MetricCache`` is a persistent on-disk cache of metric results. Each result is stored in
+    a json file whose name is a hash of its key, so the same (metric, summary, context) will always
+    be found regardless of which command or dataset it came from.
+
+    The keys are built in steps with ``get_key``, starting from a string which identifies the
+    metric and its parameters (see ``get_metric_key``) and then adding the metric's inputs.
+
+    If ``max_size`` is not ``None``, the least recently used results are deleted whenever
+    the total size of the cache goes above ``max_size`` bytes. Enough results are deleted to bring
+    the size down to ``eviction_fraction`` of ``max_size``, so the cache directory is not scanned
+    again on every new result once the cache is full.
+
+    Parameters
+    ----------
+    cache_dir: ``str``
+        The directory where the results are stored.
+    max_size: ``int``
+        The maximum size of the cache in bytes, or ``None`` for no limit.
+    eviction_fraction: ``float``
+        The fraction of ``max_size`` which the cache is reduced to when results are deleted.
+    """
+    def __init__(self, cache_dir: str, max_size: Optional[int] = None, eviction_fraction: float = 0.9) -> None:
+        if not 0.0 <= eviction_fraction <= 1.0:
+            raise Exception(f'The eviction fraction must be between 0 and 1: {eviction_fraction}')
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.eviction_fraction = eviction_fraction
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = self._get_total_size() if max_size is not None else None
+
+    @staticmethod
+    def get_metric_key(metric_params: Dict) -> str:
+        """
+        Creates the key for the metric which is constructed from ``metric_params``. The sacrerouge version
+        is part of the key because the implementations of the metrics may change between versions.
+        """
+        return json.dumps({'version': VERSION, 'params': metric_params}, sort_keys=True)
+
+    @staticmethod
+    def get_key(prefix: str, *inputs: Any) -> str:
+        """Extends the key ``prefix`` with the metric inputs ``inputs``."""
+        hasher = hashlib.sha256(prefix.encode())
+        for value in inputs:
+            hasher.update(b'\n')
+            hasher.update(codec.dumps(value).encode())
+        return hasher.hexdigest()
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f'{key}.json')
+
+    def _get_files(self) -> List[os.DirEntry]:
+        files = []
+        for subdir in os.scandir(self.cache_dir):
+            if subdir.is_dir():
+                files.extend(entry for entry in os.scandir(subdir.path) if entry.name.endswith('.json'))
+        return files
+
+    def _get_total_size(self) -> int:
+        return sum(entry.stat().st_size for entry in self._get_files())
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the value saved for ``key`` or ``None`` if it is not in the cache."""
+        path = self._get_path(key)
+        try:
+            with open(path, 'r') as f:
+                value = json.load(f)
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            return None
+        # Update the modification time, which is used to find the least recently used results
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Saves ``value``, which must be json serializable, for ``key``."""
+        try:
+            string = json.dumps(value)
+        except (TypeError, ValueError):
+            logger.warning(f'Skipping caching a value which cannot be serialized to json')
+            return
+
+        path = self._get_path(key)
+        dirname = os.path.dirname(path)
+        os.makedirs(dirname, exist_ok=True)
+        if self.max_size is not None:
+            # An existing result for the key is replaced, so its size no longer counts toward the total
+            try:
+                self._size -= os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+        # Write to a temporary file first so that other processes never read a partially written result
+        with tempfile.NamedTemporaryFile('w', dir=dirname, suffix='.tmp', delete=False) as out:
+            out.write(string)
+        os.replace(out.name, path)
+
+        if self.max_size is not None:
+            self._size += os.path.getsize(path)
+            if self._size > self.max_size:
+                self._evict()
+
+    def _evict(self) -> None:
+        files = sorted(self._get_files(), key=lambda entry: entry.stat().st_mtime)
+        self._size = sum(entry.stat().st_size for entry in files)
+        target_size = self.max_size * self.eviction_fraction
+        num_removed = 0
+        for entry in files:
+            if self._size <= target_size:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self._size -= size
+                num_removed += 1
+            except FileNotFoundError:
+                pass
+        logger.info(f'Removed {num_removed} results from the metric cache')
@@ -0,0 +1,50 @@
+import logging
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+from typing import Any, Callable, List, Tuple
+
+from sacrerouge.metrics import Metric
+
+logger = logging.getLogger(__name__)
+
+
+def run_metric_tasks(task: Callable,
+                     metrics: List[Metric],
+                     args_list: List[Tuple],
+                     max_parallel_metrics: int = 1) -> List[Any]:
+    """
+    Runs ``task(metric, *args)`` for every metric and its arguments in ``args_list`` and returns the results
+    in the same order as ``metrics``. Up to ``max_parallel_metrics`` metrics are run at the same time.
+
+    Most metrics spend their time waiting on an external process or on a library which releases the GIL,
+    so they are run on threads. Metrics with ``cpu_bound`` set to ``True`` are implemented in pure Python
+    and are run on a pool of processes instead. The ``task``, the metric, and its arguments must be picklable
+    for those metrics.
+    """
+    if max_parallel_metrics < 1:
+        raise Exception(f'The maximum number of parallel metrics must be positive: {max_parallel_metrics}')
+    if len(metrics) != len(args_list):
+        raise Exception(f'The number of metrics and arguments must be equal: {len(metrics)}, {len(args_list)}')
+
+    if max_parallel_metrics == 1 or len(metrics) <= 1:
+        return [task(metric, *args) for metric, args in zip(metrics, args_list)]
+
+    num_threads = min(max_parallel_metrics, len(metrics))
+    num_processes = min(max_parallel_metrics, sum(1 for metric in metrics if metric.cpu_bound))
+    logger.info(f'Running {len(metrics)} metrics with up to {num_threads} at once')
+
+    process_pool = multiprocessing.Pool(num_processes) if num_processes > 0 else None
+    try:
+        def run(index: int) -> Any:
+            # The threads limit how many metrics run at once. The threads for CPU-bound metrics wait for a process
+            metric, args = metrics[index], args_list[index]
+            if metric.cpu_bound:
+                return process_pool.apply(task, (metric, *args))
+            return task(metric, *args)
+
+        with ThreadPool(num_threads) as thread_pool:
+            return thread_pool.map(run, range(len(metrics)))
+    finally:
+        if process_pool is not None:
+            process_pool.close()
+            process_pool.join()
@@ -0,0 +1,69 @@
+import functools
+import os
+import threading
+from collections import OrderedDict
+from nltk.stem import PorterStemmer
+from typing import Any, Callable, Hashable
+
+
+class PreprocessingCache(object):
+    """
+    A process-wide cache of preprocessed texts (e.g., tokenized and stemmed summaries) which is shared by all
+    of the metrics, so a text which is scored by several metrics or against many contexts is only preprocessed
+    once for every configuration of the preprocessing. The keys are the configuration and the text. The
+    least recently used results are removed when there are more than ``max_size`` of them.
+
+    The cached values are shared, so they should not be modified.
+
+    Parameters
+    ----------
+    max_size: ``int``
+        The maximum number of results which are kept
+    """
+    def __init__(self, max_size: int) -> None:
+        if max_size < 0:
+            raise Exception(f'The maximum size of the cache must be non-negative: {max_size}')
+        self.max_size = max_size
+        self._values = OrderedDict()
+        # Metrics can be run in threads, so the cache is locked while it is updated
+        self._lock = threading.Lock()
+
+    def get(self, config: Hashable, text: Hashable, preprocess: Callable[[], Any]) -> Any:
+        """
+        Returns the result for ``text`` preprocessed with ``config``. If it is not in the cache, it is
+        computed by calling ``preprocess``.
+        """
+        key = (config, text)
+        with self._lock:
+            if key in self._values:
+                self._values.move_to_end(key)
+                return self._values[key]
+
+        value = preprocess()
+        with self._lock:
+            self._values[key] = value
+            while len(self._values) > self.max_size:
+                self._values.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+PREPROCESSING_CACHE = PreprocessingCache(int(os.getenv('SACREROUGE_PREPROCESSING_CACHE_SIZE', 100000)))
+
+# The original Porter stemmer algorithm, which is used by ROUGE
+_porter_stemmer = PorterStemmer(PorterStemmer.ORIGINAL_ALGORITHM)
+
+
+@functools.lru_cache(maxsize=int(os.getenv('SACREROUGE_PORTER_STEM_CACHE_SIZE', 100000)))
+def porter_stem(token: str) -> str:
+    """
+    Stems ``token`` with the original Porter stemmer. The stems of the most recently used
+    ``SACREROUGE_PORTER_STEM_CACHE_SIZE`` (default 100000) tokens are saved, so they are not stemmed again.
+    """
+    return _porter_stemmer.stem(token)
@@ -0,0 +1,166 @@
+import contextlib
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import resource
+except ImportError:
+    # The resource module is not available on Windows, so the memory usage is not reported
+    resource = None
+
+
+def _get_max_rss_mb(who: int) -> Optional[float]:
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(who).ru_maxrss
+    # The maximum resident set size is in bytes on macOS and kilobytes on Linux
+    return max_rss / (1024 * 1024) if sys.platform == 'darwin' else max_rss / 1024
+
+
+def _get_children_cpu_time() -> float:
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class _StageItems(object):
+    # Yielded by `Profiler.stage` so the number of items can be set when it is only known at the end of the stage
+    def __init__(self, num_items: Optional[int]) -> None:
+        self.num_items = num_items
+
+
+class Profiler(object):
+    """
+    Records the wall time, CPU time, peak resident set size, and number of items for named stages of a
+    command (e.g., reading the instances or one metric's ``score_multi_all``). Nothing is recorded unless the
+    profiler is enabled, so the stages can be marked in the code without any cost when profiling is not used.
+
+    The CPU times are for the whole process, so they include the work of any other threads which ran during the
+    stage. The CPU time of the external processes which finished during the stage (e.g., the ROUGE or METEOR
+    scripts) is reported separately. The peak RSS is the maximum for the process up to the end of the stage.
+    Stages which run in other processes (e.g., metrics with ``cpu_bound`` set to ``True`` when the metrics are
+    run in parallel) are not recorded.
+    """
+    def __init__(self) -> None:
+        self.enabled = False
+        self._stages = OrderedDict()
+        self._start_time = None
+        self._startup_cpu_time = None
+        # Metrics can be run in threads, so the stages are locked while they are updated
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.reset()
+        self.enabled = True
+        # The CPU time which was used before the profiler was enabled, which is mostly importing the modules
+        self._startup_cpu_time = time.process_time()
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+        self._start_time = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name: str, num_items: int = None) -> Iterator[_StageItems]:
+        """
+        Records the resources which are used until the end of the ``with`` block as stage ``name``. The
+        number of items can also be set on the yielded object's ``num_items`` before the block ends.
+        """
+        items = _StageItems(num_items)
+        if not self.enabled:
+            yield items
+            return
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        children_cpu_start = _get_children_cpu_time()
+        try:
+            yield items
+        finally:
+            self.record(name,
+                        wall_time=time.perf_counter() - wall_start,
+                        cpu_time=time.process_time() - cpu_start,
+                        subprocess_cpu_time=_get_children_cpu_time() - children_cpu_start,
+                        num_items=items.num_items)
+
+    def record(self,
+               name: str,
+               wall_time: float,
+               cpu_time: float = 0.0,
+               subprocess_cpu_time: float = 0.0,
+               num_items: int = None) -> None:
+        if not self.enabled:
+            return
+
+        peak_rss_mb = _get_max_rss_mb(resource.RUSAGE_SELF) if resource is not None else None
+        with self._lock:
+            if name not in self._stages:
+                self._stages[name] = {
+                    'calls': 0,
+                    'wall_time': 0.0,
+                    'cpu_time': 0.0,
+                    'subprocess_cpu_time': 0.0,
+                    'num_items': 0,
+                    'peak_rss_mb': None
+                }
+            stage = self._stages[name]
+            stage['calls'] += 1
+            stage['wall_time'] += wall_time
+            stage['cpu_time'] += cpu_time
+            stage['subprocess_cpu_time'] += subprocess_cpu_time
+            if num_items is not None:
+                stage['num_items'] += num_items
+            if peak_rss_mb is not None:
+                stage['peak_rss_mb'] = max(stage['peak_rss_mb'] or 0.0, peak_rss_mb)
+
+    def get_report(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {name: dict(stage) for name, stage in self._stages.items()}
+        for stage in stages.values():
+            stage['items_per_second'] = stage['num_items'] / stage['wall_time'] if stage['wall_time'] > 0 else None
+        return {
+            'wall_time': time.perf_counter() - self._start_time if self._start_time is not None else 0.0,
+            'cpu_time': time.process_time(),
+            'startup_cpu_time': self._startup_cpu_time,
+            'subprocess_cpu_time': _get_children_cpu_time(),
+            'peak_rss_mb': _get_max_rss_mb(resource.RUSAGE_SELF) if resource is not None else None,
+            'subprocess_peak_rss_mb': _get_max_rss_mb(resource.RUSAGE_CHILDREN) if resource is not None else None,
+            'stages': stages
+        }
+
+    def save_report(self, output_file: str) -> None:
+        with open(output_file, 'w') as out:
+            json.dump(self.get_report(), out, indent=2)
+
+
+PROFILER = Profiler()
+
+
+def get_profile_file(output_file: str) -> str:
+    return f'{output_file}.profile.json'
+
+
+@contextlib.contextmanager
+def profile_command(profile: bool, output_file: str) -> Iterator[None]:
+    """
+    If ``profile`` is ``True``, enables the profiler until the end of the ``with`` block and saves the report
+    next to ``output_file``. Otherwise, does nothing.
+    """
+    if not profile:
+        yield
+        return
+
+    PROFILER.enable()
+    try:
+        yield
+        PROFILER.save_report(get_profile_file(output_file))
+    finally:
+        PROFILER.disable()
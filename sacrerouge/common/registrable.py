@@ -12,6 +12,7 @@ import importlib
 import logging
 
 from sacrerouge.common import ConfigurationError, FromParams
+from sacrerouge.common.registry_manifest import get_registered_module, get_registered_names
 
 logger = logging.getLogger(__name__)
 
@@ -153,6 +154,12 @@ class Registrable(FromParams):
         a constructor (as you need to call `cls.register()` in order to tell us what separate
         function to use).
         """
+        if name not in Registrable._registry[cls]:
+            # The module which registers the name may not have been imported yet
+            module = get_registered_module(cls.__name__, name)
+            if module is not None:
+                importlib.import_module(module)
+
         if name in Registrable._registry[cls]:
             subclass, constructor = Registrable._registry[cls].get(name)
             return subclass, constructor
@@ -193,8 +200,12 @@ class Registrable(FromParams):
 
     @classmethod
     def list_available(cls) -> List[str]:
-        """List default first if it exists"""
+        """
+        List default first if it exists. The names in the registry manifest whose modules have not
+        been imported yet are included.
+        """
         keys = list(Registrable._registry[cls].keys())
+        keys.extend(name for name in get_registered_names(cls.__name__) if name not in Registrable._registry[cls])
         default = cls.default_implementation
 
         if default is None:
@@ -0,0 +1,108 @@
+"""
+The registry manifest maps the names which are registered with each ``Registrable`` base class (e.g., the
+"rouge" ``Metric`` or the "correlate" ``RootSubcommand``) to the module which registers them. It is built
+by parsing the source code instead of importing it, so the command line can import only the modules for
+the names it needs instead of every module in sacrerouge and all of their dependencies.
+
+The manifest for sacrerouge is saved in "registry_manifest.json" next to this file. It is regenerated with::
+
+    python -m sacrerouge.scripts.build_registry_manifest
+
+If the file does not exist, the manifest is built from the source code the first time it is used.
+"""
+import ast
+import functools
+import importlib
+import json
+import logging
+import os
+import sys
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'registry_manifest.json')
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _get_string(node: ast.AST) -> Optional[str]:
+    # String literals are `ast.Str` nodes before Python 3.8 and `ast.Constant` nodes after
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if sys.version_info < (3, 8) and isinstance(node, ast.Str):
+        return node.s
+    return None
+
+
+def _get_registered_names(tree: ast.AST) -> List[List[str]]:
+    # Finds the class decorators like `@Metric.register('rouge')` and returns the (base class, name) pairs
+    names = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.ClassDef):
+            continue
+        for decorator in node.decorator_list:
+            if isinstance(decorator, ast.Call) and \
+                    isinstance(decorator.func, ast.Attribute) and \
+                    decorator.func.attr == 'register' and \
+                    isinstance(decorator.func.value, ast.Name) and \
+                    len(decorator.args) > 0 and \
+                    _get_string(decorator.args[0]) is not None:
+                names.append([decorator.func.value.id, _get_string(decorator.args[0])])
+    return names
+
+
+def build_manifest(package_root: str = _PACKAGE_ROOT) -> Dict[str, Dict[str, str]]:
+    """
+    Parses every module in the sacrerouge package (except for the tests) and returns a dictionary from the
+    name of each base class to a dictionary from the registered names to the modules which register them.
+    """
+    parent = os.path.dirname(package_root)
+    manifest = {}
+    for root, dirnames, filenames in os.walk(package_root):
+        dirnames[:] = sorted(dirname for dirname in dirnames if dirname not in ['tests', '__pycache__'])
+        for filename in sorted(filenames):
+            if not filename.endswith('.py'):
+                continue
+            path = os.path.join(root, filename)
+            with open(path, 'r') as f:
+                source = f.read()
+            if '.register(' not in source:
+                continue
+
+            module = os.path.relpath(path, parent)[:-len('.py')].replace(os.sep, '.')
+            if module.endswith('.__init__'):
+                module = module[:-len('.__init__')]
+            for base_name, name in _get_registered_names(ast.parse(source)):
+                manifest.setdefault(base_name, {})[name] = module
+
+    return {base_name: dict(sorted(names.items())) for base_name, names in sorted(manifest.items())}
+
+
+@functools.lru_cache(maxsize=1)
+def load_manifest() -> Dict[str, Dict[str, str]]:
+    if os.path.exists(MANIFEST_FILE):
+        with open(MANIFEST_FILE, 'r') as f:
+            return json.load(f)
+    logger.info(f'Building the registry manifest because {MANIFEST_FILE} does not exist')
+    return build_manifest()
+
+
+def get_registered_module(base_name: str, name: str) -> str:
+    """Returns the module which registers ``name`` with the base class ``base_name`` or ``None``."""
+    return load_manifest().get(base_name, {}).get(name)
+
+
+def get_registered_names(base_name: str) -> List[str]:
+    """Returns all of the names which are registered with the base class ``base_name`` in the manifest."""
+    return list(load_manifest().get(base_name, {}).keys())
+
+
+def import_registered_modules(base_name: str) -> None:
+    """Imports every module which registers a name with the base class ``base_name``."""
+    for module in sorted(set(load_manifest().get(base_name, {}).values())):
+        importlib.import_module(module)
+
+
+def save_manifest(output_file: str = MANIFEST_FILE) -> None:
+    with open(output_file, 'w') as out:
+        out.write(json.dumps(build_manifest(), indent=2) + '\n')
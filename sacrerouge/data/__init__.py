@@ -2,4 +2,4 @@ from sacrerouge.data.eval_instance import EvalInstance
 from sacrerouge.data.jackknifers import Jackknifer
 from sacrerouge.data.metrics import Metrics
 from sacrerouge.data.metrics_dict import MetricsDict
-from sacrerouge.data.pyramid import Pyramid, PyramidAnnotation
+from sacrerouge.data.pyramid import LeaveOneOutPyramid, Pyramid, PyramidAnnotation
@@ -1,9 +1,25 @@
-from typing import List
+import logging
+from typing import Iterator, List
 
 from sacrerouge.common import Registrable
 from sacrerouge.data import EvalInstance
 
+logger = logging.getLogger(__name__)
+
 
 class DatasetReader(Registrable):
+    """
+    A ``DatasetReader`` loads the ``EvalInstance``s from the input files. Subclasses should implement
+    at least one of ``read``, which loads all of the instances into memory, or ``iter_instances``,
+    which yields them one at a time so they can be processed without keeping the whole dataset in memory.
+    """
     def read(self, *args: List[str]) -> List[EvalInstance]:
-        raise NotImplementedError
+        instances = list(self.iter_instances(*args))
+        logger.info(f'Loaded {len(instances)} instances')
+        return instances
+
+    def iter_instances(self, *args: List[str]) -> Iterator[EvalInstance]:
+        if type(self).read is DatasetReader.read:
+            raise NotImplementedError
+        # Readers which only implement `read` still need to load everything
+        yield from self.read(*args)
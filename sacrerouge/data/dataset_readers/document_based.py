@@ -1,9 +1,9 @@
 import logging
-from typing import Any, List, Union
+from typing import Any, Iterator, List, Union
 
 from sacrerouge.data import EvalInstance
 from sacrerouge.data.dataset_readers import DatasetReader
-from sacrerouge.data.fields import DocumentsField, Fields, SummaryField
+from sacrerouge.data.fields import DocumentsField, FieldInterner, Fields, SummaryField
 from sacrerouge.io import JsonlReader
 
 logger = logging.getLogger(__name__)
@@ -31,18 +31,20 @@ def flatten_documents(documents: List[Any]) -> List[Union[List[str], str]]:
 
 @DatasetReader.register('document-based')
 class DocumentBasedDatasetReader(DatasetReader):
-    def read(self, input_jsonl: str) -> List[EvalInstance]:
+    def iter_instances(self, input_jsonl: str) -> Iterator[EvalInstance]:
         logger.info(f'Loading evaluation instances from {input_jsonl}')
-        instances = []
+        interner = FieldInterner()
         with JsonlReader(input_jsonl) as f:
             for data in f:
                 fields = {}
                 fields['summary'] = SummaryField(data['summary']['text'])
 
                 if 'document' in data:
-                    fields['documents'] = DocumentsField([data['document']['text']])
+                    documents = DocumentsField([data['document']['text']])
                 else:
-                    fields['documents'] = DocumentsField([document['text'] for document in data['documents']])
+                    documents = DocumentsField([document['text'] for document in data['documents']])
+                # Summaries with the same documents share one `DocumentsField`
+                fields['documents'] = interner.intern(documents)
                 fields = Fields(fields)
 
                 instance = EvalInstance(
@@ -51,15 +53,12 @@ class DocumentBasedDatasetReader(DatasetReader):
                     data['summarizer_type'],
                     fields
                 )
-                instances.append(instance)
-
-            logger.info(f'Loaded {len(instances)} instances')
-            return instances
+                yield instance
 
 
 @DatasetReader.register('split-document-based')
 class SplitDocumentBasedDatasetReader(DatasetReader):
-    def read(self, documents_jsonl: str, summaries_jsonl) -> List[EvalInstance]:
+    def iter_instances(self, documents_jsonl: str, summaries_jsonl: str) -> Iterator[EvalInstance]:
         logger.info(f'Loading documents from {documents_jsonl}')
         documents_dict = {}
         with JsonlReader(documents_jsonl) as f:
@@ -74,7 +73,6 @@ class SplitDocumentBasedDatasetReader(DatasetReader):
         logger.info(f'Loaded {len(documents_dict)} document sets')
 
         logger.info(f'Loading summaries from {summaries_jsonl}')
-        instances = []
         with JsonlReader(summaries_jsonl) as f:
             for data in f:
                 fields = {}
@@ -90,6 +88,4 @@ class SplitDocumentBasedDatasetReader(DatasetReader):
                     data['summarizer_type'],
                     fields
                 )
-                instances.append(instance)
-        logger.info(f'Loaded {len(instances)} instances')
-        return instances
+                yield instance
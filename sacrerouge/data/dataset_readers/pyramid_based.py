@@ -1,7 +1,7 @@
 import logging
-from typing import List
+from typing import Iterator
 
-from sacrerouge.data import EvalInstance, Pyramid, PyramidAnnotation
+from sacrerouge.data import EvalInstance, LeaveOneOutPyramid, Pyramid, PyramidAnnotation
 from sacrerouge.data.dataset_readers import DatasetReader
 from sacrerouge.data.fields import Fields, PyramidField, PyramidAnnotationField, ReferencesField, SummaryField
 from sacrerouge.io import JsonlReader
@@ -21,9 +21,9 @@ class PyramidBasedDatasetReader(DatasetReader):
         super().__init__()
         self.include_reference_annotations = include_reference_annotations
 
-    def read(self,
-             pyramid_jsonl: str,
-             annotation_jsonl: str) -> List[EvalInstance]:
+    def iter_instances(self,
+                       pyramid_jsonl: str,
+                       annotation_jsonl: str) -> Iterator[EvalInstance]:
         logger.info(f'Loading Pyramids from {pyramid_jsonl}')
         pyramids = {}
         with JsonlReader(pyramid_jsonl, Pyramid) as f:
@@ -32,7 +32,7 @@ class PyramidBasedDatasetReader(DatasetReader):
         logger.info(f'Loaded {len(pyramids)} pyramids')
 
         logger.info(f'Loading Pyramid annotations from {annotation_jsonl}')
-        instances = []
+        num_annotations = 0
         instance_ids = set()
         with JsonlReader(annotation_jsonl, PyramidAnnotation) as f:
             for annotation in f:
@@ -47,15 +47,16 @@ class PyramidBasedDatasetReader(DatasetReader):
                     annotation.summarizer_type,
                     fields
                 )
-                instances.append(instance)
+                yield instance
+                num_annotations += 1
 
                 instance_ids.add(annotation.instance_id)
 
-            logger.info(f'Loaded {len(instances)} Pyramid annotations')
+            logger.info(f'Loaded {num_annotations} Pyramid annotations')
 
         if self.include_reference_annotations:
             logger.info(f'Generating Pyramid annotations for the reference summaries')
-            reference_instances = []
+            num_references = 0
             for instance_id in instance_ids:
                 pyramid = pyramids[instance_id]
 
@@ -63,7 +64,7 @@ class PyramidBasedDatasetReader(DatasetReader):
                 if len(pyramid.summarizer_ids) > 1:
                     for i in range(len(pyramid.summarizer_ids)):
                         annotation = pyramid.get_annotation(i)
-                        reduced_pyramid = pyramid.remove_summary(i)
+                        reduced_pyramid = LeaveOneOutPyramid(pyramid, i)
                         fields = Fields({
                             'annotation': PyramidAnnotationField(annotation),
                             'pyramid': PyramidField(reduced_pyramid)
@@ -74,9 +75,6 @@ class PyramidBasedDatasetReader(DatasetReader):
                             annotation.summarizer_type,
                             fields
                         )
-                        reference_instances.append(instance)
-            logger.info(f'Generated {len(reference_instances)} reference summary annotations')
-            instances.extend(reference_instances)
-
-        logger.info(f'Loaded a total of {len(instances)} instances')
-        return instances
+                        yield instance
+                        num_references += 1
+            logger.info(f'Generated {num_references} reference summary annotations')
@@ -1,9 +1,9 @@
 import logging
-from typing import List
+from typing import Iterator
 
 from sacrerouge.data import EvalInstance
 from sacrerouge.data.dataset_readers import DatasetReader
-from sacrerouge.data.fields import ReferencesField, Fields, SummaryField
+from sacrerouge.data.fields import FieldInterner, ReferencesField, Fields, SummaryField
 from sacrerouge.io import JsonlReader
 
 logger = logging.getLogger(__name__)
@@ -11,18 +11,20 @@ logger = logging.getLogger(__name__)
 
 @DatasetReader.register('reference-based')
 class ReferenceBasedDatasetReader(DatasetReader):
-    def read(self, input_jsonl: str) -> List[EvalInstance]:
+    def iter_instances(self, input_jsonl: str) -> Iterator[EvalInstance]:
         logger.info(f'Loading evaluation instances from {input_jsonl}')
-        instances = []
+        interner = FieldInterner()
         with JsonlReader(input_jsonl) as f:
             for data in f:
                 fields = {}
                 fields['summary'] = SummaryField(data['summary']['text'])
 
                 if 'reference' in data:
-                    fields['references'] = ReferencesField([data['reference']['text']])
+                    references = ReferencesField([data['reference']['text']])
                 else:
-                    fields['references'] = ReferencesField([reference['text'] for reference in data['references']])
+                    references = ReferencesField([reference['text'] for reference in data['references']])
+                # Summaries with the same references share one `ReferencesField`
+                fields['references'] = interner.intern(references)
                 fields = Fields(fields)
 
                 instance = EvalInstance(
@@ -31,7 +33,4 @@ class ReferenceBasedDatasetReader(DatasetReader):
                     data['summarizer_type'],
                     fields
                 )
-                instances.append(instance)
-
-            logger.info(f'Loaded {len(instances)} instances')
-            return instances
+                yield instance
@@ -1,5 +1,5 @@
 import logging
-from typing import List
+from typing import Iterator
 
 from sacrerouge.data import EvalInstance
 from sacrerouge.data.dataset_readers import DatasetReader
@@ -11,9 +11,8 @@ logger = logging.getLogger(__name__)
 
 @DatasetReader.register('summary-only')
 class SummaryOnlyDatasetReader(DatasetReader):
-    def read(self, input_jsonl: str) -> List[EvalInstance]:
+    def iter_instances(self, input_jsonl: str) -> Iterator[EvalInstance]:
         logger.info(f'Loading evaluation instances from {input_jsonl}')
-        instances = []
         with JsonlReader(input_jsonl) as f:
             for data in f:
                 fields = {}
@@ -26,7 +25,4 @@ class SummaryOnlyDatasetReader(DatasetReader):
                     data['summarizer_type'],
                     fields
                 )
-                instances.append(instance)
-
-            logger.info(f'Loaded {len(instances)} instances')
-            return instances
+                yield instance
@@ -1,10 +1,27 @@
-from typing import Any, Dict, List
+import weakref
+from typing import Any, Dict, List, Union
 
-from sacrerouge.data.pyramid import Pyramid, PyramidAnnotation
+from sacrerouge.data.pyramid import LeaveOneOutPyramid, Pyramid, PyramidAnnotation
 from sacrerouge.data.types import DocumentType, ReferenceType, SummaryType
 
 
+def _to_tuple(value: Any) -> Any:
+    # Recursively converts the lists in `value` to tuples so the value can be hashed and not modified
+    if isinstance(value, (list, tuple)):
+        return tuple(_to_tuple(item) for item in value)
+    return value
+
+
+def _to_list(value: Any) -> Any:
+    # Converts the tuples created by `_to_tuple` back to lists, which is what the metrics expect
+    if isinstance(value, tuple):
+        return [_to_list(item) for item in value]
+    return value
+
+
 class Field(object):
+    __slots__ = ()
+
     def __hash__(self) -> int:
         raise NotImplementedError
 
@@ -16,106 +33,194 @@ class Field(object):
         raise NotImplementedError
 
 
-class DocumentsField(Field):
+class _ImmutableField(Field):
+    """
+    The base class for the built-in fields, which cannot be changed after they are created. Their
+    hashes are computed once in the constructor because the fields are hashed every time the summaries
+    are grouped by their context, and hashing long documents each time is expensive.
+
+    The text fields keep their data as tuples for the hash and equality and as lists for ``to_input``,
+    which returns the same lists every time instead of copying them, so the metrics must not modify them.
+    """
+    # The fields are weakly referenced by `FieldInterner`
+    __slots__ = ('_hash', '__weakref__')
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f'{type(self).__name__} cannot be modified')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f'{type(self).__name__} cannot be modified')
+
+    def _set(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+
+
+class DocumentsField(_ImmutableField):
+    __slots__ = ('documents', '_input')
+
     def __init__(self, documents: List[DocumentType]) -> None:
-        self.documents = documents
+        self._set('documents', _to_tuple(documents))
+        self._set('_input', _to_list(self.documents))
+        self._set('_hash', hash(self.documents))
 
     def __hash__(self) -> int:
-        hashes = []
-        for document in self.documents:
-            if isinstance(document, list):
-                hashes.append(hash(tuple(document)))
-            else:
-                hashes.append(hash(document))
-        return hash(tuple(hashes))
+        return self._hash
 
     def __eq__(self, other: 'DocumentsField') -> bool:
-        return self.documents == other.documents
+        return self is other or (isinstance(other, DocumentsField) and self.documents == other.documents)
+
+    def __reduce__(self):
+        return DocumentsField, (self.to_input(),)
 
     def to_input(self) -> List[DocumentType]:
-        return self.documents
+        return self._input
+
 
+class PyramidField(_ImmutableField):
+    __slots__ = ('pyramid',)
 
-class PyramidField(Field):
-    def __init__(self, pyramid: Pyramid) -> None:
-        self.pyramid = pyramid
+    def __init__(self, pyramid: Union[Pyramid, LeaveOneOutPyramid]) -> None:
+        self._set('pyramid', pyramid)
+        self._set('_hash', hash(tuple([pyramid.instance_id] + list(pyramid.summarizer_ids))))
 
     def __hash__(self) -> int:
-        hashes = []
-        hashes.append(hash(self.pyramid.instance_id))
-        for summarizer_id in self.pyramid.summarizer_ids:
-            hashes.append(hash(summarizer_id))
-        return hash(tuple(hashes))
+        return self._hash
 
     def __eq__(self, other: 'PyramidField') -> bool:
-        return self.pyramid.instance_id == other.pyramid.instance_id and \
-               self.pyramid.summarizer_ids == other.pyramid.summarizer_ids
+        return self is other or (isinstance(other, PyramidField) and
+                                 self.pyramid.instance_id == other.pyramid.instance_id and
+                                 self.pyramid.summarizer_ids == other.pyramid.summarizer_ids)
 
-    def to_input(self) -> Pyramid:
+    def __reduce__(self):
+        return PyramidField, (self.pyramid,)
+
+    def to_input(self) -> Union[Pyramid, LeaveOneOutPyramid]:
         return self.pyramid
 
 
-class PyramidAnnotationField(Field):
+class PyramidAnnotationField(_ImmutableField):
+    __slots__ = ('annotation',)
+
     def __init__(self, annotation: PyramidAnnotation) -> None:
-        self.annotation = annotation
+        self._set('annotation', annotation)
+        self._set('_hash', hash(tuple([annotation.instance_id, annotation.summarizer_id])))
 
     def __hash__(self) -> int:
-        return hash(tuple([self.annotation.instance_id, self.annotation.summarizer_id]))
+        return self._hash
 
     def __eq__(self, other: 'PyramidAnnotationField') -> bool:
-        return self.annotation.instance_id == other.annotation.instance_id and \
-               self.annotation.summarizer_id == other.annotation.summarizer_id
+        return self is other or (isinstance(other, PyramidAnnotationField) and
+                                 self.annotation.instance_id == other.annotation.instance_id and
+                                 self.annotation.summarizer_id == other.annotation.summarizer_id)
+
+    def __reduce__(self):
+        return PyramidAnnotationField, (self.annotation,)
 
     def to_input(self) -> PyramidAnnotation:
         return self.annotation
 
 
-class ReferencesField(Field):
+class ReferencesField(_ImmutableField):
+    __slots__ = ('references', '_input')
+
     def __init__(self, references: List[ReferenceType]) -> None:
-        self.references = references
+        self._set('references', _to_tuple(references))
+        self._set('_input', _to_list(self.references))
+        self._set('_hash', hash(self.references))
 
     def __hash__(self) -> int:
-        hashes = []
-        for reference in self.references:
-            if isinstance(reference, list):
-                hashes.append(hash(tuple(reference)))
-            else:
-                hashes.append(hash(reference))
-        return hash(tuple(hashes))
+        return self._hash
 
     def __eq__(self, other: 'ReferencesField') -> bool:
-        return self.references == other.references
+        return self is other or (isinstance(other, ReferencesField) and self.references == other.references)
+
+    def __reduce__(self):
+        return ReferencesField, (self.to_input(),)
 
     def to_input(self) -> List[ReferenceType]:
-        return self.references
+        return self._input
+
 
+class SummaryField(_ImmutableField):
+    __slots__ = ('summary', '_input')
 
-class SummaryField(Field):
     def __init__(self, summary: SummaryType) -> None:
-        self.summary = summary
+        self._set('summary', _to_tuple(summary))
+        self._set('_input', _to_list(self.summary))
+        self._set('_hash', hash(self.summary))
 
     def __hash__(self) -> int:
-        if isinstance(self.summary, list):
-            return hash(tuple(self.summary))
-        return hash(self.summary)
+        return self._hash
 
     def __eq__(self, other: 'SummaryField') -> bool:
-        return self.summary == other.summary
+        return self is other or (isinstance(other, SummaryField) and self.summary == other.summary)
+
+    def __reduce__(self):
+        return SummaryField, (self.to_input(),)
 
     def to_input(self) -> SummaryType:
-        return self.summary
+        return self._input
+
+
+class FieldInterner(object):
+    """
+    Returns one shared object for all of the fields which are equal. The dataset readers use it so
+    that the context which is shared by many summaries, such as their references or documents, is
+    only kept in memory once and grouping the summaries by context compares identical objects.
+
+    The fields are only weakly referenced, so a field is forgotten once nothing else uses it. The memory
+    therefore depends on the instances which are still in use (e.g., the current chunk) rather than on
+    the size of the dataset. The fields are looked up by their hash, and if two unequal fields have the
+    same hash, the newer one replaces the older one.
+    """
+    def __init__(self) -> None:
+        self._fields = weakref.WeakValueDictionary()
+
+    def intern(self, field: Field) -> Field:
+        key = (type(field), hash(field))
+        existing = self._fields.get(key)
+        if existing is not None and existing == field:
+            return existing
+        self._fields[key] = field
+        return field
+
+    def __len__(self) -> int:
+        return len(self._fields)
 
 
 class Fields(dict):
+    """
+    A mapping from the name of each field to the ``Field``. ``Fields`` cannot be changed after they
+    are created, so their hash is only computed once. To replace a field, create a new ``Fields``::
+
+        jk_fields = Fields({**fields, 'references': ReferencesField(references)})
+    """
+    __slots__ = ('_hash',)
+
     def __init__(self, fields: Dict[str, Field]) -> None:
         super().__init__()
         for name, field in fields.items():
             assert isinstance(field, Field)
-            self[name] = field
+            dict.__setitem__(self, name, field)
+        self._hash = hash(tuple([self[name] for name in sorted(self.keys())]))
 
     def select_fields(self, names: List[str]) -> 'Fields':
         return Fields({name: self[name] for name in names})
 
     def __hash__(self) -> int:
-        fields_tuple = tuple([self[name] for name in sorted(self.keys())])
-        return hash(fields_tuple)
+        return self._hash
+
+    def __reduce__(self):
+        return Fields, (dict(self),)
+
+    def _raise_immutable(self, *args, **kwargs) -> None:
+        raise Exception(f'Fields cannot be modified. Create a new Fields object instead')
+
+    __setitem__ = _raise_immutable
+    __delitem__ = _raise_immutable
+    clear = _raise_immutable
+    pop = _raise_immutable
+    popitem = _raise_immutable
+    setdefault = _raise_immutable
+    update = _raise_immutable
+    __ior__ = _raise_immutable
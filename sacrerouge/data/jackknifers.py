@@ -2,7 +2,7 @@ from overrides import overrides
 from typing import List
 
 from sacrerouge.data.fields import Fields, PyramidField, ReferencesField
-from sacrerouge.data.pyramid import Pyramid
+from sacrerouge.data.pyramid import LeaveOneOutPyramid, Pyramid
 
 
 class Jackknifer(object):
@@ -57,8 +57,8 @@ class ReferencesJackknifer(Jackknifer):
         jk_fields_list = []
         for i in range(len(references_field.references)):
             # Copy the original fields and replace the references
-            jk_fields = Fields(fields)
-            jk_fields['references'] = ReferencesField(references_field.references[:i] + references_field.references[i + 1:])
+            references = references_field.references[:i] + references_field.references[i + 1:]
+            jk_fields = Fields({**fields, 'references': ReferencesField(references)})
             jk_fields_list.append(jk_fields)
         return jk_fields_list
 
@@ -76,8 +76,7 @@ class PyramidJackknifer(Jackknifer):
 
         jk_fields_list = []
         for i in range(len(pyramid.summarizer_ids)):
-            # Copy the original fields and replace the pyramid
-            jk_fields = Fields(fields)
-            jk_fields['pyramid'] = PyramidField(pyramid.remove_summary(i))
+            # Copy the original fields and replace the pyramid with a view that does not copy the SCUs
+            jk_fields = Fields({**fields, 'pyramid': PyramidField(LeaveOneOutPyramid(pyramid, i))})
             jk_fields_list.append(jk_fields)
         return jk_fields_list
@@ -1,6 +1,7 @@
 import copy
+import numpy as np
 import pytest
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 ValueType = Union['MetricsDict', float, List[float]]
 
@@ -96,6 +97,70 @@ class MetricsDict(dict):
             result[key] = value / denominator
         return result
 
+    @staticmethod
+    def _get_schema(metrics_dict: 'MetricsDict') -> Tuple:
+        # The nested (key, schema) pairs of the dictionary, where the schema of a number is `None`
+        schema = []
+        for key, value in metrics_dict.items():
+            if isinstance(value, dict):
+                schema.append((key, MetricsDict._get_schema(value)))
+            else:
+                schema.append((key, None))
+        return tuple(schema)
+
+    @staticmethod
+    def _get_values(metrics_dict: Dict, schema: Tuple, values: List[float]) -> bool:
+        # Appends the numbers in `metrics_dict` to `values` in the order of `schema`. Returns `False` if the
+        # dictionary does not have the same keys as the schema or one of its values is not a number
+        if len(metrics_dict) != len(schema):
+            return False
+        for key, child_schema in schema:
+            value = dict.get(metrics_dict, key)
+            if child_schema is None:
+                if not isinstance(value, (int, float)):
+                    return False
+                values.append(value)
+            elif not isinstance(value, dict) or not MetricsDict._get_values(value, child_schema, values):
+                return False
+        return True
+
+    @staticmethod
+    def _from_values(schema: Tuple, values: List[float], offset: int) -> Tuple['MetricsDict', int]:
+        result = MetricsDict()
+        for key, child_schema in schema:
+            if child_schema is None:
+                dict.__setitem__(result, key, values[offset])
+                offset += 1
+            else:
+                value, offset = MetricsDict._from_values(child_schema, values, offset)
+                dict.__setitem__(result, key, value)
+        return result, offset
+
+    @staticmethod
+    def mean(metrics_list: List['MetricsDict']) -> 'MetricsDict':
+        """
+        Computes the same result as ``sum(metrics_list) / len(metrics_list)``. The numbers in the dictionaries
+        are copied into one array with a column per metric and summed in the same order, which is much faster
+        than adding the dictionaries one at a time. Dictionaries which do not all have the same keys or which
+        have values that are not numbers fall back to adding the dictionaries.
+        """
+        if len(metrics_list) == 0:
+            return sum(metrics_list) / len(metrics_list)
+
+        # `sum` returns the keys in the order of the last dictionary
+        schema = MetricsDict._get_schema(metrics_list[-1])
+        rows = []
+        for metrics_dict in metrics_list:
+            values = []
+            if not MetricsDict._get_values(metrics_dict, schema, values):
+                return sum(metrics_list) / len(metrics_list)
+            rows.append(values)
+
+        # `np.sum` uses pairwise summation for some shapes, but `np.cumsum` adds the rows in order like `sum`
+        totals = np.cumsum(np.array(rows, dtype=np.float64), axis=0)[-1]
+        means = (totals / len(metrics_list)).tolist()
+        return MetricsDict._from_values(schema, means, 0)[0]
+
     def approx_equal(self, other: 'MetricsDict', rel=None, abs=None):
         if self.keys() != other.keys():
             return False
@@ -127,11 +127,10 @@ class Pyramid(object):
 
     def get_scu_id_set(self, index: int) -> Set[int]:
         scus = set()
-        for i in range(len(self.summaries)):
-            for scu in self.scus:
-                for contributor in scu.contributors:
-                    if contributor.summary_index == index:
-                        scus.add(scu.scu_id)
+        for scu in self.scus:
+            for contributor in scu.contributors:
+                if contributor.summary_index == index:
+                    scus.add(scu.scu_id)
         return scus
 
     @staticmethod
@@ -273,6 +272,68 @@ class Pyramid(object):
         return Pyramid(instance_id, summaries, summarizer_ids, scus)
 
 
+class LeaveOneOutPyramid(object):
+    """
+    A view of a ``Pyramid`` with the summary at ``removed_index`` left out. It behaves like
+    ``pyramid.remove_summary(removed_index)``, but it does not copy the SCUs unless ``scus``
+    is accessed, so creating one for every summary of every pyramid is cheap.
+
+    Parameters
+    ----------
+    pyramid: ``Pyramid``
+        The full pyramid.
+    removed_index: ``int``
+        The index of the summary which is left out.
+    """
+    def __init__(self, pyramid: Pyramid, removed_index: int) -> None:
+        self.pyramid = pyramid
+        self.removed_index = removed_index
+        self._materialized = None
+
+    @property
+    def instance_id(self) -> str:
+        return self.pyramid.instance_id
+
+    @property
+    def summaries(self) -> List[str]:
+        return self.pyramid.summaries[:self.removed_index] + self.pyramid.summaries[self.removed_index + 1:]
+
+    @property
+    def summarizer_ids(self) -> List[str]:
+        return self.pyramid.summarizer_ids[:self.removed_index] + self.pyramid.summarizer_ids[self.removed_index + 1:]
+
+    @property
+    def scus(self) -> List[SCU]:
+        return self.to_pyramid().scus
+
+    def to_pyramid(self) -> Pyramid:
+        """Returns the equivalent ``Pyramid``, which is only created the first time this is called."""
+        if self._materialized is None:
+            self._materialized = self.pyramid.remove_summary(self.removed_index)
+        return self._materialized
+
+    def _get_full_index(self, index: int) -> int:
+        # Maps the index of a summary in this view to its index in the full pyramid
+        return index if index < self.removed_index else index + 1
+
+    def remove_summary(self, index: int) -> Pyramid:
+        return self.to_pyramid().remove_summary(index)
+
+    def get_annotation(self, index: int) -> 'PyramidAnnotation':
+        return self.pyramid.get_annotation(self._get_full_index(index))
+
+    def get_scu_id_set(self, index: int) -> Set[int]:
+        return self.pyramid.get_scu_id_set(self._get_full_index(index))
+
+    def __hash__(self) -> int:
+        return hash((self.instance_id, tuple(self.summarizer_ids)))
+
+    def __eq__(self, other: 'LeaveOneOutPyramid') -> bool:
+        return isinstance(other, LeaveOneOutPyramid) and \
+               self.instance_id == other.instance_id and \
+               self.summarizer_ids == other.summarizer_ids
+
+
 class PyramidAnnotation(object):
     def __init__(self,
                  instance_id: str,
@@ -1,2 +1,3 @@
 from sacrerouge.io.jsonl_writer import JsonlWriter
 from sacrerouge.io.jsonl_reader import JsonlReader
+from sacrerouge.io.score_store import ScoreStore
@@ -0,0 +1,156 @@
+"""
+A fast path for the (de)serialization done by the ``JsonlReader`` and ``JsonlWriter``. The
+jsons library inspects the type hints and attributes of every object it (de)serializes,
+which is slow for large files. For plain json data, ``Metrics``, ``Pyramid``, and
+``PyramidAnnotation``, the functions here convert between the objects and the standard
+library's json instead. They produce exactly the same output as jsons and fall back to
+jsons for anything else.
+"""
+import json
+import jsons
+from typing import Any, Dict, List, Optional, Type
+
+from sacrerouge.data import LeaveOneOutPyramid, Metrics, MetricsDict, Pyramid, PyramidAnnotation
+from sacrerouge.data.pyramid import Contributor, ContributorAnnotation, Part, SCU, SCUAnnotation
+
+# jsons serializes plain objects as their attributes in sorted order
+_OBJECT_FIELDS = {
+    Pyramid: ('instance_id', 'scus', 'summaries', 'summarizer_ids'),
+    PyramidAnnotation: ('instance_id', 'scus', 'summarizer_id', 'summarizer_type', 'summary'),
+    SCU: ('contributors', 'label', 'scu_id'),
+    SCUAnnotation: ('contributors', 'label', 'scu_id'),
+    Contributor: ('label', 'parts', 'summary_index'),
+    ContributorAnnotation: ('label', 'parts'),
+    Part: ('end', 'start', 'text'),
+}
+
+
+class _UnsupportedType(Exception):
+    pass
+
+
+def _leave_one_out_pyramid_to_json_data(view: LeaveOneOutPyramid) -> Dict:
+    # The same data as `view.pyramid.remove_summary(view.removed_index)`, which is built from the full pyramid
+    # without creating the new `Pyramid`
+    removed_index = view.removed_index
+    scus = []
+    for scu in view.pyramid.scus:
+        contributors = []
+        for contributor in scu.contributors:
+            summary_index = contributor.summary_index
+            if summary_index != removed_index:
+                if summary_index > removed_index:
+                    summary_index -= 1
+                contributors.append({
+                    'label': contributor.label,
+                    'parts': contributor.parts,
+                    'summary_index': summary_index
+                })
+        if len(contributors) > 0:
+            scus.append({'contributors': contributors, 'label': scu.label, 'scu_id': scu.scu_id})
+    return {
+        'instance_id': view.instance_id,
+        'scus': scus,
+        'summaries': view.summaries,
+        'summarizer_ids': view.summarizer_ids
+    }
+
+
+def _to_json_data(value: Any) -> Dict:
+    # Called by `json.dumps` for every object which is not already json data
+    value_type = type(value)
+    if value_type is Metrics:
+        return Metrics.serialize(value)
+    if value_type is LeaveOneOutPyramid:
+        # Serialized the same as the pyramid with the summary removed
+        return _leave_one_out_pyramid_to_json_data(value)
+    fields = _OBJECT_FIELDS.get(value_type)
+    if fields is not None and vars(value).keys() == set(fields):
+        return {field: getattr(value, field) for field in fields}
+    raise _UnsupportedType
+
+
+def dumps(obj: Any) -> str:
+    """Serializes ``obj`` to the same json string as ``jsons.dumps(obj)``."""
+    try:
+        return json.dumps(obj, default=_to_json_data)
+    except _UnsupportedType:
+        return jsons.dumps(obj)
+
+
+def _check_fields(data: Dict, cls: Type) -> bool:
+    # jsons sets any extra keys as attributes on the object, so only data with the expected keys uses the fast path
+    if not isinstance(data, dict) or not data.keys() <= _LOADER_FIELDS[cls]:
+        raise KeyError
+    return True
+
+
+def _to_metrics_dict(data: Optional[Dict]) -> MetricsDict:
+    # `MetricsDict.__setitem__` converts the nested dictionaries without the deep copy done by its constructor
+    metrics_dict = MetricsDict()
+    if data:
+        for key, value in data.items():
+            metrics_dict[key] = value
+    return metrics_dict
+
+
+def _load_metrics(data: Dict) -> Metrics:
+    _check_fields(data, Metrics)
+    metrics = Metrics(data['instance_id'], data['summarizer_id'], data['summarizer_type'])
+    metrics.metrics = _to_metrics_dict(data.get('metrics'))
+    return metrics
+
+
+def _load_parts(parts: List[Dict]) -> List[Part]:
+    return [Part(part['text'], part['start'], part['end']) for part in parts if _check_fields(part, Part)]
+
+
+def _load_pyramid(data: Dict) -> Pyramid:
+    _check_fields(data, Pyramid)
+    scus = []
+    for scu in data['scus']:
+        _check_fields(scu, SCU)
+        contributors = []
+        for contributor in scu['contributors']:
+            _check_fields(contributor, Contributor)
+            parts = _load_parts(contributor['parts'])
+            contributors.append(Contributor(contributor['summary_index'], contributor['label'], parts))
+        scus.append(SCU(scu['scu_id'], scu['label'], contributors))
+    return Pyramid(data['instance_id'], data['summaries'], data['summarizer_ids'], scus)
+
+
+def _load_pyramid_annotation(data: Dict) -> PyramidAnnotation:
+    _check_fields(data, PyramidAnnotation)
+    scus = []
+    for scu in data['scus']:
+        _check_fields(scu, SCUAnnotation)
+        contributors = []
+        for contributor in scu['contributors']:
+            _check_fields(contributor, ContributorAnnotation)
+            contributors.append(ContributorAnnotation(contributor['label'], _load_parts(contributor['parts'])))
+        scus.append(SCUAnnotation(scu['scu_id'], scu['label'], contributors))
+    return PyramidAnnotation(data['instance_id'], data['summarizer_id'], data['summarizer_type'], data['summary'], scus)
+
+
+_LOADER_FIELDS = {cls: set(fields) for cls, fields in _OBJECT_FIELDS.items()}
+_LOADER_FIELDS[Metrics] = {'instance_id', 'summarizer_id', 'summarizer_type', 'metrics'}
+
+_LOADERS = {
+    Metrics: _load_metrics,
+    Pyramid: _load_pyramid,
+    PyramidAnnotation: _load_pyramid_annotation,
+}
+
+
+def loads(string: str, cls: Optional[Type] = None) -> Any:
+    """Deserializes ``string`` into the same object as ``jsons.loads(string, cls)``."""
+    data = json.loads(string)
+    if cls is None:
+        return data
+    loader = _LOADERS.get(cls)
+    if loader is not None and isinstance(data, dict):
+        try:
+            return loader(data)
+        except (KeyError, TypeError):
+            pass
+    return jsons.load(data, cls)
@@ -0,0 +1,145 @@
+import json
+import logging
+import numpy as np
+import os
+from typing import List, Tuple, Union
+
+from sacrerouge.data import Metrics
+from sacrerouge.io.jsonl_reader import JsonlReader
+
+logger = logging.getLogger(__name__)
+
+
+class ScoreStore(object):
+    """
+    The ``ScoreStore`` is a columnar copy of the scores in one or more metrics jsonl files
+    which can be loaded much faster than parsing the jsonl files. Each row of the store is
+    one (instance_id, summarizer_id, summarizer_type) after all of the ``Metrics`` for that
+    summary have been merged, and each flattened metric is saved as its own ``.npy`` file
+    of averaged values, with ``np.nan`` for rows which do not have the metric. The columns
+    are memory-mapped the first time they are accessed, so only the metrics which are used
+    are read from disk.
+
+    The store is created once with ``ScoreStore.build`` and then opened by passing
+    its directory to the constructor::
+
+        store = ScoreStore.build(['/path/to/metrics.jsonl'], '/path/to/store')
+        X, Y = ScoreStore('/path/to/store').get_matrices('peer', 'rouge-1_recall', 'grade')
+
+    Parameters
+    ----------
+    path: ``str``
+        The directory with the score store.
+    """
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(os.path.join(path, 'metadata.json'), 'r') as f:
+            metadata = json.load(f)
+        self.num_rows = metadata['num_rows']
+        self.column_names = metadata['columns']
+        self._column_indices = {name: i for i, name in enumerate(self.column_names)}
+        self._columns = {}
+        self._keys = None
+
+    @staticmethod
+    def is_score_store(path: str) -> bool:
+        return os.path.isdir(path) and os.path.isfile(os.path.join(path, 'metadata.json'))
+
+    @staticmethod
+    def build(metrics_files: List[str], output_dir: str) -> 'ScoreStore':
+        """
+        Creates a score store in ``output_dir`` from the metrics in ``metrics_files``. Metrics which have
+        a non-numeric value for any summary are not included in the store.
+        """
+        logger.info(f'Loading metrics from {metrics_files}')
+        merged = {}
+        for metrics_file in metrics_files:
+            with JsonlReader(metrics_file, Metrics) as f:
+                for metrics in f:
+                    key = (metrics.instance_id, metrics.summarizer_id)
+                    if key in merged:
+                        merged[key].merge(metrics)
+                    else:
+                        merged[key] = metrics
+        logger.info(f'Loaded {len(merged)} merged metrics objects')
+
+        num_rows = len(merged)
+        columns = {}
+        skipped = set()
+        instance_ids, summarizer_ids, summarizer_types = [], [], []
+        for row, metrics in enumerate(merged.values()):
+            instance_ids.append(metrics.instance_id)
+            summarizer_ids.append(metrics.summarizer_id)
+            summarizer_types.append(metrics.summarizer_type)
+            for name, value in metrics.metrics.flatten_keys().average_values().items():
+                if name in skipped:
+                    continue
+                if not isinstance(value, (int, float)):
+                    skipped.add(name)
+                    columns.pop(name, None)
+                    continue
+                if name not in columns:
+                    columns[name] = np.full(num_rows, np.nan)
+                columns[name][row] = value
+
+        for name in sorted(skipped):
+            logger.warning(f'Skipping metric "{name}" because it has non-numeric values')
+
+        os.makedirs(output_dir, exist_ok=True)
+        column_names = sorted(columns.keys())
+        for i, name in enumerate(column_names):
+            np.save(os.path.join(output_dir, f'column-{i}.npy'), columns[name])
+        np.save(os.path.join(output_dir, 'instance_ids.npy'), np.array(instance_ids, dtype=str))
+        np.save(os.path.join(output_dir, 'summarizer_ids.npy'), np.array(summarizer_ids, dtype=str))
+        np.save(os.path.join(output_dir, 'summarizer_types.npy'), np.array(summarizer_types, dtype=str))
+        with open(os.path.join(output_dir, 'metadata.json'), 'w') as out:
+            out.write(json.dumps({'num_rows': num_rows, 'columns': column_names, 'metrics_files': metrics_files}, indent=2))
+        logger.info(f'Saved {len(column_names)} metrics for {num_rows} summaries to {output_dir}')
+        return ScoreStore(output_dir)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._column_indices
+
+    def get_keys(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the instance_ids, summarizer_ids, and summarizer_types of the rows."""
+        if self._keys is None:
+            self._keys = tuple(np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode='r')
+                               for name in ['instance_ids', 'summarizer_ids', 'summarizer_types'])
+        return self._keys
+
+    def get_column(self, name: str) -> np.ndarray:
+        """Returns the (read-only) values of the metric ``name`` for every row."""
+        if name not in self._columns:
+            if name not in self._column_indices:
+                raise Exception(f'Metric "{name}" is not in the score store {self.path}')
+            index = self._column_indices[name]
+            self._columns[name] = np.load(os.path.join(self.path, f'column-{index}.npy'), mmap_mode='r')
+        return self._columns[name]
+
+    def get_matrices(self, summarizer_type: str, *metric_names: str) -> Union[np.ndarray, List[np.ndarray]]:
+        """
+        Creates the same matrices as filtering the metrics to ``summarizer_type`` and the summaries which
+        have all of ``metric_names``, then calling ``sacrerouge.stats.convert_to_matrices``.
+        """
+        instance_ids, summarizer_ids, summarizer_types = self.get_keys()
+        columns = [self.get_column(name) for name in metric_names]
+
+        keep = np.ones(self.num_rows, dtype=bool)
+        if summarizer_type != 'all':
+            keep &= summarizer_types == summarizer_type
+        for column in columns:
+            keep &= ~np.isnan(column)
+        logger.info(f'{keep.sum()} instances remain after filtering')
+
+        # `np.unique` sorts the ids the same way as `convert_to_matrices`
+        instances, instance_indices = np.unique(instance_ids[keep], return_inverse=True)
+        summarizers, summarizer_indices = np.unique(summarizer_ids[keep], return_inverse=True)
+        matrices = []
+        for column in columns:
+            matrix = np.full((len(summarizers), len(instances)), np.nan)
+            matrix[summarizer_indices, instance_indices] = column[keep]
+            matrices.append(matrix)
+
+        if len(matrices) == 1:
+            return matrices[0]
+        return matrices
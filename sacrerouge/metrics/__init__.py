@@ -15,6 +15,7 @@ from sacrerouge.metrics.python_rouge import PythonRouge
 from sacrerouge.metrics.qaeval import QAEval
 from sacrerouge.metrics.rouge import Rouge
 from sacrerouge.metrics.s3 import S3
+from sacrerouge.metrics.sharded import ShardedMetric
 from sacrerouge.metrics.simetrix import SIMetrix
 from sacrerouge.metrics.sumqe import SumQE
 from sacrerouge.metrics.supert import SUPERT
@@ -9,6 +9,7 @@ from typing import List, Tuple
 
 from sacrerouge.commands import MetricSetupSubcommand
 from sacrerouge.common import DATA_ROOT, TemporaryDirectory
+from sacrerouge.common.profiler import PROFILER
 from sacrerouge.common.util import command_exists, download_file_from_google_drive
 from sacrerouge.data import MetricsDict
 from sacrerouge.data.types import ReferenceType, SummaryType
@@ -238,10 +239,15 @@ class BEwTE(ReferenceBasedMetric):
         with TemporaryDirectory() as temp_dir:
             self._save_summaries(temp_dir, summaries_list, references_list)
 
-            self._run_step1(temp_dir)
-            self._run_step2(temp_dir)
-            self._run_step3(temp_dir)
-            stdout = self._run_step4(temp_dir)
+            num_summaries = sum(len(summaries) for summaries in summaries_list)
+            with PROFILER.stage('BEwTE/subprocess_step1', num_summaries):
+                self._run_step1(temp_dir)
+            with PROFILER.stage('BEwTE/subprocess_step2', num_summaries):
+                self._run_step2(temp_dir)
+            with PROFILER.stage('BEwTE/subprocess_step3', num_summaries):
+                self._run_step3(temp_dir)
+            with PROFILER.stage('BEwTE/subprocess_step4', num_summaries):
+                stdout = self._run_step4(temp_dir)
 
             # There is a weird way to score a summary given multiple references
             # in the original code. They multiply the highest recall score by
@@ -250,7 +256,8 @@ class BEwTE(ReferenceBasedMetric):
             # (See https://github.com/igorbrigadir/ROUGE-BEwTE/blob/f69a85556c889b805c89c5c71d7b77a983e75a05/src/main/java/bewte/BEwT_E.java#L419)
             # I don't understand this because it depends on the order that the
             # summaries are processed. We instead compute the average over the references.
-            metrics_lists = self._parse_stdout(stdout)
+            with PROFILER.stage('BEwTE/parse_output', num_summaries):
+                metrics_lists = self._parse_stdout(stdout)
             return metrics_lists
 
 
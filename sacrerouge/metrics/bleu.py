@@ -13,6 +13,8 @@ logger = logging.getLogger(__name__)
 
 @Metric.register('sent-bleu')
 class SentBleu(ReferenceBasedMetric):
+    cpu_bound = True
+
     def __init__(self, **kwargs) -> None:
         """
         Args:
@@ -1,5 +1,5 @@
 import logging
-from typing import List
+from typing import Any, List
 
 import sacrebleu
 
@@ -14,6 +14,9 @@ logger = logging.getLogger(__name__)
 
 @Metric.register('chrf')
 class ChrF(ReferenceBasedMetric):
+    cpu_bound = True
+    decomposes_by_reference = True
+
     def __init__(self, **kwargs) -> None:
         """
         Args:
@@ -38,3 +41,21 @@ class ChrF(ReferenceBasedMetric):
                 score = self.chrf.sentence_score(summary, references)
                 scores_list[-1].append(MetricsDict({'chrf': score.score}))
         return scores_list
+
+    def score_reference_statistics_all(
+        self,
+        summaries: List[SummaryType],
+        references_list: List[List[ReferenceType]],
+    ) -> List[List[Any]]:
+        # With multiple references, sacrebleu uses the reference with the best score
+        statistics_list = []
+        for summary, references in zip(summaries, references_list):
+            summary = flatten(summary)
+            statistics_list.append([
+                self.chrf.sentence_score(summary, [flatten(reference)]).score
+                for reference in references
+            ])
+        return statistics_list
+
+    def combine_reference_statistics(self, statistics: List[Any]) -> MetricsDict:
+        return MetricsDict({'chrf': max(statistics)})
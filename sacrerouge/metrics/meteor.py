@@ -8,6 +8,7 @@ from typing import List, Dict, Tuple
 
 from sacrerouge.commands import MetricSetupSubcommand
 from sacrerouge.common import DATA_ROOT, TemporaryDirectory
+from sacrerouge.common.profiler import PROFILER
 from sacrerouge.data import MetricsDict
 from sacrerouge.data.types import ReferenceType, SummaryType
 from sacrerouge.metrics import Metric, ReferenceBasedMetric
@@ -98,10 +99,13 @@ class Meteor(ReferenceBasedMetric):
             ]
 
             logger.info(f'Running METEOR command: "{command}"')
-            process = Popen(command, stdout=PIPE, stderr=PIPE)
-            stdout, _ = process.communicate()
+            # Every (summary, reference) pair is one line of the input
+            with PROFILER.stage('Meteor/subprocess', index):
+                process = Popen(command, stdout=PIPE, stderr=PIPE)
+                stdout, _ = process.communicate()
 
-            final_score, individual_scores = self._parse_meteor_stdout(stdout.decode())
+            with PROFILER.stage('Meteor/parse_output', index):
+                final_score, individual_scores = self._parse_meteor_stdout(stdout.decode())
 
             macro_metrics = MetricsDict({'METEOR': final_score})
             micro_metrics_list = self._aggregate_summary_scores(summaries_list, references_list, tuple_to_indices, individual_scores)
@@ -7,6 +7,10 @@ from sacrerouge.data.types import DocumentType, ReferenceType, SummaryType
 
 
 class Metric(Registrable):
+    # Indicates the metric is implemented in pure Python and is limited by the CPU. When metrics are run in
+    # parallel, these metrics are run in separate processes instead of threads
+    cpu_bound = False
+
     def __init__(self,
                  required_summary_fields: List[str],
                  required_context_fields: List[str],
@@ -31,7 +35,7 @@ class Metric(Registrable):
         raise NotImplementedError
 
     def aggregate(self, metrics_list: List[MetricsDict]) -> MetricsDict:
-        return sum(metrics_list) / len(metrics_list)
+        return MetricsDict.mean(metrics_list)
 
     def requires_jackknifing(self) -> bool:
         return self.jackknifer is not None
@@ -69,7 +73,15 @@ class ReferenceBasedMetric(SummaryBasedMetric):
     """
     This is a dummy class that was created to explicitly define the method arguments. It makes the autocomplete
     in some libraries more helpful by supplying argument names like "references" instead of "*args".
+
+    Metrics whose score for a set of references can be computed from statistics which are calculated for each
+    reference separately (e.g., the n-gram matches in ROUGE) can set `decomposes_by_reference` and implement
+    `score_reference_statistics_all` and `combine_reference_statistics`. Then each (summary, reference) pair
+    is only compared once when the summary is scored against many subsets of the same references, such as
+    during jackknifing.
     """
+    decomposes_by_reference = False
+
     def __init__(self):
         super().__init__(['summary'], ['references'], jackknifer=ReferencesJackknifer())
 
@@ -88,6 +100,20 @@ class ReferenceBasedMetric(SummaryBasedMetric):
     def evaluate(self, summaries: List[SummaryType], references_list: List[List[ReferenceType]]) -> Tuple[MetricsDict, List[MetricsDict]]:
         return super().evaluate(summaries, references_list)
 
+    def score_reference_statistics_all(self, summaries: List[SummaryType], references_list: List[List[ReferenceType]]) -> List[List[Any]]:
+        """
+        Returns the statistics for each summary and each of its references separately, so entry `[i][j]` is
+        for `summaries[i]` and `references_list[i][j]`.
+        """
+        raise NotImplementedError
+
+    def combine_reference_statistics(self, statistics: List[Any]) -> MetricsDict:
+        """
+        Combines the statistics of one summary and each reference in a set of references into the same
+        result as scoring the summary against that set.
+        """
+        raise NotImplementedError
+
 
 class DocumentBasedMetric(SummaryBasedMetric):
     """
@@ -135,3 +161,16 @@ class ReferenceFreeMetric(SummaryBasedMetric):
 
     def evaluate(self, summaries: List[SummaryType]) -> Tuple[MetricsDict, List[MetricsDict]]:
         return super().evaluate(summaries)
+
+
+def scores_summaries_independently(metric: Metric) -> bool:
+    """
+    Returns ``True`` if the metric's ``evaluate`` scores every summary independently and then aggregates the
+    results, in which case the summaries can be scored in any number of separate calls.
+    """
+    return type(metric).evaluate in {
+        SummaryBasedMetric.evaluate,
+        ReferenceBasedMetric.evaluate,
+        DocumentBasedMetric.evaluate,
+        ReferenceFreeMetric.evaluate
+    }
@@ -1,12 +1,97 @@
 import math
 from collections import Counter
-from typing import List, Tuple
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Tuple, Union
 
-from sacrerouge.data import MetricsDict, Pyramid, PyramidAnnotation
+from sacrerouge.data import LeaveOneOutPyramid, MetricsDict, Pyramid, PyramidAnnotation
 from sacrerouge.data.jackknifers import PyramidJackknifer
 from sacrerouge.metrics import Metric
 
 
+class PyramidIndex(object):
+    """
+    The statistics of a ``Pyramid`` which are needed to calculate the modified pyramid score of any
+    annotation. They are computed once when the index is created and should not be changed afterward.
+
+    The index of a ``LeaveOneOutPyramid`` is derived from the index of its full pyramid without
+    copying the SCUs. If the full pyramid's index is already available, ``remove_summary`` should be
+    used to create it instead.
+
+    Parameters
+    ----------
+    pyramid: ``Union[Pyramid, LeaveOneOutPyramid]``
+        The pyramid to index.
+    """
+    def __init__(self, pyramid: Union[Pyramid, LeaveOneOutPyramid]) -> None:
+        if isinstance(pyramid, LeaveOneOutPyramid):
+            index = PyramidIndex(pyramid.pyramid).remove_summary(pyramid.removed_index)
+            self._initialize(index.scus, index.summary_scu_ids)
+            return
+
+        # The (SCU id, indices of the summaries which contributed to it) for each SCU. The weight
+        # of the SCU is the number of unique summaries, as in `SCU.get_weight`
+        scus = []
+        summary_scu_ids = [set() for _ in pyramid.summarizer_ids]
+        for scu in pyramid.scus:
+            summary_indices = frozenset(contributor.summary_index for contributor in scu.contributors)
+            scus.append((scu.scu_id, summary_indices))
+            for summary_index in summary_indices:
+                if 0 <= summary_index < len(summary_scu_ids):
+                    summary_scu_ids[summary_index].add(scu.scu_id)
+        self._initialize(tuple(scus), tuple(frozenset(scu_ids) for scu_ids in summary_scu_ids))
+
+    def _initialize(self,
+                    scus: Tuple[Tuple[int, FrozenSet[int]], ...],
+                    summary_scu_ids: Tuple[FrozenSet[int], ...]) -> None:
+        self.scus = scus
+        self.summary_scu_ids = summary_scu_ids
+
+        # Create a mapping from the SCU id to its weight and count how many are at each weight
+        scu_id_to_weight = {}
+        weight_to_num_scus = Counter()
+        for scu_id, summary_indices in scus:
+            weight = len(summary_indices)
+            scu_id_to_weight[scu_id] = weight
+            weight_to_num_scus[weight] += 1
+        self.scu_id_to_weight = MappingProxyType(scu_id_to_weight)
+        self.weight_to_num_scus = MappingProxyType(dict(weight_to_num_scus))
+
+        # `ideal_weights[k]` is the weight of an ideal summary with `k` SCUs, which takes the highest weighted SCUs first
+        ideal_weights = [0]
+        for weight in sorted(weight_to_num_scus.keys(), reverse=True):
+            for _ in range(weight_to_num_scus[weight]):
+                ideal_weights.append(ideal_weights[-1] + weight)
+        self.ideal_weights = tuple(ideal_weights)
+
+        # The ideal weight for the pyramid uses the average number of SCUs in the pyramid summaries
+        total_scus = sum(len(scu_ids) for scu_ids in self.summary_scu_ids)
+        average_num_scus = total_scus / len(self.summary_scu_ids)
+        self.ideal_weight = self.get_ideal_weight(int(math.ceil(average_num_scus)))
+
+    def get_ideal_weight(self, num_scus: int) -> int:
+        """Returns the weight of an ideal summary with ``num_scus`` SCUs."""
+        return self.ideal_weights[max(0, min(num_scus, len(self.ideal_weights) - 1))]
+
+    def remove_summary(self, index: int) -> 'PyramidIndex':
+        """
+        Returns the index of the pyramid with the summary at ``index`` removed, which is identical to
+        indexing ``pyramid.remove_summary(index)``.
+        """
+        scus = []
+        for scu_id, summary_indices in self.scus:
+            # Like `Pyramid.remove_summary`, the SCUs which only came from the removed summary are dropped
+            # and the later summary indices are shifted down by one
+            if index in summary_indices and len(summary_indices) == 1:
+                continue
+            summary_indices = frozenset(i if i < index else i - 1 for i in summary_indices if i != index)
+            scus.append((scu_id, summary_indices))
+        summary_scu_ids = self.summary_scu_ids[:index] + self.summary_scu_ids[index + 1:]
+
+        jk_index = PyramidIndex.__new__(PyramidIndex)
+        jk_index._initialize(tuple(scus), summary_scu_ids)
+        return jk_index
+
+
 @Metric.register('pyramid-score')
 class PyramidScore(Metric):
     """
@@ -14,46 +99,38 @@ class PyramidScore(Metric):
     of https://www.cis.upenn.edu/~nenkova/papers/p1-nenkova.pdf and section 3 of
     http://www.cs.columbia.edu/nlp/papers/2005/passonneau_al_05.pdf.
     """
+    cpu_bound = True
+
     def __init__(self, name_override: str = None):
         super().__init__(['annotation'], ['pyramid'], PyramidJackknifer())
         self.name = name_override or 'modified_pyramid_score'
 
-    def score(self, annotation: PyramidAnnotation, pyramid: Pyramid) -> MetricsDict:
-        # Create a mapping from the SCU id to its weight and count how many are at each weight
-        scu_id_to_weight = {}
-        weight_to_num_scus = Counter()
-        for scu in pyramid.scus:
-            weight = scu.get_weight()
-            scu_id_to_weight[scu.scu_id] = weight
-            weight_to_num_scus[weight] += 1
+    def score(self, annotation: PyramidAnnotation, pyramid: Union[Pyramid, LeaveOneOutPyramid]) -> MetricsDict:
+        return self._score(annotation, PyramidIndex(pyramid))
 
+    def _score(self, annotation: PyramidAnnotation, index: 'PyramidIndex') -> MetricsDict:
         # Calculate the total weight of the SCUs in the annotation
         total_weight = 0
         for scu in annotation.scus:
             # It's possible the SCU id isn't in the Pyramid, for example, if we are
             # doing jackknifing and the reference corresponding to an SCU of weight 1 was removed
-            if scu.scu_id in scu_id_to_weight:
-                total_weight += scu_id_to_weight[scu.scu_id]
-
-        # Calculate the average number of SCUs in the pyramid summaries
-        total_scus = 0
-        for i in range(len(pyramid.summarizer_ids)):
-            total_scus += len(pyramid.get_scu_id_set(i))
-        average_num_scus = total_scus / len(pyramid.summarizer_ids)
-
-        # Calculate the weight of an ideal summary with `average_num_scus` SCUs
-        ideal_weight = 0
-        scus_remaining = int(math.ceil(average_num_scus))
-        for weight in sorted(weight_to_num_scus.keys(), reverse=True):
-            if scus_remaining <= 0:
-                break
-            possible_scus = weight_to_num_scus[weight]
-            num_scus_taken = min(scus_remaining, possible_scus)
-            ideal_weight += num_scus_taken * weight
-            scus_remaining -= num_scus_taken
+            if scu.scu_id in index.scu_id_to_weight:
+                total_weight += index.scu_id_to_weight[scu.scu_id]
 
         # The modified pyramid score is the ratio of the weight to the ideal weight
-        return MetricsDict({self.name: total_weight / ideal_weight})
+        return MetricsDict({self.name: total_weight / index.ideal_weight})
+
+    def _get_index(self, pyramid: Union[Pyramid, LeaveOneOutPyramid], indices: Dict) -> PyramidIndex:
+        # The leave-one-out views of the same pyramid share the index of the full pyramid
+        if isinstance(pyramid, LeaveOneOutPyramid):
+            key = (id(pyramid.pyramid), pyramid.removed_index)
+            if key not in indices:
+                indices[key] = self._get_index(pyramid.pyramid, indices).remove_summary(pyramid.removed_index)
+        else:
+            key = id(pyramid)
+            if key not in indices:
+                indices[key] = PyramidIndex(pyramid)
+        return indices[key]
 
     def score_multi(self, annotations: List[PyramidAnnotation], pyramid: Pyramid) -> List[MetricsDict]:
         return self.score_multi_all([annotations], [pyramid])[0]
@@ -64,11 +141,16 @@ class PyramidScore(Metric):
         return [metrics_list[0] for metrics_list in metrics_lists]
 
     def score_multi_all(self, annotations_list: List[List[PyramidAnnotation]], pyramids: List[Pyramid]) -> List[List[MetricsDict]]:
+        # The index only depends on the pyramid, so it is built once for each unique pyramid object
+        # and shared by all of its annotations
+        indices = {}
         metrics_dict_lists = []
         for annotations, pyramid in zip(annotations_list, pyramids):
+            index = self._get_index(pyramid, indices)
+
             metrics_dict_lists.append([])
             for annotation in annotations:
-                metrics_dict_lists[-1].append(self.score(annotation, pyramid))
+                metrics_dict_lists[-1].append(self._score(annotation, index))
         return metrics_dict_lists
 
     def evaluate(self, annotations: List[PyramidAnnotation], pyramids: List[Pyramid]) -> Tuple[MetricsDict, List[MetricsDict]]:
@@ -2,12 +2,12 @@ import argparse
 import os
 import re
 from collections import Counter
-from nltk.stem import PorterStemmer
 from overrides import overrides
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 from sacrerouge.commands import MetricSetupSubcommand
 from sacrerouge.common import DATA_ROOT
+from sacrerouge.common.preprocessing_cache import PREPROCESSING_CACHE, porter_stem
 from sacrerouge.data import MetricsDict
 from sacrerouge.data.types import ReferenceType, SummaryType
 from sacrerouge.metrics import Metric, ReferenceBasedMetric
@@ -52,6 +52,8 @@ def shorten_summary(summary: SummaryType,
 
 @Metric.register('python-rouge')
 class PythonRouge(ReferenceBasedMetric):
+    cpu_bound = True
+    decomposes_by_reference = True
     _non_alphanumeric_regex = re.compile('[^A-Za-z0-9]')
 
     def __init__(self,
@@ -76,10 +78,14 @@ class PythonRouge(ReferenceBasedMetric):
             raise Exception(f'Path "{rouge_data_dir}" does not exist. PythonRouge requires data files from ROUGE. '
                             f'Have you setup ROUGE?')
 
-        self.stemmer = PorterStemmer(PorterStemmer.ORIGINAL_ALGORITHM)
         self.stemmer_exceptions = self._load_stemmer_exceptions(rouge_data_dir)
         self.stopwords = self._load_stopwords(rouge_data_dir)
 
+        # The parameters which change the preprocessing. Any `PythonRouge` with the same parameters shares the
+        # preprocessed summaries in the `PREPROCESSING_CACHE`
+        self._preprocessing_config = ('python-rouge', max_sentences, max_words, max_bytes, use_porter_stemmer,
+                                      remove_stopwords, os.path.abspath(rouge_data_dir))
+
     def _load_stemmer_exceptions(self, root: str) -> Dict[str, str]:
         exceptions = {}
         for filename in ['adj.exc', 'adv.exc', 'noun.exc', 'verb.exc']:
@@ -98,20 +104,23 @@ class PythonRouge(ReferenceBasedMetric):
         file_path = os.path.join(root, 'smart_common_words.txt')
         return set(open(file_path, 'r').read().splitlines())
 
+    def _normalize_token(self, token: str) -> Optional[str]:
+        if self.remove_stopwords and token in self.stopwords:
+            return None
+        if self.use_porter_stemmer and len(token) > 3:
+            if token in self.stemmer_exceptions:
+                return self.stemmer_exceptions[token]
+            return porter_stem(token)
+        return token
+
     def normalize_and_tokenize_sentence(self, sentence: str) -> List[str]:
         sentence = PythonRouge._non_alphanumeric_regex.sub(' ', sentence)
         sentence = sentence.lower()
         tokens = []
         for token in sentence.split():
-            if self.remove_stopwords and token in self.stopwords:
-                continue
-            if self.use_porter_stemmer and len(token) > 3:
-                if token in self.stemmer_exceptions:
-                    tokens.append(self.stemmer_exceptions[token])
-                else:
-                    tokens.append(self.stemmer.stem(token))
-            else:
-                tokens.append(token)
+            normalized = self._normalize_token(token)
+            if normalized is not None:
+                tokens.append(normalized)
         return tokens
 
     def _normalize_and_tokenize_summary(self, summary: List[str]) -> List[str]:
@@ -122,23 +131,36 @@ class PythonRouge(ReferenceBasedMetric):
         summary = self._normalize_and_tokenize_summary(summary)
         return summary
 
-    def _count_ngrams(self, summary: SummaryType, n: int) -> Counter:
-        counts = Counter()
-        if isinstance(summary, str):
-            summary = [summary]
+    @staticmethod
+    def _get_token_ids(summary: List[List[str]], vocabulary: Dict[str, int]) -> List[List[int]]:
+        # The n-grams are counted over integer ids instead of the normalized tokens. `vocabulary` maps from
+        # each token to its id and is extended with the new tokens
+        summary_ids = []
+        for sentence in summary:
+            sentence_ids = []
+            for token in sentence:
+                token_id = vocabulary.get(token)
+                if token_id is None:
+                    token_id = vocabulary[token] = len(vocabulary)
+                sentence_ids.append(token_id)
+            summary_ids.append(sentence_ids)
+        return summary_ids
+
+    def _count_ngrams(self, summary: List[List[int]], n: int) -> Counter:
+        # Each n-gram of token ids is packed into one integer, which is much faster to hash than a string
         tokens = [token for sentence in summary for token in sentence]
-        for i in range(len(tokens) - n + 1):
-            ngram = ' '.join(tokens[i:i + n])
-            counts[ngram] += 1
-        return counts
-
-    def _calculate_intersection(self, reference_counts: Counter, summary_counts: Counter) -> Tuple[float, float, float]:
-        reference_total = sum(reference_counts.values())
-        summary_total = sum(summary_counts.values())
+        ngrams = tokens
+        for i in range(1, n):
+            ngrams = [(ngram << 32) | token for ngram, token in zip(ngrams, tokens[i:])]
+        return Counter(ngrams)
+
+    def _calculate_intersection(self, reference_counts: Counter, summary_counts: Counter) -> int:
+        if len(reference_counts) < len(summary_counts):
+            reference_counts, summary_counts = summary_counts, reference_counts
         intersection = 0
-        for ngram in summary_counts:
-            intersection += min(summary_counts[ngram], reference_counts[ngram])
-        return reference_total, summary_total, intersection
+        for ngram, count in summary_counts.items():
+            intersection += min(count, reference_counts.get(ngram, 0))
+        return intersection
 
     def _calculate_pr_f1(self, reference_total: int, summary_total: int, intersection: int) -> Tuple[float, float, float]:
         precision = 0.0
@@ -153,38 +175,88 @@ class PythonRouge(ReferenceBasedMetric):
             f1 = 2 * (precision * recall) / (precision + recall)
         return precision, recall, f1
 
+    @staticmethod
+    def _get_match_masks(tokens: List[int]) -> Dict[int, int]:
+        # Bit `j` of the mask for a token is set if `tokens[j]` is that token
+        masks = {}
+        for j, token in enumerate(tokens):
+            masks[token] = masks.get(token, 0) | (1 << j)
+        return masks
+
     def _longest_common_substring(self,
-                                  tokens1: List[str],
-                                  tokens2: List[str],
-                                  hit_mask: List[int]) -> int:
+                                  tokens1: List[int],
+                                  tokens2: List[int],
+                                  hit_mask: List[int],
+                                  match_masks: Dict[int, int] = None) -> None:
+        # Computes the LCS table with the bit-parallel algorithm (Hyyro, 2004). Row `i` of the table is encoded by
+        # the bit vector `rows[i]`, in which the zero bits mark where the LCS length increases along the row, so
+        # `counter[i][j] == j - popcount(rows[i] & ((1 << j) - 1))`. The traceback follows the same path as
+        # the full dynamic program in the perl implementation.
         m, n = len(tokens1), len(tokens2)
-        counter = [[0] * (n + 1) for x in range(m + 1)]
-        pointers = [[None] * (n + 1) for x in range(m + 1)]
-        for i in range(1, m + 1):
-            for j in range(1, n + 1):
-                if tokens1[i - 1] == tokens2[j - 1]:
-                    counter[i][j] = counter[i - 1][j - 1] + 1
-                    pointers[i][j] = '\\'
-                elif counter[i - 1][j] >= counter[i][j - 1]:
-                    counter[i][j] = counter[i - 1][j]
-                    pointers[i][j] = '^'
-                else:
-                    counter[i][j] = counter[i][j - 1]
-                    pointers[i][j] = '<'
+        if match_masks is None:
+            match_masks = self._get_match_masks(tokens2)
+
+        full = (1 << n) - 1
+        rows = [full]
+        row = full
+        for token in tokens1:
+            matches = row & match_masks.get(token, 0)
+            row = ((row + matches) | (row - matches)) & full
+            rows.append(row)
 
         # Mark the hit_mask
         i, j = m, n
         while i != 0 and j != 0:
-            if pointers[i][j] == '\\':
+            if tokens1[i - 1] == tokens2[j - 1]:
                 i -= 1
                 j -= 1
                 hit_mask[i] = 1
-            elif pointers[i][j] == '^':
-                i -= 1
-            elif pointers[i][j] == '<':
-                j -= 1
             else:
-                raise Exception(f'Unknown pointer: {pointers[i][j]}')
+                up = j - bin(rows[i - 1] & ((1 << j) - 1)).count('1')
+                left = j - 1 - bin(rows[i] & ((1 << (j - 1)) - 1)).count('1')
+                if up >= left:
+                    i -= 1
+                else:
+                    j -= 1
+
+    def _calculate_rouge_l_hits(self,
+                                reference: List[List[int]],
+                                summary: List[List[int]],
+                                model_unigrams: Counter,
+                                model_match_masks: List[Dict[int, int]]) -> Tuple[int, int]:
+        # Returns the number of LCS hits between the summary and one reference and the length of the reference
+        temp_model_unigrams = Counter(model_unigrams)
+        gold_unigrams = self._count_ngrams(reference, 1)
+        hit, base = 0, 0
+        for ref_sentence in reference:
+            hit_mask = [0] * len(ref_sentence)
+            base += len(ref_sentence)
+            for model_sentence, match_masks in zip(summary, model_match_masks):
+                self._longest_common_substring(ref_sentence, model_sentence, hit_mask, match_masks)
+
+            for i, token in enumerate(ref_sentence):
+                if hit_mask[i] == 1:
+                    try:
+                        if temp_model_unigrams[token] > 0 and gold_unigrams[token] > 0:
+                            hit += 1
+                            temp_model_unigrams[token] -= 1
+                            gold_unigrams[token] -= 1
+                    except KeyError:
+                        pass
+        return hit, base
+
+    def _calculate_rouge_l_pr_f1(self, total_hit: int, total_model: int, total_base: int) -> Tuple[float, float, float]:
+        precision = 0.0
+        if total_model != 0.0:
+            precision = total_hit / total_model * 100
+        recall = 0.0
+        if total_base != 0.0:
+            recall = total_hit / total_base * 100
+        if (precision + recall) != 0.0:
+            f1 = 2 * (precision * recall) / (precision + recall)
+        else:
+            f1 = 0.0
+        return precision, recall, f1
 
     def _calculate_rouge_l(self,
                            references: List[SummaryType],
@@ -195,64 +267,69 @@ class PythonRouge(ReferenceBasedMetric):
         if isinstance(summary, str):
             summary = [summary]
         references = [[reference] if isinstance(reference, str) else reference for reference in references]
+        model_match_masks = [self._get_match_masks(model_sentence) for model_sentence in summary]
 
         total_hit = 0
         total_base = 0
         for reference in references:
-            temp_model_unigrams = Counter(model_unigrams)
-            gold_unigrams = self._count_ngrams(reference, 1)
-            hit, base = 0, 0
-            for ref_sentence in reference:
-                hit_mask = [0] * len(ref_sentence)
-                base += len(ref_sentence)
-                for model_sentence in summary:
-                    self._longest_common_substring(ref_sentence, model_sentence, hit_mask)
-
-                for i, token in enumerate(ref_sentence):
-                    if hit_mask[i] == 1:
-                        try:
-                            if temp_model_unigrams[token] > 0 and gold_unigrams[token] > 0:
-                                hit += 1
-                                temp_model_unigrams[token] -= 1
-                                gold_unigrams[token] -= 1
-                        except KeyError:
-                            pass
+            hit, base = self._calculate_rouge_l_hits(reference, summary, model_unigrams, model_match_masks)
             total_hit += hit
             total_base += base
+        return self._calculate_rouge_l_pr_f1(total_hit, num_model_unigrams * len(references), total_base)
 
-        precision = 0.0
-        if (num_model_unigrams * len(references)) != 0.0:
-            precision = total_hit / (num_model_unigrams * len(references)) * 100
-        recall = 0.0
-        if total_base != 0.0:
-            recall = total_hit / total_base * 100
-        if (precision + recall) != 0.0:
-            f1 = 2 * (precision * recall) / (precision + recall)
-        else:
-            f1 = 0.0
-        return precision, recall, f1
+    @staticmethod
+    def _get_summary_key(summary: SummaryType) -> Union[str, Tuple[str, ...]]:
+        return summary if isinstance(summary, str) else tuple(summary)
+
+    def _preprocess_all(self,
+                        summaries_list: List[List[SummaryType]],
+                        cache: Dict[Union[str, Tuple[str, ...]], List[List[int]]],
+                        vocabulary: Dict[str, int]) -> List[List[Union[str, Tuple[str, ...]]]]:
+        # Saves the token ids of every unique summary in `cache` and returns the keys of the summaries. The ids
+        # are only consistent for the summaries which use the same `vocabulary`, so it is only kept for one call
+        keys_list = []
+        for summaries in summaries_list:
+            keys = []
+            for summary in summaries:
+                key = self._get_summary_key(summary)
+                if key not in cache:
+                    tokens = PREPROCESSING_CACHE.get(self._preprocessing_config, key, lambda: self.preprocess_summary(summary))
+                    cache[key] = self._get_token_ids(tokens, vocabulary)
+                keys.append(key)
+            keys_list.append(keys)
+        return keys_list
 
     def score_multi_all(self,
                         summaries_list: List[List[SummaryType]],
                         references_list: List[List[ReferenceType]]) -> List[List[MetricsDict]]:
-        summaries_list = [[self.preprocess_summary(summary) for summary in summaries] for summaries in summaries_list]
-        references_list = [[self.preprocess_summary(reference) for reference in references] for references in references_list]
+        # The same summaries and references are often repeated across the contexts (e.g., for jackknifing),
+        # so each unique one is only preprocessed and has its n-grams counted once
+        token_ids = {}
+        vocabulary = {}
+        summary_keys_list = self._preprocess_all(summaries_list, token_ids, vocabulary)
+        reference_keys_list = self._preprocess_all(references_list, token_ids, vocabulary)
+        # Maps from the (key, n) to the n-gram counts and the total number of n-grams
+        ngrams = {}
 
         metrics_lists = []
-        for summaries, references in zip(summaries_list, references_list):
-            metrics_list = [MetricsDict() for _ in summaries]
+        for summary_keys, reference_keys in zip(summary_keys_list, reference_keys_list):
+            metrics_list = [MetricsDict() for _ in summary_keys]
 
             for n in self.ngram_orders:
-                reference_ngrams_list = [self._count_ngrams(reference, n) for reference in references]
+                for key in summary_keys + reference_keys:
+                    if (key, n) not in ngrams:
+                        counts = self._count_ngrams(token_ids[key], n)
+                        ngrams[key, n] = (counts, sum(counts.values()))
 
-                for i, summary in enumerate(summaries):
+                for i, summary_key in enumerate(summary_keys):
                     total_reference_count = 0
                     total_summary_count = 0
                     total_intersection = 0
 
-                    summary_ngrams = self._count_ngrams(summary, n)
-                    for reference_ngrams in reference_ngrams_list:
-                        reference_total, summary_total, intersection = self._calculate_intersection(reference_ngrams, summary_ngrams)
+                    summary_ngrams, summary_total = ngrams[summary_key, n]
+                    for reference_key in reference_keys:
+                        reference_ngrams, reference_total = ngrams[reference_key, n]
+                        intersection = self._calculate_intersection(reference_ngrams, summary_ngrams)
 
                         total_reference_count += reference_total
                         total_summary_count += summary_total
@@ -266,8 +343,9 @@ class PythonRouge(ReferenceBasedMetric):
                     }
 
             if self.compute_rouge_l:
-                for i, summary in enumerate(summaries):
-                    precision, recall, f1 = self._calculate_rouge_l(references, summary)
+                references = [token_ids[key] for key in reference_keys]
+                for i, summary_key in enumerate(summary_keys):
+                    precision, recall, f1 = self._calculate_rouge_l(references, token_ids[summary_key])
                     metrics_list[i]['python-rouge-l'] = {
                         'precision': precision,
                         'recall': recall,
@@ -277,6 +355,72 @@ class PythonRouge(ReferenceBasedMetric):
             metrics_lists.append(metrics_list)
         return metrics_lists
 
+    def score_reference_statistics_all(self,
+                                       summaries: List[SummaryType],
+                                       references_list: List[List[ReferenceType]]) -> List[List[Any]]:
+        # The statistics for each reference are the n-gram totals and intersection for every n-gram order and
+        # the ROUGE-L hits, the length of the reference, and the number of summary unigrams
+        token_ids = {}
+        vocabulary = {}
+        summary_keys = self._preprocess_all([summaries], token_ids, vocabulary)[0]
+        reference_keys_list = self._preprocess_all(references_list, token_ids, vocabulary)
+        ngrams = {}
+
+        def get_ngrams(key, n: int) -> Tuple[Counter, int]:
+            if (key, n) not in ngrams:
+                counts = self._count_ngrams(token_ids[key], n)
+                ngrams[key, n] = (counts, sum(counts.values()))
+            return ngrams[key, n]
+
+        statistics_list = []
+        for summary_key, reference_keys in zip(summary_keys, reference_keys_list):
+            summary = token_ids[summary_key]
+            if self.compute_rouge_l:
+                model_unigrams, num_model_unigrams = get_ngrams(summary_key, 1)
+                model_match_masks = [self._get_match_masks(model_sentence) for model_sentence in summary]
+
+            statistics = []
+            for reference_key in reference_keys:
+                ngram_statistics = []
+                for n in self.ngram_orders:
+                    summary_ngrams, summary_total = get_ngrams(summary_key, n)
+                    reference_ngrams, reference_total = get_ngrams(reference_key, n)
+                    intersection = self._calculate_intersection(reference_ngrams, summary_ngrams)
+                    ngram_statistics.append((reference_total, summary_total, intersection))
+
+                rouge_l_statistics = None
+                if self.compute_rouge_l:
+                    hit, base = self._calculate_rouge_l_hits(token_ids[reference_key], summary, model_unigrams, model_match_masks)
+                    rouge_l_statistics = (hit, num_model_unigrams, base)
+                statistics.append((ngram_statistics, rouge_l_statistics))
+            statistics_list.append(statistics)
+        return statistics_list
+
+    def combine_reference_statistics(self, statistics: List[Any]) -> MetricsDict:
+        metrics = MetricsDict()
+        for i, n in enumerate(self.ngram_orders):
+            total_reference_count = sum(ngram_statistics[i][0] for ngram_statistics, _ in statistics)
+            total_summary_count = sum(ngram_statistics[i][1] for ngram_statistics, _ in statistics)
+            total_intersection = sum(ngram_statistics[i][2] for ngram_statistics, _ in statistics)
+            precision, recall, f1 = self._calculate_pr_f1(total_reference_count, total_summary_count, total_intersection)
+            metrics[f'python-rouge-{n}'] = {
+                'precision': precision,
+                'recall': recall,
+                'f1': f1,
+            }
+
+        if self.compute_rouge_l:
+            total_hit = sum(rouge_l_statistics[0] for _, rouge_l_statistics in statistics)
+            total_model = sum(rouge_l_statistics[1] for _, rouge_l_statistics in statistics)
+            total_base = sum(rouge_l_statistics[2] for _, rouge_l_statistics in statistics)
+            precision, recall, f1 = self._calculate_rouge_l_pr_f1(total_hit, total_model, total_base)
+            metrics['python-rouge-l'] = {
+                'precision': precision,
+                'recall': recall,
+                'f1': f1
+            }
+        return metrics
+
 
 @MetricSetupSubcommand.register('python-rouge')
 class PythonRougeSetupSubcommand(MetricSetupSubcommand):
@@ -2,13 +2,16 @@ import argparse
 import logging
 import os
 import sys
+import threading
+import weakref
 from collections import defaultdict
 from overrides import overrides
-from subprocess import Popen, PIPE
+from subprocess import DEVNULL, Popen, PIPE
 from typing import List, Optional, Tuple
 
 from sacrerouge.commands import MetricSetupSubcommand
 from sacrerouge.common import DATA_ROOT, TemporaryDirectory
+from sacrerouge.common.profiler import PROFILER
 from sacrerouge.common.util import download_file_from_google_drive
 from sacrerouge.data import MetricsDict
 from sacrerouge.data.types import ReferenceType
@@ -17,6 +20,107 @@ from sacrerouge.metrics import Metric, ReferenceBasedMetric
 
 logger = logging.getLogger(__name__)
 
+# A Perl server which runs the ROUGE script once for every line of tab-separated command line arguments that it
+# reads from stdin. Each run is compiled into a new package so that none of the script's global variables are
+# shared between runs. The output of a run is written to stdout after a header with the status and its length.
+_WORKER_SCRIPT = r'''
+use strict;
+use Symbol qw(delete_package);
+
+BEGIN { *CORE::GLOBAL::exit = sub { die "ROUGE_WORKER_EXIT\n" }; }
+
+my $script_path = shift @ARGV;
+open(my $script_file, '<', $script_path) or die "Cannot open $script_path\n";
+my $script = do { local $/; <$script_file> };
+close($script_file);
+
+binmode(STDOUT);
+$| = 1;
+my $num_runs = 0;
+while (defined(my $line = <STDIN>)) {
+    chomp($line);
+    $num_runs++;
+    my $package = "RougeWorker::Run$num_runs";
+
+    my $output = '';
+    open(my $buffer, '>', \$output) or die "Cannot open the output buffer\n";
+    my $stdout = select($buffer);
+    my $success;
+    {
+        no strict;
+        no warnings;
+        local @ARGV = split(/\t/, $line);
+        local $0 = $script_path;
+        $success = eval "package $package;\n#line 1 \"$script_path\"\n$script\n;1";
+    }
+    my $error = $@;
+    select($stdout);
+    close($buffer);
+    delete_package($package);
+
+    if (!$success && $error ne "ROUGE_WORKER_EXIT\n") {
+        print 'ERROR ' . length($error) . "\n" . $error;
+    } else {
+        print 'OK ' . length($output) . "\n" . $output;
+    }
+}
+'''
+
+
+def _stop_worker_process(process: Popen) -> None:
+    # Closing stdin ends the worker's loop, so the process exits after its current run
+    process.stdin.close()
+    process.wait()
+
+
+class _RougeWorker(object):
+    """
+    A long-running Perl process which keeps the ROUGE script's libraries loaded between calls, so each call
+    does not have to pay for starting Perl and loading them again. The process is stopped by ``close()``, when
+    the worker is garbage collected, or when the interpreter exits, whichever happens first.
+    """
+    def __init__(self, rouge_script_location: str) -> None:
+        self.rouge_script_location = rouge_script_location
+        self.process = None
+        self.lock = threading.Lock()
+        # The finalizer only references the process, so it does not keep the worker alive
+        self._finalizer = None
+
+    def _start(self) -> None:
+        self._stop()
+        logger.info(f'Starting the ROUGE worker for {self.rouge_script_location}')
+        self.process = Popen(['perl', '-e', _WORKER_SCRIPT, self.rouge_script_location],
+                             stdin=PIPE, stdout=PIPE, stderr=DEVNULL)
+        self._finalizer = weakref.finalize(self, _stop_worker_process, self.process)
+
+    def _stop(self) -> None:
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+        self.process = None
+
+    def run(self, args: List[str]) -> str:
+        with self.lock:
+            if self.process is None or self.process.poll() is not None:
+                self._start()
+
+            self.process.stdin.write(('\t'.join(args) + '\n').encode())
+            self.process.stdin.flush()
+            header = self.process.stdout.readline().decode()
+            if not header:
+                self._stop()
+                raise Exception(f'The ROUGE worker exited unexpectedly')
+
+            status, length = header.split()
+            output = self.process.stdout.read(int(length)).decode()
+            if status != 'OK':
+                raise Exception(f'ROUGE failed: {output}')
+            return output
+
+    def close(self) -> None:
+        with self.lock:
+            self._stop()
+
 
 @Metric.register('rouge')
 class Rouge(ReferenceBasedMetric):
@@ -30,7 +134,9 @@ class Rouge(ReferenceBasedMetric):
                  skip_bigram_gap_length: Optional[int] = None,
                  wlcs_weight: Optional[float] = None,
                  rouge_root: str = f'{DATA_ROOT}/metrics/ROUGE-1.5.5',
-                 scoring_function: str = 'average'):
+                 scoring_function: str = 'average',
+                 use_worker: bool = False,
+                 skip_bootstrap: bool = False):
         super().__init__()
         self.max_ngram = max_ngram
         self.use_porter_stemmer = use_porter_stemmer
@@ -43,10 +149,14 @@ class Rouge(ReferenceBasedMetric):
         self.rouge_script_location = f'{rouge_root}/ROUGE-1.5.5.pl'
         self.rouge_eval_home = f'{rouge_root}/data'
         self.scoring_function = scoring_function
+        self.skip_bootstrap = skip_bootstrap
 
         if not os.path.exists(rouge_root):
             raise Exception(f'Path "{rouge_root}" does not exist. Have you setup ROUGE?')
 
+        # If `use_worker` is true, one Perl process is reused for every call instead of starting a new one each time
+        self.worker = _RougeWorker(self.rouge_script_location) if use_worker else None
+
     def _save_summary(self, summary: SummaryType, file_path: str) -> None:
         dirname = os.path.dirname(file_path)
         os.makedirs(dirname, exist_ok=True)
@@ -142,7 +252,8 @@ class Rouge(ReferenceBasedMetric):
 
     def _run(self,
              summaries_list: List[List[SummaryType]],
-             references_list: List[List[SummaryType]]) -> Tuple[List[MetricsDict], List[List[MetricsDict]]]:
+             references_list: List[List[SummaryType]],
+             num_bootstrap_samples: int = 1000) -> Tuple[List[MetricsDict], List[List[MetricsDict]]]:
         with TemporaryDirectory() as temp_dir:
             summary_filenames_list = []
             reference_filenames_list = []
@@ -170,7 +281,7 @@ class Rouge(ReferenceBasedMetric):
                 '-n', str(self.max_ngram),
                 '-a',
                 '-c', '95',
-                '-r', '1000',
+                '-r', str(num_bootstrap_samples),
                 '-p', '0.5',
                 '-t', '0',
                 '-d'
@@ -203,16 +314,26 @@ class Rouge(ReferenceBasedMetric):
             # to score for some reference sets than others). Therefore, we no longer fail
             # if stderr is not empty.
             logger.info(f'Running ROUGE command: "{" ".join(command)}"')
-            process = Popen(command, stdout=PIPE, stderr=PIPE)
-            stdout, stderr = process.communicate()
+            num_summaries = sum(len(summaries) for summaries in summaries_list)
+            with PROFILER.stage('Rouge/subprocess', num_summaries):
+                if self.worker is not None:
+                    stdout = self.worker.run(command[1:])
+                else:
+                    process = Popen(command, stdout=PIPE, stderr=PIPE)
+                    stdout, stderr = process.communicate()
+                    stdout = stdout.decode()
 
-            macro_metrics_list, micro_metrics_lists = self._parse_rouge_stdout(stdout.decode())
+            with PROFILER.stage('Rouge/parse_output', num_summaries):
+                macro_metrics_list, micro_metrics_lists = self._parse_rouge_stdout(stdout)
             return macro_metrics_list, micro_metrics_lists
 
     def score_multi_all(self,
                         summaries_list: List[List[SummaryType]],
                         references_list: List[List[ReferenceType]]) -> List[List[MetricsDict]]:
-        _, micro_metrics_lists = self._run(summaries_list, references_list)
+        # The bootstrap samples are only used for the macro scores, so they can be skipped here. ROUGE divides by
+        # the number of samples, so it has to be at least 1
+        num_bootstrap_samples = 1 if self.skip_bootstrap else 1000
+        _, micro_metrics_lists = self._run(summaries_list, references_list, num_bootstrap_samples)
         return micro_metrics_lists
 
     def evaluate(self,
@@ -0,0 +1,103 @@
+import copy
+import logging
+from multiprocessing.pool import ThreadPool
+from typing import Any, Dict, List, Tuple
+
+from sacrerouge.common import Params
+from sacrerouge.data import MetricsDict
+from sacrerouge.metrics.metric import Metric, scores_summaries_independently
+
+logger = logging.getLogger(__name__)
+
+
+@Metric.register('sharded')
+class ShardedMetric(Metric):
+    """
+    Scores the summaries with ``num_shards`` copies of a metric at the same time. The summaries are split into
+    contiguous shards of their context groups with about the same number of summaries each, every shard is
+    scored by a different copy of the metric, and the results are put back in the original order.
+
+    This is intended for metrics which run an external process, such as "rouge" or "meteor", which otherwise
+    only use one CPU. The copies are run in threads, which wait on the processes, and every call to these
+    metrics already writes its files to a separate temporary directory. Each copy is constructed from
+    ``metric``, so any resources a metric creates (e.g., a persistent worker process) are not shared::
+
+        {"type": "sharded", "num_shards": 4, "metric": {"type": "rouge", "max_ngram": 2}}
+
+    Args:
+        metric: The parameters of the metric which should be sharded
+        num_shards: The maximum number of shards which will be scored in parallel
+    """
+    def __init__(self, metric: Dict[str, Any], num_shards: int = 4) -> None:
+        if num_shards < 1:
+            raise Exception(f'The number of shards must be positive: {num_shards}')
+        self.metrics = [Metric.from_params(Params(copy.deepcopy(metric))) for _ in range(num_shards)]
+        self.num_shards = num_shards
+        wrapped = self.metrics[0]
+        super().__init__(wrapped.required_summary_fields, wrapped.required_context_fields, wrapped.jackknifer)
+        self.cpu_bound = wrapped.cpu_bound
+
+    def _get_shards(self, sizes: List[int]) -> List[Tuple[int, int]]:
+        # Splits the context groups into at most `num_shards` contiguous (start, end) ranges with
+        # about the same total size
+        total = sum(sizes)
+        if total == 0:
+            # There is nothing to balance, so all of the groups are scored together
+            return [(0, len(sizes))] if len(sizes) > 0 else []
+
+        shards = []
+        start, count = 0, 0
+        for i, size in enumerate(sizes):
+            count += size
+            if count * self.num_shards >= total * (len(shards) + 1):
+                shards.append((start, i + 1))
+                start = i + 1
+        if start < len(sizes):
+            # The last shard was closed before the trailing empty groups, so they are added to it instead of
+            # creating more than `num_shards` shards
+            shards[-1] = (shards[-1][0], len(sizes))
+        return shards
+
+    def _score_shard(self, index: int, args: List[List[Any]], kwargs: Dict[str, Any]) -> List[List[MetricsDict]]:
+        return self.metrics[index].score_multi_all(*args, **kwargs)
+
+    def score(self, *args: List[Any], **kwargs) -> MetricsDict:
+        return self.metrics[0].score(*args, **kwargs)
+
+    def score_multi(self, *args: List[Any], **kwargs) -> List[MetricsDict]:
+        return self.metrics[0].score_multi(*args, **kwargs)
+
+    def score_all(self, *args: List[Any], **kwargs) -> List[MetricsDict]:
+        num_summary_fields = len(self.required_summary_fields)
+        summary_args = [[[value] for value in arg] for arg in args[:num_summary_fields]]
+        metrics_lists = self.score_multi_all(*summary_args, *args[num_summary_fields:], **kwargs)
+        return [metrics_list[0] for metrics_list in metrics_lists]
+
+    def score_multi_all(self, *args: List[Any], **kwargs) -> List[List[MetricsDict]]:
+        if len(self.required_summary_fields) > 0:
+            sizes = [len(summaries) for summaries in args[0]]
+        else:
+            sizes = [1] * len(args[0])
+        shards = self._get_shards(sizes)
+        if len(shards) <= 1:
+            return self.metrics[0].score_multi_all(*args, **kwargs)
+
+        logger.info(f'Scoring {sum(sizes)} summaries in {len(shards)} shards')
+        tasks = []
+        for i, (start, end) in enumerate(shards):
+            tasks.append((i, [arg[start:end] for arg in args], kwargs))
+        with ThreadPool(len(shards)) as pool:
+            results = pool.starmap(self._score_shard, tasks)
+        return [metrics_list for shard_results in results for metrics_list in shard_results]
+
+    def evaluate(self, *args: List[Any]) -> Tuple[MetricsDict, List[MetricsDict]]:
+        if not scores_summaries_independently(self.metrics[0]):
+            # The metric's results depend on all of the summaries, so they cannot be sharded
+            return self.metrics[0].evaluate(*args)
+
+        micro_metrics_list = self.score_all(*args)
+        macro_metrics = self.aggregate(micro_metrics_list)
+        return macro_metrics, micro_metrics_list
+
+    def aggregate(self, metrics_list: List[MetricsDict]) -> MetricsDict:
+        return self.metrics[0].aggregate(metrics_list)
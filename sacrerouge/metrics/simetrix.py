@@ -8,6 +8,7 @@ from typing import List, Tuple
 
 from sacrerouge.commands import MetricSetupSubcommand
 from sacrerouge.common import DATA_ROOT, TemporaryDirectory
+from sacrerouge.common.profiler import PROFILER
 from sacrerouge.data import MetricsDict
 from sacrerouge.data.types import DocumentType, SummaryType
 from sacrerouge.metrics import DocumentBasedMetric, Metric
@@ -130,13 +131,16 @@ class SIMetrix(DocumentBasedMetric):
             ]
 
             logger.info(f'Running SIMetrix command: "{command}"')
-            process = Popen(command, stdout=PIPE, stderr=PIPE)
-            stdout, stderr = process.communicate()
+            num_summaries = sum(len(summaries) for summaries in summaries_list)
+            with PROFILER.stage('SIMetrix/subprocess', num_summaries):
+                process = Popen(command, stdout=PIPE, stderr=PIPE)
+                stdout, stderr = process.communicate()
             if stderr:
                 raise Exception(f'SIMetrix failed with stderr: {stderr.decode()}')
 
-            macro_results = self._parse_macro_file(f'{temp_dir}/mappings.txt.ieval.macro')
-            micro_results = self._parse_micro_file(f'{temp_dir}/mappings.txt.ieval.micro')
+            with PROFILER.stage('SIMetrix/parse_output', num_summaries):
+                macro_results = self._parse_macro_file(f'{temp_dir}/mappings.txt.ieval.macro')
+                micro_results = self._parse_micro_file(f'{temp_dir}/mappings.txt.ieval.micro')
             return macro_results, micro_results
 
     def score_multi_all(self,
@@ -0,0 +1,11 @@
+"""Regenerates the registry manifest after a class is registered, renamed, or moved."""
+from sacrerouge.common.registry_manifest import MANIFEST_FILE, save_manifest
+
+
+def main():
+    save_manifest()
+    print(f'Saved the registry manifest to {MANIFEST_FILE}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,12 @@
+import functools
+import itertools
 import logging
+import multiprocessing
 import numpy as np
 import scipy.stats
 import warnings
 from scipy.stats import kendalltau, pearsonr, spearmanr
-from typing import Callable, Dict, List, Optional, Tuple, Union
+from typing import Callable, Dict, Generator, List, Optional, Tuple, Union
 
 from sacrerouge.data import Metrics
 
@@ -15,42 +18,230 @@ SummaryCorrFunc = Callable[[ArrayLike, ArrayLike], Union[float, Tuple[float, flo
 
 logger = logging.getLogger(__name__)
 
+# The number of resampling iterations which share a random seed when the resampling is run with `num_workers`
+_RESAMPLING_BLOCK_SIZE = 50
+# The matrices used by `run_resampling` in the current process
+_worker_matrices = ()
 
-def convert_to_matrices(metrics_list: List[Metrics], *metric_names: str) -> Union[np.ndarray, List[np.ndarray]]:
+
+def convert_to_matrices(metrics_list: List[Metrics],
+                        *metric_names: str,
+                        masked: bool = False) -> Union[np.ndarray, List[np.ndarray]]:
     """
     Creates an N x M matrix of scores for each metric in `metric_names`, where N is the number of summarizer_ids
     and M is the number of instance_ids. Entry (i, j) in the matrix will be metric's score for the i-th summarizer
     and j-th input document. If no score exists, the entry in the matrix will be np.nan. One matrix will be returned
     for each name in `metric_names`.
+
+    If `masked` is True, the matrices are `np.ma.MaskedArray`s in which the missing scores are masked. The
+    correlation functions accept them in place of the matrices with NaNs.
     """
-    summarizer_ids = set()
-    instance_ids = set()
-    scores = {name: {} for name in metric_names}
+    # Assign each id an integer code in the order it is first seen and collect the (row, column, value)
+    # entries of each matrix in one pass
+    summarizer_codes = {}
+    instance_codes = {}
+    rows_list = [[] for _ in metric_names]
+    cols_list = [[] for _ in metric_names]
+    values_list = [[] for _ in metric_names]
     for metrics in metrics_list:
-        instance_ids.add(metrics.instance_id)
-        summarizer_ids.add(metrics.summarizer_id)
-        for name in metric_names:
+        i = summarizer_codes.setdefault(metrics.summarizer_id, len(summarizer_codes))
+        j = instance_codes.setdefault(metrics.instance_id, len(instance_codes))
+        for k, name in enumerate(metric_names):
             if name in metrics.metrics:
-                scores[name][(metrics.instance_id, metrics.summarizer_id)] = metrics.metrics[name]
-
-    instance_ids = sorted(instance_ids)
-    summarizer_ids = sorted(summarizer_ids)
-    N = len(summarizer_ids)
-    M = len(instance_ids)
-    matrices = [np.ndarray((N, M)) for _ in metric_names]
-    for i, summarizer_id in enumerate(summarizer_ids):
-        for j, instance_id in enumerate(instance_ids):
-            for k, name in enumerate(metric_names):
-                try:
-                    matrices[k][i, j] = scores[name][(instance_id, summarizer_id)]
-                except KeyError:
-                    matrices[k][i, j] = np.nan
+                rows_list[k].append(i)
+                cols_list[k].append(j)
+                values_list[k].append(metrics.metrics[name])
+
+    # The rows and columns are in the sorted order of the ids
+    N = len(summarizer_codes)
+    M = len(instance_codes)
+    summarizer_positions = {summarizer_id: i for i, summarizer_id in enumerate(sorted(summarizer_codes))}
+    instance_positions = {instance_id: j for j, instance_id in enumerate(sorted(instance_codes))}
+    row_order = np.array([summarizer_positions[summarizer_id] for summarizer_id in summarizer_codes], dtype=int)
+    col_order = np.array([instance_positions[instance_id] for instance_id in instance_codes], dtype=int)
+
+    matrices = []
+    for rows, cols, values in zip(rows_list, cols_list, values_list):
+        matrix = np.full((N, M), np.nan)
+        if len(values) > 0:
+            indices = row_order[np.array(rows, dtype=int)] * M + col_order[np.array(cols, dtype=int)]
+            values = np.array(values, dtype=float)
+            if len(np.unique(indices)) < len(indices):
+                # The same summary appears more than once, so keep its last score
+                indices, last = np.unique(indices[::-1], return_index=True)
+                values = values[::-1][last]
+            matrix.ravel()[indices] = values
+        matrices.append(np.ma.masked_invalid(matrix) if masked else matrix)
 
     if len(matrices) == 1:
         return matrices[0]
     return matrices
 
 
+def _to_nan_matrix(X: np.ndarray) -> np.ndarray:
+    """Converts a masked matrix from `convert_to_matrices` into one with NaNs for the masked entries."""
+    if isinstance(X, np.ma.MaskedArray):
+        return X.astype(float).filled(np.nan)
+    return X
+
+
+# The maximum number of elements in the R x P pairwise comparison matrices that are used to compute Kendall's tau
+# for R rows at once, where P is the number of pairs of entries in a row. This bounds the memory used by `_kendall_rows`
+_MAX_PAIRWISE_ELEMENTS = 2 ** 20
+
+
+# The helper functions below compute correlations between the parallel rows of two M x N matrices. `column_corrs`
+# passes them the transposes of the N x M score matrices so that every reduction is over contiguous memory.
+def _is_constant_rows(X: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    Marks which rows of X have the same value in every entry marked in `mask` (or have no marked entries).
+    """
+    X_min = np.where(mask, X, np.inf).min(axis=1)
+    X_max = np.where(mask, X, -np.inf).max(axis=1)
+    return ~(X_min < X_max)
+
+
+def _pearson_rows(X: np.ndarray, Y: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    Calculates the Pearson correlation between every pair of rows in X and Y using only the entries
+    marked in `mask`. The computation mirrors `scipy.stats.pearsonr`. The correlation will be NaN for rows
+    with fewer than 2 entries or with a constant input.
+    """
+    n = mask.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        X_c = np.where(mask, X, 0)
+        X_c -= X_c.sum(axis=1, keepdims=True) / n
+        X_c *= mask
+        X_c /= np.sqrt(np.einsum('ij,ij->i', X_c, X_c))[:, None]
+
+        Y_c = np.where(mask, Y, 0)
+        Y_c -= Y_c.sum(axis=1, keepdims=True) / n
+        Y_c *= mask
+        Y_c /= np.sqrt(np.einsum('ij,ij->i', Y_c, Y_c))[:, None]
+
+        r = np.clip(np.einsum('ij,ij->i', X_c, Y_c), -1.0, 1.0)
+
+    undefined = (n[:, 0] < 2) | _is_constant_rows(X, mask) | _is_constant_rows(Y, mask)
+    r[undefined] = np.nan
+    return r
+
+
+def _rank_rows(X: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    Ranks the entries within each row of X that are marked in `mask`, assigning tied values their average
+    rank like `scipy.stats.rankdata`. The unmarked entries will have a rank of NaN.
+    """
+    N = X.shape[1]
+    # Push the unmarked entries to the end of each row so they do not take part in any ties
+    X = np.where(mask, X, np.inf)
+    order = np.argsort(X, axis=1)
+    X_sorted = np.take_along_axis(X, order, axis=1)
+
+    # Find the first and last sorted position of the group of tied values which each entry belongs to
+    indices = np.broadcast_to(np.arange(N), X.shape)
+    is_first = np.ones(X.shape, dtype=bool)
+    is_first[:, 1:] = X_sorted[:, 1:] != X_sorted[:, :-1]
+    is_last = np.ones(X.shape, dtype=bool)
+    is_last[:, :-1] = is_first[:, 1:]
+    first = np.maximum.accumulate(np.where(is_first, indices, 0), axis=1)
+    last = np.minimum.accumulate(np.where(is_last, indices, N)[:, ::-1], axis=1)[:, ::-1]
+
+    ranks = np.empty(X.shape)
+    np.put_along_axis(ranks, order, (first + last) / 2 + 1, axis=1)
+    ranks[~mask] = np.nan
+    return ranks
+
+
+def _spearman_rows(X: np.ndarray, Y: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    Calculates the Spearman correlation between every pair of rows in X and Y using only the entries
+    marked in `mask`.
+    """
+    return _pearson_rows(_rank_rows(X, mask), _rank_rows(Y, mask), mask)
+
+
+def _kendall_rows(X: np.ndarray, Y: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    Calculates Kendall's tau-b between every pair of rows in X and Y using only the entries marked in `mask`.
+    The rows are processed in chunks so that the pairwise comparison matrices do not use too much memory.
+    """
+    M, N = X.shape
+    cols1, cols2 = np.triu_indices(N, k=1)
+    X = np.where(mask, X, np.nan)
+    Y = np.where(mask, Y, np.nan)
+
+    tau = np.full(M, np.nan)
+    chunk_size = max(1, _MAX_PAIRWISE_ELEMENTS // max(1, len(cols1)))
+    for start in range(0, M, chunk_size):
+        end = min(M, start + chunk_size)
+        X_chunk, Y_chunk = X[start:end], Y[start:end]
+
+        # Entry (k, p) is the sign of the difference between the p-th pair of entries in row k. Any pair with a
+        # missing score will be 0 so it is not counted as concordant, discordant, or tied
+        with np.errstate(invalid='ignore'):
+            X_signs = np.nan_to_num(np.sign(X_chunk[:, cols1] - X_chunk[:, cols2]), copy=False)
+            Y_signs = np.nan_to_num(np.sign(Y_chunk[:, cols1] - Y_chunk[:, cols2]), copy=False)
+
+        con_minus_dis = np.einsum('kp,kp->k', X_signs, Y_signs)
+        X_untied = np.count_nonzero(X_signs, axis=1)
+        Y_untied = np.count_nonzero(Y_signs, axis=1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            chunk_tau = con_minus_dis / np.sqrt(X_untied) / np.sqrt(Y_untied)
+        chunk_tau[(X_untied == 0) | (Y_untied == 0)] = np.nan
+        tau[start:end] = np.clip(chunk_tau, -1.0, 1.0)
+    return tau
+
+
+def _row_corrs(corr_func: CorrFunc, X: np.ndarray, Y: np.ndarray) -> np.ndarray:
+    """
+    Calculates the correlation between each pair of rows in X and Y, ignoring NaNs. A correlation which is not
+    defined will be NaN.
+    """
+    X = np.asarray(X, dtype=float)
+    Y = np.asarray(Y, dtype=float)
+    mask = ~np.isnan(X)
+    N = X.shape[1]
+    if corr_func is pearsonr:
+        return _pearson_rows(X, Y, mask)
+    elif corr_func is spearmanr:
+        return _spearman_rows(X, Y, mask)
+    elif corr_func is kendalltau and N * (N - 1) // 2 <= _MAX_PAIRWISE_ELEMENTS:
+        return _kendall_rows(X, Y, mask)
+
+    correlations = np.full(X.shape[0], np.nan)
+    for i in range(X.shape[0]):
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore')
+            # Remove any possible nans. Because X and Y have nans in the same positions,
+            # this will still leave comparable parallel data
+            correlations[i], _ = corr_func(X[i][mask[i]], Y[i][mask[i]])
+    return correlations
+
+
+def column_corrs(corr_func: CorrFunc, X: np.ndarray, Y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculates the correlation between each pair of columns in X and Y, ignoring NaNs. The individual
+    correlations are returned along with the number of non-NaN inputs that were used for each. If a correlation
+    is not defined, its value will be NaN. Pearson, Spearman, and Kendall are computed for all of the columns at
+    once with NumPy. Any other `corr_func` (or Kendall on columns too long for the pairwise comparisons to fit in
+    memory) is run on the columns one at a time. The columns without any scores are skipped.
+    """
+    X, Y = _to_nan_matrix(X), _to_nan_matrix(Y)
+    num_inputs = (~np.isnan(X)).sum(axis=0)
+    is_empty = num_inputs == 0
+    if not is_empty.any():
+        return _row_corrs(corr_func, np.ascontiguousarray(X.T), np.ascontiguousarray(Y.T)), num_inputs
+
+    # Sparse datasets can have many inputs without any scores (e.g., after filtering), which do not have a correlation
+    correlations = np.full(X.shape[1], np.nan)
+    if not is_empty.all():
+        X_nonempty, Y_nonempty = X[:, ~is_empty], Y[:, ~is_empty]
+        correlations[~is_empty] = _row_corrs(corr_func, np.ascontiguousarray(X_nonempty.T),
+                                             np.ascontiguousarray(Y_nonempty.T))
+    return correlations, num_inputs
+
+
 def summary_level_corr(corr_func: CorrFunc,
                        X: np.ndarray,
                        Y: np.ndarray,
@@ -65,30 +256,16 @@ def summary_level_corr(corr_func: CorrFunc,
     non-NaN inputs for each individual correlation will be returned. If `silent` is True, no warning message
     will be logged if there is a NaN correlation.
     """
+    X, Y = _to_nan_matrix(X), _to_nan_matrix(Y)
     # The entries must be the same shape and any nan in one must correspond to a nan in the other
     assert X.shape == Y.shape
     np.testing.assert_array_equal(np.isnan(X), np.isnan(Y))
 
-    M = X.shape[1]
-    correlations = []
-    num_inputs = []
-    num_nan = 0
-    for j in range(M):
-        with warnings.catch_warnings():
-            warnings.filterwarnings('ignore')
-
-            # Pick the column that corresponds to input j
-            x, y = X[:, j], Y[:, j]
-            # Remove any possible nans. Because X and Y have nans in the same positions,
-            # this will still leave comparable parallel data
-            x = x[~np.isnan(x)]
-            y = y[~np.isnan(y)]
-            r, _ = corr_func(x, y)
-            if np.isnan(r):
-                num_nan += 1
-            else:
-                correlations.append(r)
-                num_inputs.append(len(x))
+    all_correlations, all_num_inputs = column_corrs(corr_func, X, Y)
+    is_nan = np.isnan(all_correlations)
+    correlations = all_correlations[~is_nan].tolist()
+    num_inputs = all_num_inputs[~is_nan].tolist()
+    num_nan = int(is_nan.sum())
 
     if not silent and num_nan > 0:
         logger.warning(f'Skipped {num_nan} summary-level correlations because they were NaN')
@@ -120,6 +297,7 @@ def system_level_corr(corr_func: CorrFunc,
     Calculates the system-level correlation between X and Y, where the system-level score is equal to the
     average over the inputs, ignoring NaNs.
     """
+    X, Y = _to_nan_matrix(X), _to_nan_matrix(Y)
     # The entries must be the same shape and any nan in one must correspond to a nan in the other
     assert X.shape == Y.shape
     np.testing.assert_array_equal(np.isnan(X), np.isnan(Y))
@@ -144,6 +322,7 @@ def global_corr(corr_func: CorrFunc, X: np.ndarray, Y: np.ndarray,
     Calculates the global correlation between X and Y, which is simply the correlation of
     all of the values in the matrices.
     """
+    X, Y = _to_nan_matrix(X), _to_nan_matrix(Y)
     # The entries must be the same shape and any nan in one must correspond to a nan in the other
     assert X.shape == Y.shape
     np.testing.assert_array_equal(np.isnan(X), np.isnan(Y))
@@ -210,26 +389,189 @@ def bootstrap_both_sample(*matrices: np.ndarray) -> Union[np.ndarray, List[np.nd
     return samples
 
 
+def _get_bootstrap_axes(sample_func: Callable) -> Optional[Tuple[bool, bool]]:
+    """
+    Returns whether the systems and inputs are resampled by `sample_func` or `None` if the sampling function is not
+    one of the known bootstrap sampling functions.
+    """
+    if sample_func is bootstrap_system_sample:
+        return True, False
+    elif sample_func is bootstrap_input_sample:
+        return False, True
+    elif sample_func is bootstrap_both_sample:
+        return True, True
+    return None
+
+
+def _is_batchable(corr_func: SummaryCorrFunc) -> bool:
+    """
+    Checks whether `corr_func` is a system-, summary-, or global-level Pearson, Spearman, or Kendall correlation
+    which `batch_corr` can calculate for many samples at once.
+    """
+    return isinstance(corr_func, functools.partial) and \
+        corr_func.func in [summary_level_corr, system_level_corr, global_corr] and \
+        len(corr_func.args) == 1 and \
+        corr_func.args[0] in [pearsonr, spearmanr, kendalltau] and \
+        not corr_func.keywords
+
+
+def batch_corr(corr_func: SummaryCorrFunc, X: np.ndarray, Y: np.ndarray) -> np.ndarray:
+    """
+    Calculates `corr_func` for each of the B matrices in the B x N x M tensors X and Y at once. The `corr_func`
+    must be one which `_is_batchable` accepts. The B correlations are returned with NaN in place of `None`.
+    """
+    level_func, coef_func = corr_func.func, corr_func.args[0]
+    B, N, M = X.shape
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore')
+
+        if level_func == summary_level_corr:
+            # Every input of every sample becomes one row
+            X_rows = X.transpose(0, 2, 1).reshape(B * M, N)
+            Y_rows = Y.transpose(0, 2, 1).reshape(B * M, N)
+            correlations = _row_corrs(coef_func, X_rows, Y_rows).reshape(B, M)
+            # Average the non-NaN correlations for each sample
+            is_valid = ~np.isnan(correlations)
+            num_valid = is_valid.sum(axis=1)
+            total = np.where(is_valid, correlations, 0).sum(axis=1)
+            return np.where(num_valid > 0, total / np.maximum(num_valid, 1), np.nan)
+        elif level_func == system_level_corr:
+            x = np.nanmean(X, axis=2)
+            y = np.nanmean(Y, axis=2)
+            correlations = _row_corrs(coef_func, x, y)
+            # A system without any scores in the sample makes the correlation NaN, just like it does for scipy
+            correlations[np.isnan(x).any(axis=1) | np.isnan(y).any(axis=1)] = np.nan
+            return correlations
+        else:
+            return _row_corrs(coef_func, X.reshape(B, N * M), Y.reshape(B, N * M))
+
+
+def _draw_bootstrap_indices(N: int, M: int,
+                            num_samples: int,
+                            resample_systems: bool,
+                            resample_inputs: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Draws the system and input indices for `num_samples` bootstrap samples. The random numbers are taken in the same
+    order as calling the corresponding bootstrap sample function `num_samples` times.
+    """
+    rows = np.empty((num_samples, N), dtype=int)
+    cols = np.empty((num_samples, M), dtype=int)
+    for k in range(num_samples):
+        rows[k] = np.random.choice(N, N, replace=True) if resample_systems else np.arange(N)
+        cols[k] = np.random.choice(M, M, replace=True) if resample_inputs else np.arange(M)
+    return rows, cols
+
+
+def bootstrap_batches(sample_func: Callable,
+                      num_samples: int,
+                      chunk_size: int,
+                      *matrices: np.ndarray) -> Generator[List[np.ndarray], None, None]:
+    """
+    Generates `num_samples` bootstrap samples of the `matrices` in chunks of at most `chunk_size` samples.
+    Each chunk is a list with one B x N x M tensor per input matrix. The indices for each chunk are drawn up front,
+    and the same samples are generated as calling `sample_func` `num_samples` times.
+    """
+    N, M = matrices[0].shape
+    for matrix in matrices:
+        assert matrix.shape == (N, M)
+    resample_systems, resample_inputs = _get_bootstrap_axes(sample_func)
+    for start in range(0, num_samples, chunk_size):
+        B = min(chunk_size, num_samples - start)
+        rows, cols = _draw_bootstrap_indices(N, M, B, resample_systems, resample_inputs)
+        yield [matrix[rows[:, :, None], cols[:, None, :]] for matrix in matrices]
+
+
+def _init_resampling_worker(*matrices: np.ndarray) -> None:
+    # The matrices are stored once per worker process so they do not need to be sent with every block
+    global _worker_matrices
+    _worker_matrices = matrices
+
+
+def _run_resampling_block(resample_func: Callable, seed: int, num_iterations: int) -> List[float]:
+    np.random.seed(seed)
+    return resample_func(num_iterations, *_worker_matrices)
+
+
+def run_resampling(resample_func: Callable,
+                   num_iterations: int,
+                   *matrices: np.ndarray,
+                   num_workers: Optional[int] = None) -> List[float]:
+    """
+    Runs `resample_func(num_iterations, *matrices)`, which should return the list of values from `num_iterations`
+    resampling iterations. If `num_workers` is not None, the iterations are split into fixed-size blocks which
+    each have their own seed drawn from numpy's global random state, and the blocks are run on a pool of
+    `num_workers` processes. The result only depends on the global random state, not on the number of workers,
+    but it will be different from running with `num_workers=None`.
+    """
+    if num_workers is None:
+        return resample_func(num_iterations, *matrices)
+    if num_workers < 1:
+        raise Exception(f'The number of workers must be positive: {num_workers}')
+
+    sizes = [min(_RESAMPLING_BLOCK_SIZE, num_iterations - start)
+             for start in range(0, num_iterations, _RESAMPLING_BLOCK_SIZE)]
+    seeds = np.random.randint(0, 2 ** 32 - 1, size=len(sizes), dtype=np.int64).tolist()
+    blocks = [(resample_func, seed, size) for seed, size in zip(seeds, sizes)]
+
+    if num_workers == 1:
+        # Run the blocks in this process without disturbing the caller's random state
+        state = np.random.get_state()
+        try:
+            _init_resampling_worker(*matrices)
+            results = [_run_resampling_block(*block) for block in blocks]
+        finally:
+            _init_resampling_worker()
+            np.random.set_state(state)
+    else:
+        with multiprocessing.Pool(num_workers, initializer=_init_resampling_worker, initargs=matrices) as pool:
+            results = pool.starmap(_run_resampling_block, blocks)
+    return [value for result in results for value in result]
+
+
+def _bootstrap_corrs(corr_func: SummaryCorrFunc,
+                     sample_func: Callable,
+                     chunk_size: int,
+                     num_samples: int,
+                     X: np.ndarray,
+                     Y: np.ndarray) -> List[float]:
+    samples = []
+    if _is_batchable(corr_func) and _get_bootstrap_axes(sample_func) is not None:
+        np.testing.assert_array_equal(np.isnan(X), np.isnan(Y))
+        for X_b, Y_b in bootstrap_batches(sample_func, num_samples, chunk_size, X, Y):
+            r = batch_corr(corr_func, X_b, Y_b)
+            # Value is ignored if it is NaN
+            samples.extend(r[~np.isnan(r)].tolist())
+    else:
+        for _ in range(num_samples):
+            x, y = sample_func(X, Y)
+            r = corr_func(x, y)
+            if r is not None:
+                # Value is ignored if it is NaN
+                samples.append(r)
+    return samples
+
+
 def bootstrap_ci(corr_func: SummaryCorrFunc,
                  X: np.ndarray,
                  Y: np.ndarray,
                  sample_func: Callable,
                  alpha: float = 0.05,
-                 num_samples: int = 1000) -> Tuple[float, float]:
+                 num_samples: int = 1000,
+                 chunk_size: int = 25,
+                 num_workers: Optional[int] = None) -> Tuple[float, float]:
     """
     Calculates a bootstrap-based confidence interval using the correlation function and X and Y. The `corr_func` should
     be the system-, summary- or global level correlations with a Pearson, Spearman, or Kendall function passed as its
     first argument. `sample_func` is the bootstrapping sample function that should be used to take the subsamples.
     The lower and upper bounds for the (1-alpha)*100% confidence interval will be returned (i.e., alpha / 2 in each tail).
+
+    If `corr_func` and `sample_func` are one of the built-in functions, the samples are computed in batches of
+    `chunk_size` at a time, which bounds the memory used to `chunk_size` copies of X and Y. See `run_resampling`
+    for `num_workers`.
     """
     assert X.shape == Y.shape
-    samples = []
-    for _ in range(num_samples):
-        x, y = sample_func(X, Y)
-        r = corr_func(x, y)
-        if r is not None:
-            # Value is ignored if it is NaN
-            samples.append(r)
+    resample_func = functools.partial(_bootstrap_corrs, corr_func, sample_func, chunk_size)
+    samples = run_resampling(resample_func, num_samples, X, Y, num_workers=num_workers)
     lower = np.percentile(samples, alpha / 2 * 100)
     upper = np.percentile(samples, (1.0 - alpha / 2) * 100)
     return lower, upper
@@ -374,6 +716,29 @@ def permute_both(X: np.ndarray, Y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     return X_p, Y_p
 
 
+def _bootstrap_deltas(corr_func: SummaryCorrFunc,
+                      sample_func: Callable,
+                      chunk_size: int,
+                      num_samples: int,
+                      X: np.ndarray,
+                      Y: np.ndarray,
+                      Z: np.ndarray) -> List[float]:
+    deltas = []
+    if _is_batchable(corr_func) and _get_bootstrap_axes(sample_func) is not None:
+        for X_b, Y_b, Z_b in bootstrap_batches(sample_func, num_samples, chunk_size, X, Y, Z):
+            batch_deltas = batch_corr(corr_func, X_b, Z_b) - batch_corr(corr_func, Y_b, Z_b)
+            # NaN deltas are the equivalent of a `None` correlation and are skipped
+            deltas.extend(batch_deltas[~np.isnan(batch_deltas)].tolist())
+    else:
+        for _ in range(num_samples):
+            X_i, Y_i, Z_i = sample_func(X, Y, Z)
+            try:
+                deltas.append(corr_func(X_i, Z_i) - corr_func(Y_i, Z_i))
+            except TypeError:
+                pass
+    return deltas
+
+
 def bootstrap_diff_test(corr_func: SummaryCorrFunc,
                         X: np.ndarray,
                         Y: np.ndarray,
@@ -382,11 +747,14 @@ def bootstrap_diff_test(corr_func: SummaryCorrFunc,
                         two_tailed: bool,
                         num_samples: int = 1000,
                         return_test_statistic: bool = False,
-                        return_deltas: bool = False) -> float:
+                        return_deltas: bool = False,
+                        chunk_size: int = 25,
+                        num_workers: Optional[int] = None) -> float:
     """
     Calculates a p-value using a paired bootstrap test. If `return_test_statistic` is True, the original delta
     is returned. If `return_deltas` is True, all of the non-NaN bootstrap sample deltas are returned. A one-tailed
-    test will calculate a p-value for corr(X, Z) > corr(Y, Z)
+    test will calculate a p-value for corr(X, Z) > corr(Y, Z). Like `bootstrap_ci`, the samples are computed
+    in batches of `chunk_size` when possible. See `run_resampling` for `num_workers`.
     """
     delta_orig = corr_func(X, Z) - corr_func(Y, Z)
     if two_tailed:
@@ -395,28 +763,19 @@ def bootstrap_diff_test(corr_func: SummaryCorrFunc,
         # of the deltas
         delta_orig = abs(delta_orig)
 
-    deltas = []
-    count = 0
-    successful_trials = 0
-    for _ in range(num_samples):
-        X_i, Y_i, Z_i = sample_func(X, Y, Z)
-        try:
-            delta = corr_func(X_i, Z_i) - corr_func(Y_i, Z_i)
-            if two_tailed:
-                delta = abs(delta)
-
-            # The pseudocode for this in "An Empirical Investigation of Statistical Significance in NLP" in
-            # Berg-Kirkpatrick et al. (2012) shows delta > 2 * delta_orig. I think the only time it really matters
-            # if it's > or >= is if the two score matrices are identical. If they are the same, delta_orig is 0
-            # and every delta would be 0. Using > would mean the count never gets incremented, resulting in a p-value
-            # of 0, which is not correct. Using >= would mean the count gets incremented every time, resulting in a
-            # p-value of 1, which is correct.
-            if delta >= 2 * delta_orig:
-                count += 1
-            successful_trials += 1
-            deltas.append(delta)
-        except TypeError:
-            pass
+    resample_func = functools.partial(_bootstrap_deltas, corr_func, sample_func, chunk_size)
+    deltas = run_resampling(resample_func, num_samples, X, Y, Z, num_workers=num_workers)
+    if two_tailed:
+        deltas = [abs(delta) for delta in deltas]
+
+    # The pseudocode for this in "An Empirical Investigation of Statistical Significance in NLP" in
+    # Berg-Kirkpatrick et al. (2012) shows delta > 2 * delta_orig. I think the only time it really matters
+    # if it's > or >= is if the two score matrices are identical. If they are the same, delta_orig is 0
+    # and every delta would be 0. Using > would mean the count never gets incremented, resulting in a p-value
+    # of 0, which is not correct. Using >= would mean the count gets incremented every time, resulting in a
+    # p-value of 1, which is correct.
+    count = sum(1 for delta in deltas if delta >= 2 * delta_orig)
+    successful_trials = len(deltas)
     pvalue = count / successful_trials
 
     output = (pvalue,)
@@ -434,6 +793,19 @@ def standardize(X: np.ndarray) -> np.ndarray:
     return (X - np.nanmean(X)) / np.nanstd(X)
 
 
+def _permutation_deltas(corr_func: SummaryCorrFunc,
+                        permute_func: Callable,
+                        num_permutations: int,
+                        X: np.ndarray,
+                        Y: np.ndarray,
+                        Z: np.ndarray) -> List[float]:
+    deltas = []
+    for _ in range(num_permutations):
+        X_p, Y_p = permute_func(X, Y)
+        deltas.append(corr_func(X_p, Z) - corr_func(Y_p, Z))
+    return deltas
+
+
 def permutation_diff_test(corr_func: SummaryCorrFunc,
                           X: np.ndarray,
                           Y: np.ndarray,
@@ -442,11 +814,12 @@ def permutation_diff_test(corr_func: SummaryCorrFunc,
                           two_tailed: bool,
                           num_permutations: int = 1000,
                           return_test_statistic: bool = False,
-                          return_deltas: bool = False) -> float:
+                          return_deltas: bool = False,
+                          num_workers: Optional[int] = None) -> float:
     """
     Calculates a p-value based on a permutation test. If `return_test_statistic` is True, the original detal will
     be returned. If `return_deltas` is True, all of the resampled deltas will be returned. A one-tailed test will
-    calculate a p-value for corr(X, Z) > corr(Y, Z)
+    calculate a p-value for corr(X, Z) > corr(Y, Z). See `run_resampling` for `num_workers`.
     """
     # The data needs to be standardized so the metrics are on the same scale. It doesn't matter
     # if we standardize Z because Pearson will first standardize it, Spearman/Kendall will rank it
@@ -460,18 +833,13 @@ def permutation_diff_test(corr_func: SummaryCorrFunc,
         # of the deltas
         delta_orig = abs(delta_orig)
 
-    deltas = []
-    count = 0
-    for _ in range(num_permutations):
-        X_p, Y_p = permute_func(X, Y)
-        delta = corr_func(X_p, Z) - corr_func(Y_p, Z)
-        if two_tailed:
-            delta = abs(delta)
-
-        # See note about >= versus > in bootstrap_diff_test
-        if delta >= delta_orig:
-            count += 1
-        deltas.append(delta)
+    resample_func = functools.partial(_permutation_deltas, corr_func, permute_func)
+    deltas = run_resampling(resample_func, num_permutations, X, Y, Z, num_workers=num_workers)
+    if two_tailed:
+        deltas = [abs(delta) for delta in deltas]
+
+    # See note about >= versus > in bootstrap_diff_test
+    count = sum(1 for delta in deltas if delta >= delta_orig)
     pvalue = (count + 1) / (num_permutations + 1)  # +1 for the original delta
 
     output = (pvalue,)
@@ -551,6 +919,150 @@ def corr_diff_test(corr_func: SummaryCorrFunc,
         raise Exception(f'Unknown hypothesis test method: {method}')
 
 
+def _get_permutation_mask(permute_func: Callable, N: int, M: int) -> np.ndarray:
+    """
+    Draws the N x M mask of the entries which `permute_func` would swap between two matrices. The random numbers
+    are taken in the same way as calling `permute_func`.
+    """
+    if permute_func is permute_systems:
+        return np.broadcast_to(random_bool_mask(N, 1), (N, M))
+    elif permute_func is permute_inputs:
+        return np.broadcast_to(random_bool_mask(1, M), (N, M))
+    elif permute_func is permute_both:
+        return random_bool_mask(N, M)
+    raise Exception(f'Unknown permutation function: {permute_func}')
+
+
+def _get_pair_deltas(corr_func: SummaryCorrFunc,
+                     matrices: np.ndarray,
+                     Z: np.ndarray,
+                     first: np.ndarray,
+                     second: np.ndarray,
+                     mask: np.ndarray) -> np.ndarray:
+    """
+    Swaps the entries in `mask` between `matrices[first[p]]` and `matrices[second[p]]` for every pair p and
+    returns the difference between their correlations to Z.
+    """
+    X_p = np.where(mask, matrices[second], matrices[first])
+    Y_p = np.where(mask, matrices[first], matrices[second])
+    if _is_batchable(corr_func):
+        Z_b = np.broadcast_to(Z, X_p.shape)
+        return batch_corr(corr_func, X_p, Z_b) - batch_corr(corr_func, Y_p, Z_b)
+    return np.array([corr_func(x, Z) - corr_func(y, Z) for x, y in zip(X_p, Y_p)], dtype=float)
+
+
+def _all_pairs_permutation_deltas(corr_func: SummaryCorrFunc,
+                                  permute_func: Callable,
+                                  num_permutations: int,
+                                  *matrices: np.ndarray) -> List[np.ndarray]:
+    *matrices, Z = matrices
+    matrices = np.stack(matrices)
+    first, second = np.triu_indices(len(matrices), k=1)
+    N, M = Z.shape
+    deltas = []
+    for _ in range(num_permutations):
+        mask = _get_permutation_mask(permute_func, N, M)
+        deltas.append(_get_pair_deltas(corr_func, matrices, Z, first, second, mask))
+    return deltas
+
+
+def _all_pairs_bootstrap_corrs(corr_func: SummaryCorrFunc,
+                               sample_func: Callable,
+                               chunk_size: int,
+                               num_samples: int,
+                               *matrices: np.ndarray) -> List[np.ndarray]:
+    *matrices, Z = matrices
+    samples = []
+    if _is_batchable(corr_func) and _get_bootstrap_axes(sample_func) is not None:
+        for *matrices_b, Z_b in bootstrap_batches(sample_func, num_samples, chunk_size, *matrices, Z):
+            correlations = np.stack([batch_corr(corr_func, X_b, Z_b) for X_b in matrices_b], axis=1)
+            samples.extend(correlations)
+    else:
+        for _ in range(num_samples):
+            *matrices_i, Z_i = sample_func(*matrices, Z)
+            correlations = [corr_func(X_i, Z_i) for X_i in matrices_i]
+            samples.append(np.array([np.nan if r is None else r for r in correlations], dtype=float))
+    return samples
+
+
+def all_pairs_diff_test(corr_func: SummaryCorrFunc,
+                        matrices: List[np.ndarray],
+                        Z: np.ndarray,
+                        method: str,
+                        two_tailed: bool,
+                        num_samples: int = 1000,
+                        chunk_size: int = 25,
+                        num_workers: Optional[int] = None) -> np.ndarray:
+    """
+    Runs the hypothesis test `method` between every pair of the K matrices in `matrices` and returns a K x K matrix
+    of p-values. Entry (i, j) is the p-value for the difference between corr(matrices[i], Z) and
+    corr(matrices[j], Z) (with H1 being corr(matrices[i], Z) > corr(matrices[j], Z) if `two_tailed` is False). The
+    diagonal is NaN.
+
+    Each bootstrap sample or permutation is drawn once and used for all of the pairs, so entry (i, j) is the same as
+    `corr_diff_test` on matrices i and j with the same random seed, up to floating point ties for the permutation
+    tests. `num_samples` is the number of bootstrap samples or permutations.
+    """
+    K = len(matrices)
+    for X in matrices:
+        assert X.shape == Z.shape
+        np.testing.assert_array_equal(np.isnan(X), np.isnan(Z))
+    pvalues = np.full((K, K), np.nan)
+
+    if method == 'williams':
+        for i, j in itertools.permutations(range(K), 2):
+            pvalues[i, j] = williams_diff_test(corr_func, matrices[i], matrices[j], Z, two_tailed)
+        return pvalues
+
+    if method.startswith('bootstrap'):
+        sample_func = {
+            'bootstrap-system': bootstrap_system_sample,
+            'bootstrap-input': bootstrap_input_sample,
+            'bootstrap-both': bootstrap_both_sample
+        }[method]
+        correlations = np.array([corr_func(X, Z) for X in matrices], dtype=float)
+        resample_func = functools.partial(_all_pairs_bootstrap_corrs, corr_func, sample_func, chunk_size)
+        samples = np.array(run_resampling(resample_func, num_samples, *matrices, Z, num_workers=num_workers))
+        for i, j in itertools.permutations(range(K), 2):
+            delta_orig = correlations[i] - correlations[j]
+            deltas = samples[:, i] - samples[:, j]
+            # NaN deltas are skipped, see `bootstrap_diff_test`
+            deltas = deltas[~np.isnan(deltas)]
+            if two_tailed:
+                delta_orig = abs(delta_orig)
+                deltas = np.abs(deltas)
+            pvalues[i, j] = np.sum(deltas >= 2 * delta_orig) / len(deltas)
+        return pvalues
+
+    if method.startswith('permutation'):
+        permute_func = {
+            'permutation-both': permute_both,
+            'permutation-system': permute_systems,
+            'permutation-input': permute_inputs
+        }[method]
+        # See `permutation_diff_test` for why the data is standardized
+        matrices = [standardize(X) for X in matrices]
+        first, second = np.triu_indices(K, k=1)
+        # The original deltas are calculated in the same way as the permuted ones so identical
+        # permutations give identical deltas
+        no_swap = np.zeros(Z.shape, dtype=bool)
+        deltas_orig = _get_pair_deltas(corr_func, np.stack(matrices), Z, first, second, no_swap)
+        resample_func = functools.partial(_all_pairs_permutation_deltas, corr_func, permute_func)
+        deltas = np.array(run_resampling(resample_func, num_samples, *matrices, Z, num_workers=num_workers))
+        for p, (i, j) in enumerate(zip(first, second)):
+            # Swapping the order of the matrices negates the deltas
+            for a, b, sign in [(i, j, 1), (j, i, -1)]:
+                delta_orig = sign * deltas_orig[p]
+                pair_deltas = sign * deltas[:, p]
+                if two_tailed:
+                    delta_orig = abs(delta_orig)
+                    pair_deltas = np.abs(pair_deltas)
+                pvalues[a, b] = (np.sum(pair_deltas >= delta_orig) + 1) / (num_samples + 1)
+        return pvalues
+
+    raise Exception(f'Unknown hypothesis test method: {method}')
+
+
 def bonferroni_partial_conjunction_pvalue_test(pvalues: List[float], alpha: float = 0.05) -> Tuple[int, List[int]]:
     N = len(pvalues)
 
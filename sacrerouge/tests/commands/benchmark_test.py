@@ -0,0 +1,104 @@
+import argparse
+import json
+import numpy as np
+import unittest
+from subprocess import PIPE, Popen
+
+from sacrerouge.commands.benchmark import BENCHMARKS, compare_to_baseline, generate_summaries, run_benchmark
+from sacrerouge.common import TemporaryDirectory
+from sacrerouge.common.testing.util import sacrerouge_command_exists
+
+
+def _get_args(**kwargs) -> argparse.Namespace:
+    sizes = {'num_systems': 3, 'num_inputs': 4, 'num_references': 2, 'summary_length': 30,
+             'num_samples': 20, 'num_repeats': 1, 'seed': 0}
+    sizes.update(kwargs)
+    return argparse.Namespace(**sizes)
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_command_exists(self):
+        assert sacrerouge_command_exists(['benchmark'])
+
+    def test_generate_summaries(self):
+        args = _get_args()
+        summaries_list, references_list = generate_summaries(args, np.random.RandomState(0))
+        assert len(summaries_list) == len(references_list) == 4
+        assert all(len(summaries) == 3 for summaries in summaries_list)
+        assert all(len(references) == 2 for references in references_list)
+        assert all(len(' '.join(summary).split()) == 30 for summaries in summaries_list for summary in summaries)
+
+        # The data only depends on the seed
+        assert generate_summaries(args, np.random.RandomState(0)) == (summaries_list, references_list)
+
+    def test_run_benchmark(self):
+        args = _get_args()
+        for name, benchmark in BENCHMARKS.items():
+            result = run_benchmark(benchmark, args)
+            assert result['num_items'] > 0, name
+            assert result['items_per_second'] > 0, name
+            assert result['peak_memory_mb'] >= 0, name
+
+    def test_compare_to_baseline(self):
+        config = {'num_systems': 3, 'num_inputs': 4, 'num_references': 2, 'summary_length': 30,
+                  'num_samples': 20, 'seed': 0}
+        baseline = {
+            'config': config,
+            'results': {
+                'a': {'num_items': 10, 'items_per_second': 100.0},
+                'b': {'num_items': 10, 'items_per_second': 100.0},
+                'c': {'num_items': 20, 'items_per_second': 100.0},
+            }
+        }
+        output = {
+            'config': dict(config),
+            'results': {
+                'a': {'num_items': 10, 'items_per_second': 95.0},
+                'b': {'num_items': 10, 'items_per_second': 50.0},
+                'c': {'num_items': 10, 'items_per_second': 50.0},
+                'd': {'num_items': 10, 'items_per_second': 50.0},
+            }
+        }
+        # "a" is within the tolerance, and "c" and "d" cannot be compared
+        regressions = compare_to_baseline(output, baseline, 0.1)
+        assert list(regressions.keys()) == ['b']
+        assert regressions['b']['ratio'] == 0.5
+
+        # A baseline with a different configuration cannot be compared
+        output['config']['seed'] = 1
+        with self.assertRaises(Exception):
+            compare_to_baseline(output, baseline, 0.1)
+        with self.assertRaises(Exception):
+            compare_to_baseline(output, {'results': baseline['results']}, 0.1)
+
+    def test_benchmark_command(self):
+        with TemporaryDirectory() as temp_dir:
+            command = [
+                'python', '-m', 'sacrerouge', 'benchmark',
+                '--benchmarks', 'python-rouge', 'convert-to-matrices',
+                '--num-systems', '3',
+                '--num-inputs', '4',
+                '--num-repeats', '1',
+                '--output-file', f'{temp_dir}/baseline.json',
+                '--silent'
+            ]
+            process = Popen(command, stdout=PIPE, stderr=PIPE)
+            process.communicate()
+            assert process.returncode == 0
+
+            with open(f'{temp_dir}/baseline.json', 'r') as f:
+                output = json.load(f)
+            assert output['config']['num_systems'] == 3
+            assert list(output['results'].keys()) == ['python-rouge', 'convert-to-matrices']
+            assert output['results']['convert-to-matrices']['num_items'] == 12
+
+            # Compare against a baseline which is impossibly fast
+            for result in output['results'].values():
+                result['items_per_second'] *= 1000
+            with open(f'{temp_dir}/fast.json', 'w') as out:
+                json.dump(output, out)
+
+            process = Popen(command[:-3] + ['--baseline', f'{temp_dir}/fast.json', '--fail-on-regression', '--silent'],
+                            stdout=PIPE, stderr=PIPE)
+            process.communicate()
+            assert process.returncode != 0
@@ -0,0 +1,39 @@
+import json
+import subprocess
+import unittest
+
+from sacrerouge.common import TemporaryDirectory
+from sacrerouge.common.testing import MULTILING_METRICS
+from sacrerouge.common.testing.util import sacrerouge_command_exists
+
+
+class TestBuildScoreStore(unittest.TestCase):
+    def test_command_exists(self):
+        assert sacrerouge_command_exists(['build-score-store'])
+
+    def test_correlate_with_store(self):
+        # The correlations should be identical whether the jsonl file or the score store is used
+        with TemporaryDirectory() as temp_dir:
+            command = [
+                'python', '-m', 'sacrerouge', 'build-score-store',
+                '--metrics-jsonl-files', MULTILING_METRICS,
+                '--output-dir', f'{temp_dir}/store',
+                '--silent'
+            ]
+            subprocess.run(command, check=True)
+
+            for name, input_file in [('jsonl', MULTILING_METRICS), ('store', f'{temp_dir}/store')]:
+                command = [
+                    'python', '-m', 'sacrerouge', 'correlate',
+                    '--metrics-jsonl-files', input_file,
+                    '--metrics', 'rouge-1_jk_precision', 'grade',
+                    '--summarizer-type', 'all',
+                    '--confidence-interval-method', 'none',
+                    '--output-file', f'{temp_dir}/{name}.json',
+                    '--silent'
+                ]
+                subprocess.run(command, check=True)
+
+            expected = json.load(open(f'{temp_dir}/jsonl.json', 'r'))
+            actual = json.load(open(f'{temp_dir}/store.json', 'r'))
+            assert expected == actual
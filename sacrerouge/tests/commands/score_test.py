@@ -1,15 +1,36 @@
+import json
 import unittest
 from collections import defaultdict
 from subprocess import PIPE, Popen
+from typing import List
 
+from sacrerouge.commands.score import score_instances, score_instances_incrementally
 from sacrerouge.common import TemporaryDirectory
+from sacrerouge.common.metric_cache import MetricCache
 from sacrerouge.common.testing import FIXTURES_ROOT, MULTILING_SUMMARIES
+from sacrerouge.common.testing import testing_metric
 from sacrerouge.common.testing.util import sacrerouge_command_exists
-from sacrerouge.data import Metrics
-from sacrerouge.io import JsonlReader
+from sacrerouge.data import Metrics, MetricsDict
+from sacrerouge.data.dataset_readers import ReferenceBasedDatasetReader
+from sacrerouge.data.types import ReferenceType, SummaryType
+from sacrerouge.io import JsonlReader, JsonlWriter
+from sacrerouge.metrics import PythonRouge
 
 _config_file_path = f'{FIXTURES_ROOT}/configs/score.json'
 _numeric_config_file_path = f'{FIXTURES_ROOT}/configs/evaluate-numeric.json'
+_numeric_summaries_file_path = f'{FIXTURES_ROOT}/data/numeric/summaries.jsonl'
+
+
+class CountingMetric(testing_metric.TestingMetric):
+    def __init__(self):
+        super().__init__()
+        self.num_scored = 0
+
+    def score_multi_all(self,
+                        summaries_list: List[List[SummaryType]],
+                        references_list: List[List[ReferenceType]]) -> List[List[MetricsDict]]:
+        self.num_scored += sum(len(summaries) for summaries in summaries_list)
+        return super().score_multi_all(summaries_list, references_list)
 
 
 class TestScore(unittest.TestCase):
@@ -195,4 +216,143 @@ class TestScore(unittest.TestCase):
                   "recall": 20.238095238095237,
                   "f1": 20.318725099601597
                 }
-            }
\ No newline at end of file
+            }
+
+    def test_cache(self):
+        with TemporaryDirectory() as temp_dir:
+            # The second run loads all of the results from the cache, which should not change the output
+            for output_file in [f'{temp_dir}/metrics.jsonl', f'{temp_dir}/metrics-cached.jsonl']:
+                command = [
+                    'python', '-m', 'sacrerouge', 'score',
+                    '--config', _numeric_config_file_path,
+                    '--output-jsonl', output_file,
+                    '--cache-dir', f'{temp_dir}/cache'
+                ]
+
+                process = Popen(command, stdout=PIPE, stderr=PIPE)
+                _, stderr = process.communicate()
+                assert process.returncode == 0, stderr.decode()
+
+            metrics_list = JsonlReader(f'{temp_dir}/metrics.jsonl', Metrics).read()
+            cached_metrics_list = JsonlReader(f'{temp_dir}/metrics-cached.jsonl', Metrics).read()
+            assert len(metrics_list) == 5
+            assert metrics_list == cached_metrics_list
+            assert metrics_list[0].metrics == {'test': 1110, 'test_jk': 740}
+            assert metrics_list[4].metrics == {'test_jk': 110000}
+
+    def test_chunk_size(self):
+        with TemporaryDirectory() as temp_dir:
+            # Scoring the instances in chunks should not change the metrics, only their order in the output
+            for output_file, extra_args in [(f'{temp_dir}/metrics.jsonl', []),
+                                            (f'{temp_dir}/metrics-chunked.jsonl', ['--chunk-size', '7'])]:
+                command = [
+                    'python', '-m', 'sacrerouge', 'score',
+                    '--config', _config_file_path,
+                    '--output-jsonl', output_file
+                ] + extra_args
+
+                process = Popen(command, stdout=PIPE, stderr=PIPE)
+                process.communicate()
+
+            metrics_list = JsonlReader(f'{temp_dir}/metrics.jsonl', Metrics).read()
+            chunked_metrics_list = JsonlReader(f'{temp_dir}/metrics-chunked.jsonl', Metrics).read()
+            assert len(metrics_list) == len(JsonlReader(MULTILING_SUMMARIES).read())
+
+            def get_key(metrics: Metrics):
+                return metrics.instance_id, metrics.summarizer_id
+
+            assert sorted(metrics_list, key=get_key) == sorted(chunked_metrics_list, key=get_key)
+
+    def test_reference_statistics(self):
+        # Scoring with the per-reference statistics should not change the results, including for jackknifing
+        instances = ReferenceBasedDatasetReader().read(MULTILING_SUMMARIES)
+        metric = PythonRouge(compute_rouge_l=True)
+        expected_metric = PythonRouge(compute_rouge_l=True)
+        expected_metric.decomposes_by_reference = False
+        assert score_instances(instances, [metric]) == score_instances(instances, [expected_metric])
+
+    def test_incremental(self):
+        instances = ReferenceBasedDatasetReader().read(_numeric_summaries_file_path)
+        metric_keys = [MetricCache.get_metric_key({'type': 'testing'})]
+
+        def get_expected(instances):
+            metrics_dicts = score_instances(instances, [testing_metric.TestingMetric()])
+            return [metrics_dicts[instance_id][summarizer_id]
+                    for instance_id in sorted(metrics_dicts.keys())
+                    for summarizer_id in sorted(metrics_dicts[instance_id].keys())]
+
+        with TemporaryDirectory() as temp_dir:
+            output_file = f'{temp_dir}/metrics.jsonl'
+
+            # The two peers are each scored with the full references and the three jackknifing references
+            metric = CountingMetric()
+            score_instances_incrementally(instances[:2], [metric], output_file, metric_keys)
+            assert metric.num_scored == 8
+            assert JsonlReader(output_file, Metrics).read() == get_expected(instances[:2])
+
+            # Only the new reference summaries are scored
+            metric = CountingMetric()
+            score_instances_incrementally(instances, [metric], output_file, metric_keys)
+            assert metric.num_scored == 3
+            assert JsonlReader(output_file, Metrics).read() == get_expected(instances)
+
+            metric = CountingMetric()
+            score_instances_incrementally(instances, [metric], output_file, metric_keys)
+            assert metric.num_scored == 0
+            assert JsonlReader(output_file, Metrics).read() == get_expected(instances)
+
+            # Changing reference "C" changes the context of every summary except "C", which is its own summary
+            changed_file = f'{temp_dir}/summaries.jsonl'
+            with JsonlWriter(changed_file) as out:
+                for instance in JsonlReader(_numeric_summaries_file_path).read():
+                    out.write(json.loads(json.dumps(instance).replace('"1000"', '"2000"')))
+            changed_instances = ReferenceBasedDatasetReader().read(changed_file)
+
+            metric = CountingMetric()
+            score_instances_incrementally(changed_instances, [metric], output_file, metric_keys)
+            assert metric.num_scored == 11
+            assert JsonlReader(output_file, Metrics).read() == get_expected(changed_instances)
+
+            # Removed summaries are removed from the output
+            metric = CountingMetric()
+            score_instances_incrementally(changed_instances[1:], [metric], output_file, metric_keys)
+            assert metric.num_scored == 0
+            assert JsonlReader(output_file, Metrics).read() == get_expected(changed_instances[1:])
+
+            # The fingerprints are not used if the output was changed by something else
+            metrics_list = JsonlReader(output_file, Metrics).read()
+            metrics_list[0].metrics['test'] = 0
+            with JsonlWriter(output_file) as out:
+                for metrics in metrics_list:
+                    out.write(metrics)
+            metric = CountingMetric()
+            score_instances_incrementally(changed_instances, [metric], output_file, metric_keys)
+            assert metric.num_scored == 11
+
+    def test_profile(self):
+        with TemporaryDirectory() as temp_dir:
+            output_file = f'{temp_dir}/metrics.jsonl'
+            command = [
+                'python', '-m', 'sacrerouge', 'score',
+                '--config', _config_file_path,
+                '--output-jsonl', output_file,
+                '--profile'
+            ]
+
+            process = Popen(command, stdout=PIPE, stderr=PIPE)
+            process.communicate()
+
+            # The profiling should not change the output
+            num_instances = len(JsonlReader(MULTILING_SUMMARIES).read())
+            assert len(JsonlReader(output_file, Metrics).read()) == num_instances
+
+            with open(f'{output_file}.profile.json', 'r') as f:
+                report = json.load(f)
+            stages = report['stages']
+            assert stages['read_instances']['num_items'] == num_instances
+            assert stages['write_results']['num_items'] == num_instances
+            assert any(name.endswith('/score_multi_all') or name.endswith('/score_reference_statistics_all')
+                       for name in stages)
+            for stage in stages.values():
+                assert stage['calls'] > 0
+                assert stage['wall_time'] >= 0
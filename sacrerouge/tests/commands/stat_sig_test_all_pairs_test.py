@@ -0,0 +1,50 @@
+import json
+import subprocess
+import unittest
+
+from sacrerouge.common import TemporaryDirectory
+from sacrerouge.common.testing import MULTILING_METRICS
+from sacrerouge.common.testing.util import sacrerouge_command_exists
+
+
+class TestAllPairsStatisticalSignifianceTest(unittest.TestCase):
+    def test_command_exists(self):
+        assert sacrerouge_command_exists(['stat-sig-test-all-pairs'])
+
+    def test_all_pairs(self):
+        metrics = ['rouge-1_precision', 'rouge-1_jk_precision', 'length_aware_grade']
+        with TemporaryDirectory() as temp_dir:
+            command = [
+                'python', '-m', 'sacrerouge', 'stat-sig-test-all-pairs',
+                '--metrics-jsonl-files', MULTILING_METRICS,
+                '--dependent-metric', 'grade',
+                '--metrics', *metrics,
+                '--summarizer-type', 'peer',
+                '--hypothesis-test', 'permutation-both',
+                '--num-samples', '100',
+                '--skip-summary-level',
+                '--output-file', f'{temp_dir}/results.json',
+                '--random-seed', '3',
+                '--silent'
+            ]
+            subprocess.run(command, check=True)
+            results = json.load(open(f'{temp_dir}/results.json', 'r'))
+
+            assert results['dependent_metric'] == 'grade'
+            assert results['metrics'] == metrics
+            assert results['test_method'] == 'permutation-both'
+            assert results['H1'] == 'r(A, grade) > r(B, grade)'
+            assert 'summary_level' not in results
+
+            for level in ['system_level', 'global']:
+                for coef in ['pearson', 'spearman', 'kendall']:
+                    pvalues = results[level][coef]['pvalues']
+                    is_significant = results[level][coef]['is_significant']
+                    assert len(pvalues) == len(is_significant) == 3
+                    for i in range(3):
+                        assert pvalues[i][i] is None
+                        assert is_significant[i][i] is None
+                        for j in range(3):
+                            if i != j:
+                                assert 0 < pvalues[i][j] <= 1
+                                assert is_significant[i][j] == (pvalues[i][j] <= 0.05)
@@ -0,0 +1,133 @@
+import os
+import unittest
+from typing import List
+
+from sacrerouge.common import TemporaryDirectory
+from sacrerouge.common.metric_cache import MetricCache
+from sacrerouge.common.testing import FIXTURES_ROOT
+from sacrerouge.common.testing import testing_metric
+from sacrerouge.commands.evaluate import evaluate_instances
+from sacrerouge.commands.score import score_instances
+from sacrerouge.data import MetricsDict
+from sacrerouge.data.dataset_readers import ReferenceBasedDatasetReader
+from sacrerouge.data.types import ReferenceType, SummaryType
+
+
+class CountingMetric(testing_metric.TestingMetric):
+    def __init__(self):
+        super().__init__()
+        self.num_scored = 0
+
+    def score_multi_all(self,
+                        summaries_list: List[List[SummaryType]],
+                        references_list: List[List[ReferenceType]]) -> List[List[MetricsDict]]:
+        self.num_scored += sum(len(summaries) for summaries in summaries_list)
+        return super().score_multi_all(summaries_list, references_list)
+
+
+class TestMetricCache(unittest.TestCase):
+    def test_get_put(self):
+        with TemporaryDirectory() as temp_dir:
+            cache = MetricCache(temp_dir)
+            metric_key = MetricCache.get_metric_key({'type': 'python-rouge'})
+            key = cache.get_key(metric_key, 'The summary', ['The reference'])
+            assert key == cache.get_key(metric_key, 'The summary', ['The reference'])
+            assert key != cache.get_key(metric_key, 'The summary', ['Another reference'])
+            assert key != cache.get_key(MetricCache.get_metric_key({'type': 'rouge'}), 'The summary', ['The reference'])
+
+            assert cache.get(key) is None
+            cache.put(key, MetricsDict({'rouge-1': {'recall': 0.5}}))
+            assert cache.get(key) == {'rouge-1': {'recall': 0.5}}
+
+            # The results are persistent
+            assert MetricCache(temp_dir).get(key) == {'rouge-1': {'recall': 0.5}}
+
+    def test_eviction(self):
+        with TemporaryDirectory() as temp_dir:
+            cache = MetricCache(temp_dir)
+            keys = [cache.get_key('metric', i) for i in range(3)]
+            for i, key in enumerate(keys):
+                cache.put(key, {'value': i})
+                # Make sure the last access times are ordered
+                os.utime(cache._get_path(key), (i, i))
+            size = cache._get_total_size()
+
+            # Reading the first result makes the second one the least recently used
+            cache.get(keys[0])
+            cache = MetricCache(temp_dir, max_size=size, eviction_fraction=1.0)
+            cache.put(cache.get_key('metric', 3), {'value': 3})
+            assert cache.get(keys[0]) == {'value': 0}
+            assert cache.get(keys[1]) is None
+            assert cache.get(keys[2]) == {'value': 2}
+            assert cache._get_total_size() <= size
+
+            # The results are removed down to the eviction fraction, so the two least recently used are removed
+            for i, key in enumerate([keys[0], keys[2], cache.get_key('metric', 3)]):
+                os.utime(cache._get_path(key), (i, i))
+            cache = MetricCache(temp_dir, max_size=size, eviction_fraction=0.7)
+            cache.put(cache.get_key('metric', 4), {'value': 4})
+            assert cache.get(keys[0]) is None
+            assert cache.get(keys[2]) is None
+            assert cache.get(cache.get_key('metric', 3)) == {'value': 3}
+            assert cache.get(cache.get_key('metric', 4)) == {'value': 4}
+            assert cache._get_total_size() <= size * 0.7
+
+    def test_eviction_scans(self):
+        with TemporaryDirectory() as temp_dir:
+            cache = MetricCache(temp_dir)
+            cache.put(cache.get_key('metric', 0), {'value': 0})
+            size = cache._get_total_size()
+
+            # Once the cache is full, the directory should only be scanned after every 10 or so new results
+            cache = MetricCache(temp_dir, max_size=size * 100)
+            num_scans = 0
+            get_files = cache._get_files
+
+            def count_scans():
+                nonlocal num_scans
+                num_scans += 1
+                return get_files()
+
+            cache._get_files = count_scans
+            for i in range(500):
+                cache.put(cache.get_key('metric', i), {'value': i % 10})
+            assert num_scans <= 50
+            assert cache._get_total_size() <= size * 100
+
+            # Replacing an existing result should not change the size of the cache
+            cache = MetricCache(temp_dir, max_size=size * 100)
+            expected_size = cache._size
+            key = cache.get_key('metric', 499)
+            cache.put(key, {'value': 9})
+            assert cache._size == expected_size
+
+    def test_score_instances(self):
+        instances = ReferenceBasedDatasetReader().read(f'{FIXTURES_ROOT}/data/numeric/summaries.jsonl')
+        metric = CountingMetric()
+        expected = score_instances(instances, [metric])
+        num_total = metric.num_scored
+
+        with TemporaryDirectory() as temp_dir:
+            cache = MetricCache(temp_dir)
+            metric_keys = [MetricCache.get_metric_key({'type': 'testing'})]
+
+            metric = CountingMetric()
+            score_instances(instances[:2], [metric], cache=cache, metric_keys=metric_keys)
+            num_scored = metric.num_scored
+
+            # Only the summaries and jackknifing contexts which are not in the cache should be scored
+            metric = CountingMetric()
+            metrics_dicts = score_instances(instances, [metric], cache=cache, metric_keys=metric_keys)
+            assert metric.num_scored == num_total - num_scored
+            assert metrics_dicts == expected
+
+            metric = CountingMetric()
+            metrics_dicts = score_instances(instances, [metric], cache=cache, metric_keys=metric_keys)
+            assert metric.num_scored == 0
+            assert metrics_dicts == expected
+
+            # "evaluate" shares the results of "score"
+            metric = CountingMetric()
+            macro, micro_list = evaluate_instances(instances, [metric], cache=cache, metric_keys=metric_keys)
+            assert metric.num_scored == 0
+            assert (macro, micro_list) == evaluate_instances(instances, [testing_metric.TestingMetric()])
@@ -0,0 +1,56 @@
+import os
+import pytest
+import unittest
+
+from sacrerouge.common.metric_scheduler import run_metric_tasks
+from sacrerouge.common.testing import MULTILING_SUMMARIES
+from sacrerouge.commands.evaluate import evaluate_instances
+from sacrerouge.commands.score import score_instances
+from sacrerouge.data.dataset_readers import ReferenceBasedDatasetReader
+from sacrerouge.metrics import PythonRouge
+
+
+class ThreadPythonRouge(PythonRouge):
+    cpu_bound = False
+
+
+def _get_pid(metric: PythonRouge, value: int):
+    return metric.ngram_orders, value, os.getpid()
+
+
+class TestMetricScheduler(unittest.TestCase):
+    def test_run_metric_tasks(self):
+        metrics = [PythonRouge(ngram_orders=[1]), ThreadPythonRouge(ngram_orders=[2]), PythonRouge(ngram_orders=[3])]
+        args_list = [(1,), (2,), (3,)]
+        for max_parallel_metrics in [1, 2, 3]:
+            results = run_metric_tasks(_get_pid, metrics, args_list, max_parallel_metrics)
+            assert [result[:2] for result in results] == [([1], 1), ([2], 2), ([3], 3)]
+            # The thread metric always runs in this process and the CPU-bound metrics only do in serial mode
+            assert results[1][2] == os.getpid()
+            if max_parallel_metrics == 1:
+                assert results[0][2] == os.getpid()
+            else:
+                assert results[0][2] != os.getpid()
+                assert results[2][2] != os.getpid()
+
+        with pytest.raises(Exception):
+            run_metric_tasks(_get_pid, metrics, args_list, 0)
+
+    def test_parallel_same_as_serial(self):
+        instances = ReferenceBasedDatasetReader().read(MULTILING_SUMMARIES)
+        metrics = [PythonRouge(ngram_orders=[1]), ThreadPythonRouge(ngram_orders=[2]),
+                   PythonRouge(ngram_orders=[3], compute_rouge_l=True)]
+
+        expected = score_instances(instances, metrics)
+        actual = score_instances(instances, metrics, max_parallel_metrics=3)
+        assert actual == expected
+        for instance_id in expected:
+            for summarizer_id in expected[instance_id]:
+                # The metrics should also be in the same order
+                assert list(actual[instance_id][summarizer_id].metrics.keys()) == \
+                       list(expected[instance_id][summarizer_id].metrics.keys())
+
+        expected_macro, expected_micro_list = evaluate_instances(instances, metrics)
+        actual_macro, actual_micro_list = evaluate_instances(instances, metrics, max_parallel_metrics=2)
+        assert actual_macro == expected_macro
+        assert actual_micro_list == expected_micro_list
@@ -0,0 +1,65 @@
+import unittest
+from nltk.stem import PorterStemmer
+
+from sacrerouge.common.preprocessing_cache import PREPROCESSING_CACHE, PreprocessingCache, porter_stem
+from sacrerouge.common.testing import MULTILING_SUMMARIES
+from sacrerouge.io import JsonlReader
+from sacrerouge.metrics import PythonRouge
+
+
+class TestPreprocessingCache(unittest.TestCase):
+    def test_get(self):
+        cache = PreprocessingCache(max_size=2)
+        calls = []
+
+        def preprocess(text):
+            calls.append(text)
+            return text.split()
+
+        assert cache.get('config', 'a b', lambda: preprocess('a b')) == ['a', 'b']
+        assert cache.get('config', 'a b', lambda: preprocess('a b')) == ['a', 'b']
+        assert calls == ['a b']
+
+        # The configuration is part of the key
+        assert cache.get('other', 'a b', lambda: preprocess('a b')) == ['a', 'b']
+        assert calls == ['a b', 'a b']
+        assert len(cache) == 2
+
+    def test_lru_eviction(self):
+        cache = PreprocessingCache(max_size=2)
+        cache.get('config', 'a', lambda: 'A')
+        cache.get('config', 'b', lambda: 'B')
+        # Reading "a" makes "b" the least recently used
+        cache.get('config', 'a', lambda: 'X')
+        cache.get('config', 'c', lambda: 'C')
+        assert len(cache) == 2
+        assert cache.get('config', 'a', lambda: 'X') == 'A'
+        assert cache.get('config', 'b', lambda: 'X') == 'X'
+
+    def test_porter_stem(self):
+        stemmer = PorterStemmer(PorterStemmer.ORIGINAL_ALGORITHM)
+        for token in ['running', 'dissidents', 'prominent', 'respectively', 'running']:
+            assert porter_stem(token) == stemmer.stem(token)
+        # The saved stems are bounded
+        assert porter_stem.cache_info().maxsize is not None
+
+    def test_python_rouge_shares_preprocessing(self):
+        instances = JsonlReader(MULTILING_SUMMARIES).read()[:3]
+        summaries = [instance['summary']['text'] for instance in instances]
+        references_list = [[reference['text'] for reference in instance['references']] for instance in instances]
+
+        PREPROCESSING_CACHE.clear()
+        expected = PythonRouge().score_all(summaries, references_list)
+        num_cached = len(PREPROCESSING_CACHE)
+        assert num_cached > 0
+
+        # A metric with the same preprocessing parameters reuses the cached summaries
+        metric = PythonRouge(ngram_orders=[1, 2], compute_rouge_l=True)
+        actual = metric.score_all(summaries, references_list)
+        assert len(PREPROCESSING_CACHE) == num_cached
+        for expected_metrics, actual_metrics in zip(expected, actual):
+            assert actual_metrics['python-rouge-1'] == expected_metrics['python-rouge-1']
+
+        # Different parameters are cached separately
+        PythonRouge(use_porter_stemmer=False).score_all(summaries, references_list)
+        assert len(PREPROCESSING_CACHE) == 2 * num_cached
@@ -0,0 +1,61 @@
+import json
+import time
+import unittest
+
+from sacrerouge.common import TemporaryDirectory
+from sacrerouge.common.profiler import Profiler, get_profile_file
+
+
+class TestProfiler(unittest.TestCase):
+    def test_disabled(self):
+        profiler = Profiler()
+        with profiler.stage('read', 5):
+            pass
+        assert profiler.get_report()['stages'] == {}
+
+    def test_stage(self):
+        profiler = Profiler()
+        profiler.enable()
+        with profiler.stage('read', 5):
+            time.sleep(0.01)
+        with profiler.stage('read') as stage:
+            stage.num_items = 3
+        with profiler.stage('write'):
+            pass
+
+        report = profiler.get_report()
+        assert list(report['stages'].keys()) == ['read', 'write']
+        read = report['stages']['read']
+        assert read['calls'] == 2
+        assert read['num_items'] == 8
+        assert read['wall_time'] >= 0.01
+        assert read['items_per_second'] > 0
+        assert report['stages']['write']['num_items'] == 0
+        assert report['wall_time'] >= read['wall_time']
+
+        # Enabling the profiler again starts a new report
+        profiler.enable()
+        assert profiler.get_report()['stages'] == {}
+
+    def test_exception(self):
+        # The stage is recorded even if its code fails
+        profiler = Profiler()
+        profiler.enable()
+        with self.assertRaises(ValueError):
+            with profiler.stage('fail'):
+                raise ValueError()
+        assert profiler.get_report()['stages']['fail']['calls'] == 1
+
+    def test_save_report(self):
+        profiler = Profiler()
+        profiler.enable()
+        with profiler.stage('read', 1):
+            pass
+
+        with TemporaryDirectory() as temp_dir:
+            output_file = get_profile_file(f'{temp_dir}/metrics.jsonl')
+            assert output_file == f'{temp_dir}/metrics.jsonl.profile.json'
+            profiler.save_report(output_file)
+            with open(output_file, 'r') as f:
+                report = json.load(f)
+            assert report['stages']['read']['num_items'] == 1
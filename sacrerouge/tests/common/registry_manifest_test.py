@@ -0,0 +1,47 @@
+import json
+import subprocess
+import sys
+import unittest
+
+from sacrerouge.common.registry_manifest import MANIFEST_FILE, build_manifest
+
+
+def _run_python(code: str) -> str:
+    process = subprocess.run([sys.executable, '-c', code], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    assert process.returncode == 0, process.stderr.decode()
+    return process.stdout.decode().strip()
+
+
+class TestRegistryManifest(unittest.TestCase):
+    def test_manifest_up_to_date(self):
+        # If this fails, regenerate the manifest with "python -m sacrerouge.scripts.build_registry_manifest"
+        with open(MANIFEST_FILE, 'r') as f:
+            assert json.load(f) == build_manifest()
+
+    def test_manifest(self):
+        manifest = build_manifest()
+        assert manifest['RootSubcommand']['correlate'] == 'sacrerouge.commands.correlate'
+        assert manifest['Metric']['python-rouge'] == 'sacrerouge.metrics.python_rouge'
+        assert manifest['DatasetReader']['reference-based'] == 'sacrerouge.data.dataset_readers.reference_based'
+
+    def test_lazy_resolution(self):
+        # Resolving a name imports the module which registers it, and no others
+        output = _run_python(
+            'import sys\n'
+            'from sacrerouge.commands import RootSubcommand\n'
+            'print("sacrerouge.commands.correlate" in sys.modules)\n'
+            'RootSubcommand.by_name("correlate")\n'
+            'print("sacrerouge.commands.correlate" in sys.modules)\n'
+            'print("correlate" in RootSubcommand.list_available())\n'
+        )
+        assert output.split() == ['False', 'True', 'True']
+
+    def test_root_command_does_not_import_metrics(self):
+        output = _run_python(
+            'import sys\n'
+            'from sacrerouge.arguments import build_argument_parser\n'
+            'build_argument_parser(["correlate"])\n'
+            'print("sacrerouge.metrics" in sys.modules)\n'
+            'print("sacrerouge.commands.score" in sys.modules)\n'
+        )
+        assert output.split() == ['False', 'False']
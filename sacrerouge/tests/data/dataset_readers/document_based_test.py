@@ -1,6 +1,9 @@
 import unittest
 
-from sacrerouge.data.dataset_readers.document_based import flatten_document
+from sacrerouge.common import TemporaryDirectory
+from sacrerouge.common.testing import MULTILING_DOCUMENTS, MULTILING_SUMMARIES
+from sacrerouge.data.dataset_readers.document_based import DocumentBasedDatasetReader, flatten_document
+from sacrerouge.io import JsonlReader, JsonlWriter
 
 
 class TestDocumentBasedReader(unittest.TestCase):
@@ -11,3 +14,21 @@ class TestDocumentBasedReader(unittest.TestCase):
             ['F']
         ]
         assert flatten_document(document) == ['A', 'B', 'C', 'D', 'E', 'F']
+
+    def test_shared_documents(self):
+        documents = {data['instance_id']: data['documents'] for data in JsonlReader(MULTILING_DOCUMENTS).read()}
+        with TemporaryDirectory() as temp_dir:
+            # Copy the documents into every summary's line, as the reader expects
+            with JsonlWriter(f'{temp_dir}/summaries.jsonl') as out:
+                for data in JsonlReader(MULTILING_SUMMARIES).read():
+                    data['documents'] = documents[data['instance_id']]
+                    out.write(data)
+
+            instances = DocumentBasedDatasetReader().read(f'{temp_dir}/summaries.jsonl')
+
+        # Every summary for the same input should share one `DocumentsField`
+        instance_id_to_field = {}
+        for instance in instances:
+            field = instance.fields['documents']
+            assert field is instance_id_to_field.setdefault(instance.instance_id, field)
+        assert len(set(map(id, instance_id_to_field.values()))) == len(documents)
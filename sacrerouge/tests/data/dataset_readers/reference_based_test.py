@@ -0,0 +1,24 @@
+import unittest
+from collections import defaultdict
+
+from sacrerouge.common.testing import MULTILING_SUMMARIES
+from sacrerouge.data.dataset_readers import ReferenceBasedDatasetReader
+from sacrerouge.io import JsonlReader
+
+
+class TestReferenceBasedReader(unittest.TestCase):
+    def test_shared_references(self):
+        instances = ReferenceBasedDatasetReader().read(MULTILING_SUMMARIES)
+        assert len(instances) == len(JsonlReader(MULTILING_SUMMARIES).read())
+
+        # All of the peers for the same input have the same references, which should be one shared object
+        references_fields = defaultdict(list)
+        for instance in instances:
+            if instance.summarizer_type == 'peer':
+                references_fields[instance.instance_id].append(instance.fields['references'])
+
+        assert len(references_fields) > 1
+        for fields in references_fields.values():
+            assert len(fields) > 1
+            assert all(field is fields[0] for field in fields)
+        assert len(set(id(fields[0]) for fields in references_fields.values())) == len(references_fields)
@@ -0,0 +1,87 @@
+import gc
+import pickle
+import pytest
+import unittest
+
+from sacrerouge.data.fields import DocumentsField, FieldInterner, Fields, ReferencesField, SummaryField
+
+
+class TestFields(unittest.TestCase):
+    def test_field_equality(self):
+        references = ['The first reference', ['The second', 'reference']]
+        field = ReferencesField(references)
+        assert field == ReferencesField(['The first reference', ['The second', 'reference']])
+        assert hash(field) == hash(ReferencesField(['The first reference', ['The second', 'reference']]))
+        assert field != ReferencesField(['The first reference'])
+        assert field != DocumentsField(references)
+
+    def test_field_to_input(self):
+        # The input should be the same type as what was passed to the constructor, and changing the
+        # list that was passed to the constructor should not change the field
+        references = ['The first reference', ['The second', 'reference']]
+        field = ReferencesField(references)
+        assert field.to_input() == references
+        assert isinstance(field.to_input()[1], list)
+
+        references[1].append('changed')
+        assert field.to_input() == ['The first reference', ['The second', 'reference']]
+        assert field == ReferencesField(['The first reference', ['The second', 'reference']])
+
+        # The same input is shared by every call instead of being copied
+        assert field.to_input() is field.to_input()
+        documents_field = DocumentsField(['A document'])
+        assert documents_field.to_input() is documents_field.to_input()
+
+        assert SummaryField('A summary').to_input() == 'A summary'
+        assert SummaryField(['A', 'summary']).to_input() == ['A', 'summary']
+
+    def test_field_immutable(self):
+        field = DocumentsField(['A document'])
+        with pytest.raises(AttributeError):
+            field.documents = ['Another document']
+        with pytest.raises(AttributeError):
+            field.other = 1
+        assert field.to_input() == ['A document']
+
+    def test_fields_immutable(self):
+        fields = Fields({'summary': SummaryField('A summary'), 'references': ReferencesField(['A reference'])})
+        expected_hash = hash(fields)
+        with pytest.raises(Exception):
+            fields['summary'] = SummaryField('Another summary')
+        with pytest.raises(Exception):
+            fields.update({'summary': SummaryField('Another summary')})
+        with pytest.raises(Exception):
+            del fields['summary']
+        assert hash(fields) == expected_hash
+
+        selected = fields.select_fields(['references'])
+        assert selected == Fields({'references': ReferencesField(['A reference'])})
+        assert hash(selected) == hash(Fields({'references': ReferencesField(['A reference'])}))
+
+        replaced = Fields({**fields, 'summary': SummaryField('Another summary')})
+        assert replaced['summary'].to_input() == 'Another summary'
+        assert fields['summary'].to_input() == 'A summary'
+
+    def test_pickle(self):
+        fields = Fields({'summary': SummaryField(['A', 'summary']), 'documents': DocumentsField([['A', 'document']])})
+        loaded = pickle.loads(pickle.dumps(fields))
+        assert loaded == fields
+        assert hash(loaded) == hash(fields)
+        assert loaded['documents'].to_input() == [['A', 'document']]
+
+    def test_field_interner(self):
+        interner = FieldInterner()
+        references1 = interner.intern(ReferencesField(['A reference']))
+        references2 = interner.intern(ReferencesField(['A reference']))
+        documents = interner.intern(DocumentsField(['A reference']))
+        assert references1 is references2
+        assert documents is not references1
+        assert len(interner) == 2
+
+        # The fields which are no longer used are forgotten
+        del references1, references2
+        gc.collect()
+        assert len(interner) == 1
+        del documents
+        gc.collect()
+        assert len(interner) == 0
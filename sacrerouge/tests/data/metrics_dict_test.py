@@ -1,3 +1,4 @@
+import random
 import unittest
 
 from sacrerouge.data import MetricsDict
@@ -38,6 +39,30 @@ class TestMetricsDict(unittest.TestCase):
         assert metrics / 2 == {'k1': 0.5, 'k2': {'k3': 2.0}}
         assert metrics == {'k1': 1, 'k2': {'k3': 4}}
 
+    def test_mean(self):
+        random.seed(7)
+        for num_dicts in [1, 2, 10, 1000]:
+            metrics_list = []
+            for _ in range(num_dicts):
+                metrics_list.append(MetricsDict({
+                    'k1': random.random() * 10 ** random.randint(-8, 8),
+                    'k2': {'k3': random.randint(0, 100), 'k4': {'k5': random.random()}}
+                }))
+            expected = sum(metrics_list) / len(metrics_list)
+            actual = MetricsDict.mean(metrics_list)
+            # The values should be identical, not just close
+            assert actual == expected
+            assert list(actual.keys()) == list(expected.keys())
+            assert isinstance(actual['k2']['k4'], MetricsDict)
+
+        # The keys are in the order of the last dictionary, like `sum`
+        actual = MetricsDict.mean([MetricsDict({'k1': 1, 'k2': 2}), MetricsDict({'k2': 4, 'k1': 3})])
+        assert list(actual.items()) == [('k2', 3.0), ('k1', 2.0)]
+
+        # Dictionaries with different keys fail in the same way as adding them
+        with self.assertRaises(AssertionError):
+            MetricsDict.mean([MetricsDict({'k1': 1}), MetricsDict({'k2': 1})])
+
     def test_average_values(self):
         metrics = MetricsDict({'k1': 1, 'k2': {'k3': [1, 2, 3]}})
         assert metrics.average_values() == {'k1': 1, 'k2': {'k3': 2.0}}
@@ -0,0 +1,75 @@
+import jsons
+import numpy as np
+import unittest
+from collections import OrderedDict
+
+from sacrerouge.data import LeaveOneOutPyramid, Metrics, MetricsDict, Pyramid, PyramidAnnotation
+from sacrerouge.data.pyramid import Contributor, ContributorAnnotation, Part, SCU, SCUAnnotation
+from sacrerouge.io import codec
+
+
+def _get_structure(value):
+    # Represents the types and values of an object so the results of jsons and the codec can be compared
+    if isinstance(value, dict):
+        return type(value).__name__, [(key, _get_structure(item)) for key, item in value.items()]
+    if isinstance(value, list):
+        return 'list', [_get_structure(item) for item in value]
+    if hasattr(value, '__dict__'):
+        return type(value).__name__, sorted((key, _get_structure(item)) for key, item in vars(value).items())
+    return type(value).__name__, value
+
+
+class TestCodec(unittest.TestCase):
+    def _check(self, obj, cls=None):
+        string = jsons.dumps(obj)
+        assert codec.dumps(obj) == string
+        assert _get_structure(codec.loads(string, cls)) == _get_structure(jsons.loads(string, cls))
+
+    def test_metrics(self):
+        self._check(Metrics('I1', 'S1', 'peer', MetricsDict({'b': 1, 'a': {'y': [1, 2.5], 'x': float('nan')}})), Metrics)
+        self._check(Metrics('I1', 'S1', 'reference'), Metrics)
+        self._check(Metrics('I1', 'S1', 'peer', {'é': {'ö': -0.0}}), Metrics)
+        # Values which json cannot serialize fall back to jsons
+        self._check(Metrics('I1', 'S1', 'peer', {'a': np.float64(3), 'b': [np.float64(0.5)]}), Metrics)
+
+    def test_pyramids(self):
+        parts = [Part('the text', 0, 8), Part('more', 10, 14)]
+        scus = [SCU(1, 'label 1', [Contributor(0, 'c1', parts), Contributor(2, 'c2', parts[:1])]), SCU(4, 'label 2', [])]
+        self._check(Pyramid('D0801', ['A', 'B', 'C'], ['1', '2', '3'], scus), Pyramid)
+
+        scus = [SCUAnnotation(1, 'label', [ContributorAnnotation('c', parts)])]
+        self._check(PyramidAnnotation('D0801', '5', 'peer', 'the summary', scus), PyramidAnnotation)
+
+    def test_leave_one_out_pyramids(self):
+        parts = [Part('the text', 0, 8), Part('more', 10, 14)]
+        scus = [
+            SCU(1, 'label 1', [Contributor(0, 'c1', parts), Contributor(2, 'c2', parts[:1])]),
+            SCU(3, 'label 3', [Contributor(1, 'c3', parts[1:])]),
+            SCU(4, 'label 2', [])
+        ]
+        pyramid = Pyramid('D0801', ['A', 'B', 'C'], ['1', '2', '3'], scus)
+        for i in range(3):
+            # The view is serialized the same as the pyramid with the summary removed without creating it
+            view = LeaveOneOutPyramid(pyramid, i)
+            assert codec.dumps(view) == codec.dumps(pyramid.remove_summary(i))
+            assert view._materialized is None
+
+    def test_plain_data(self):
+        self._check({'b': [1, 2.0, None, True], 'a': {'c': 'text', 'd': []}})
+        self._check([1, 'two', {'three': 3.0}])
+        self._check('string')
+        self._check({'metrics': Metrics('I1', 'S1', 'peer', {'a': 1}), 'tuple': (1, 2)})
+        self._check(OrderedDict([('b', 1), ('a', 2)]))
+        self._check({1: 'int key'})
+
+    def test_extra_keys(self):
+        # jsons keeps extra keys as attributes, so the codec must too
+        string = '{"instance_id": "I1", "summarizer_id": "S1", "summarizer_type": "peer", "summary": "text"}'
+        expected = jsons.loads(string, Metrics)
+        actual = codec.loads(string, Metrics)
+        assert actual.summary == expected.summary == 'text'
+        assert _get_structure(actual) == _get_structure(expected)
+
+        scu = SCU(1, 'label', [])
+        scu.weight = 3
+        self._check(Pyramid('D0801', ['A'], ['1'], [scu]), Pyramid)
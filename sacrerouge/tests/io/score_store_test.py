@@ -0,0 +1,60 @@
+import numpy as np
+import unittest
+
+from sacrerouge.commands.correlate import load_score_matrices
+from sacrerouge.common import TemporaryDirectory
+from sacrerouge.common.testing import MULTILING_METRICS
+from sacrerouge.data import Metrics, MetricsDict
+from sacrerouge.io import JsonlWriter, ScoreStore
+
+
+class TestScoreStore(unittest.TestCase):
+    def test_matrices_match_jsonl(self):
+        with TemporaryDirectory() as temp_dir:
+            store = ScoreStore.build([MULTILING_METRICS], f'{temp_dir}/store')
+            assert ScoreStore.is_score_store(f'{temp_dir}/store')
+            assert not ScoreStore.is_score_store(MULTILING_METRICS)
+            assert 'grade' in store
+            assert 'rouge-1_jk_precision' in store
+            assert 'rouge-1' not in store
+
+            for summarizer_type in ['all', 'peer', 'reference']:
+                for names in [['rouge-1_jk_precision', 'grade'],
+                              ['rouge-1_precision', 'length_aware_grade', 'grade']]:
+                    expected = load_score_matrices(MULTILING_METRICS, summarizer_type, *names)
+                    actual = store.get_matrices(summarizer_type, *names)
+                    assert len(expected) == len(actual)
+                    for X, Y in zip(expected, actual):
+                        np.testing.assert_array_equal(X, Y)
+
+                    # Passing the directory where the jsonl files are expected loads the store
+                    actual = load_score_matrices(f'{temp_dir}/store', summarizer_type, *names)
+                    for X, Y in zip(expected, actual):
+                        np.testing.assert_array_equal(X, Y)
+
+    def test_build(self):
+        # Metrics for the same summary are merged across files and non-numeric metrics are skipped
+        with TemporaryDirectory() as temp_dir:
+            with JsonlWriter(f'{temp_dir}/1.jsonl') as out:
+                out.write(Metrics('I1', 'S1', 'peer', MetricsDict({'A': {'x': 1, 'y': 2}, 'name': 'a'})))
+                out.write(Metrics('I1', 'S2', 'peer', MetricsDict({'A': {'x': 3}, 'name': 'b'})))
+            with JsonlWriter(f'{temp_dir}/2.jsonl') as out:
+                out.write(Metrics('I1', 'S1', 'peer', MetricsDict({'B': [1, 2, 6]})))
+                out.write(Metrics('I2', 'S1', 'reference', MetricsDict({'B': 4})))
+
+            store = ScoreStore.build([f'{temp_dir}/1.jsonl', f'{temp_dir}/2.jsonl'], f'{temp_dir}/store')
+            store = ScoreStore(f'{temp_dir}/store')
+            assert store.num_rows == 3
+            assert store.column_names == ['A_x', 'A_y', 'B']
+
+            instance_ids, summarizer_ids, summarizer_types = store.get_keys()
+            assert instance_ids.tolist() == ['I1', 'I1', 'I2']
+            assert summarizer_ids.tolist() == ['S1', 'S2', 'S1']
+            assert summarizer_types.tolist() == ['peer', 'peer', 'reference']
+            np.testing.assert_array_equal(store.get_column('A_x'), [1, 3, np.nan])
+            np.testing.assert_array_equal(store.get_column('B'), [3, np.nan, 4])
+
+            np.testing.assert_array_equal(store.get_matrices('all', 'B'), [[3, 4]])
+            np.testing.assert_array_equal(store.get_matrices('peer', 'A_x'), [[1], [3]])
+            with self.assertRaises(Exception):
+                store.get_column('name')
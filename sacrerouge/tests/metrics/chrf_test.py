@@ -44,6 +44,17 @@ class TestChrF(ReferenceBasedMetricTestCase):
         actual = chrf.score(hypothesis, references)['chrf']
         self.assertAlmostEqual(expected, actual)
 
+    def test_reference_statistics(self):
+        # Combining the statistics for any subset of the references should be the same as scoring the subset
+        metric = ChrF()
+        statistics_list = metric.score_reference_statistics_all(self.summaries, self.references_list)
+        for summary, references, statistics in zip(self.summaries, self.references_list, statistics_list):
+            assert metric.combine_reference_statistics(statistics) == metric.score(summary, references)
+            for i in range(len(references)):
+                subset = references[:i] + references[i + 1:]
+                expected = metric.score(summary, subset)
+                assert metric.combine_reference_statistics(statistics[:i] + statistics[i + 1:]) == expected
+
     def test_chrf_order_invariant(self):
         metric = ChrF()
         self.assert_order_invariant(metric)
@@ -1,16 +1,49 @@
+import math
 import os
 import pytest
+import random
+from collections import Counter
 
 from sacrerouge.common.testing.metric_test_cases import ReferenceBasedMetricTestCase
 from sacrerouge.common.testing.util import sacrerouge_command_exists
-from sacrerouge.data import MetricsDict, Pyramid, PyramidAnnotation
-from sacrerouge.io import JsonlReader
+from sacrerouge.data import LeaveOneOutPyramid, MetricsDict, Pyramid, PyramidAnnotation
+from sacrerouge.data.fields import Fields, PyramidField
+from sacrerouge.data.pyramid import Contributor, Part, SCU
+from sacrerouge.io import JsonlReader, codec
 from sacrerouge.metrics import PyramidScore
+from sacrerouge.metrics.pyramid_score import PyramidIndex
 
 _pyramid_file_path = 'datasets/duc-tac/tac2008/v1.0/task1.A.pyramids.jsonl'
 _annotation_file_path = 'datasets/duc-tac/tac2008/v1.0/task1.A.pyramid-annotations.jsonl'
 
 
+def _get_random_pyramid(random_state: random.Random, num_summaries: int, num_scus: int) -> Pyramid:
+    scus = []
+    for scu_id in range(num_scus):
+        indices = random_state.sample(range(num_summaries), random_state.randint(1, num_summaries))
+        contributors = [Contributor(index, f'label {scu_id}', [Part('text', 0, 4)]) for index in indices]
+        scus.append(SCU(scu_id, f'label {scu_id}', contributors))
+    summaries = [f'summary {i}' for i in range(num_summaries)]
+    summarizer_ids = [str(i) for i in range(num_summaries)]
+    return Pyramid('instance', summaries, summarizer_ids, scus)
+
+
+def _get_expected_score(annotation: PyramidAnnotation, pyramid: Pyramid) -> float:
+    # A direct implementation of the modified pyramid score which does not use the index
+    scu_id_to_weight = {scu.scu_id: scu.get_weight() for scu in pyramid.scus}
+    weight_to_num_scus = Counter(scu_id_to_weight.values())
+    total_weight = sum(scu_id_to_weight.get(scu.scu_id, 0) for scu in annotation.scus)
+
+    total_scus = sum(len(pyramid.get_scu_id_set(i)) for i in range(len(pyramid.summarizer_ids)))
+    scus_remaining = int(math.ceil(total_scus / len(pyramid.summarizer_ids)))
+    ideal_weight = 0
+    for weight in sorted(weight_to_num_scus.keys(), reverse=True):
+        num_scus_taken = min(scus_remaining, weight_to_num_scus[weight])
+        ideal_weight += num_scus_taken * weight
+        scus_remaining -= num_scus_taken
+    return total_weight / ideal_weight
+
+
 class TestPyramidScore(ReferenceBasedMetricTestCase):
     @pytest.mark.skipif(not os.path.exists(_pyramid_file_path), reason='TAC 2008 pyramids file does not exist')
     @pytest.mark.skipif(not os.path.exists(_annotation_file_path), reason='TAC 2008 pyramid annotations file does not exist')
@@ -33,4 +66,60 @@ class TestPyramidScore(ReferenceBasedMetricTestCase):
             assert actual.approx_equal(MetricsDict(expected), abs=1e-4), f'Instance {i} not equal. Expected {expected}, actual {actual}'
 
     def test_command_exists(self):
-        assert sacrerouge_command_exists(['pyramid-score'])
\ No newline at end of file
+        assert sacrerouge_command_exists(['pyramid-score'])
+
+    def test_pyramid_index(self):
+        random_state = random.Random(4)
+        metric = PyramidScore()
+        for _ in range(20):
+            pyramid = _get_random_pyramid(random_state, random_state.randint(2, 5), random_state.randint(1, 30))
+            index = PyramidIndex(pyramid)
+            for i in range(len(pyramid.summarizer_ids)):
+                assert index.summary_scu_ids[i] == pyramid.get_scu_id_set(i)
+            assert index.ideal_weights[0] == 0
+            assert index.ideal_weights[-1] == sum(scu.get_weight() for scu in pyramid.scus)
+
+            # Score every summary against every jackknifed pyramid, which reuses each index for all of the annotations
+            annotations = [pyramid.get_annotation(i) for i in range(len(pyramid.summarizer_ids))]
+            jk_pyramids = [pyramid.remove_summary(i) for i in range(len(pyramid.summarizer_ids))]
+            actual = metric.score_multi_all([annotations] * len(jk_pyramids), jk_pyramids)
+            for jk_pyramid, metrics_list in zip(jk_pyramids, actual):
+                for annotation, metrics in zip(annotations, metrics_list):
+                    assert metrics['modified_pyramid_score'] == pytest.approx(_get_expected_score(annotation, jk_pyramid))
+
+    def test_leave_one_out_pyramid(self):
+        random_state = random.Random(6)
+        metric = PyramidScore()
+        for _ in range(20):
+            pyramid = _get_random_pyramid(random_state, random_state.randint(2, 5), random_state.randint(1, 30))
+            annotations = [pyramid.get_annotation(i) for i in range(len(pyramid.summarizer_ids))]
+            views = [LeaveOneOutPyramid(pyramid, i) for i in range(len(pyramid.summarizer_ids))]
+            jk_pyramids = [pyramid.remove_summary(i) for i in range(len(pyramid.summarizer_ids))]
+
+            for view, jk_pyramid in zip(views, jk_pyramids):
+                assert view.summarizer_ids == jk_pyramid.summarizer_ids
+                assert view.summaries == jk_pyramid.summaries
+                assert PyramidField(view) == PyramidField(jk_pyramid)
+                assert hash(PyramidField(view)) == hash(PyramidField(jk_pyramid))
+                assert view == LeaveOneOutPyramid(pyramid, view.removed_index)
+                assert hash(view) == hash(LeaveOneOutPyramid(pyramid, view.removed_index))
+                for i in range(len(jk_pyramid.summarizer_ids)):
+                    assert view.get_scu_id_set(i) == jk_pyramid.get_scu_id_set(i)
+                    assert view.get_annotation(i).get_scu_id_set() == jk_pyramid.get_annotation(i).get_scu_id_set()
+
+                # The index derived from the full pyramid's index should be the same as indexing the copy
+                expected_index = PyramidIndex(jk_pyramid)
+                actual_index = PyramidIndex(view)
+                assert actual_index.scu_id_to_weight == expected_index.scu_id_to_weight
+                assert actual_index.summary_scu_ids == expected_index.summary_scu_ids
+                assert actual_index.ideal_weights == expected_index.ideal_weights
+                assert actual_index.ideal_weight == expected_index.ideal_weight
+
+                assert codec.dumps(view) == codec.dumps(jk_pyramid)
+
+            expected = metric.score_multi_all([annotations] * len(jk_pyramids), jk_pyramids)
+            actual = metric.score_multi_all([annotations] * len(views), views)
+            assert actual == expected
+
+            jk_fields_list = metric.jackknifer.get_jackknifing_fields_list(Fields({'pyramid': PyramidField(pyramid)}))
+            assert [fields['pyramid'].pyramid for fields in jk_fields_list] == views
@@ -1,4 +1,5 @@
 import pytest
+import random
 
 from sacrerouge.common.testing.metric_test_cases import ReferenceBasedMetricTestCase
 from sacrerouge.common.testing.util import sacrerouge_command_exists
@@ -232,6 +233,66 @@ class TestPythonRouge(ReferenceBasedMetricTestCase):
         actual_metrics, _ = python_rouge.evaluate(self.summaries, self.references_list)
         self.assert_same_as_rouge(actual_metrics, expected_metrics)
 
+    def test_score_multi_all_shared_preprocessing(self):
+        # The preprocessing is shared across all of the contexts, which should not change the results
+        metric = PythonRouge(ngram_orders=[1, 2, 3], compute_rouge_l=True)
+        summaries_list, references_list = [], []
+        for summary, references in zip(self.summaries[:5], self.references_list[:5]):
+            for i in range(len(references)):
+                summaries_list.append([summary, self.summaries[0]])
+                references_list.append(references[:i] + references[i + 1:])
+
+        expected = [PythonRouge(ngram_orders=[1, 2, 3], compute_rouge_l=True).score_multi(summaries, references)
+                    for summaries, references in zip(summaries_list, references_list)]
+        assert metric.score_multi_all(summaries_list, references_list) == expected
+
+    def test_longest_common_substring(self):
+        # Compares the hit mask against the full dynamic program, which marks the hits along the same path as
+        # the perl implementation. The small vocabulary creates many ties.
+        def dynamic_program(tokens1, tokens2):
+            m, n = len(tokens1), len(tokens2)
+            counter = [[0] * (n + 1) for _ in range(m + 1)]
+            for i in range(1, m + 1):
+                for j in range(1, n + 1):
+                    if tokens1[i - 1] == tokens2[j - 1]:
+                        counter[i][j] = counter[i - 1][j - 1] + 1
+                    else:
+                        counter[i][j] = max(counter[i - 1][j], counter[i][j - 1])
+
+            hit_mask = [0] * m
+            i, j = m, n
+            while i != 0 and j != 0:
+                if tokens1[i - 1] == tokens2[j - 1]:
+                    i -= 1
+                    j -= 1
+                    hit_mask[i] = 1
+                elif counter[i - 1][j] >= counter[i][j - 1]:
+                    i -= 1
+                else:
+                    j -= 1
+            return hit_mask
+
+        rouge = PythonRouge()
+        random.seed(4)
+        for _ in range(1000):
+            tokens1 = [random.randint(0, 3) for _ in range(random.randint(0, 10))]
+            tokens2 = [random.randint(0, 3) for _ in range(random.randint(0, 10))]
+            hit_mask = [0] * len(tokens1)
+            rouge._longest_common_substring(tokens1, tokens2, hit_mask)
+            assert hit_mask == dynamic_program(tokens1, tokens2)
+
+    def test_reference_statistics(self):
+        # Combining the statistics for any subset of the references should be the same as scoring the subset
+        metric = PythonRouge(ngram_orders=[1, 2, 3], compute_rouge_l=True)
+        statistics_list = metric.score_reference_statistics_all(self.summaries, self.references_list)
+        for summary, references, statistics in zip(self.summaries, self.references_list, statistics_list):
+            assert len(statistics) == len(references)
+            assert metric.combine_reference_statistics(statistics) == metric.score(summary, references)
+            for i in range(len(references)):
+                subset = references[:i] + references[i + 1:]
+                expected = metric.score(summary, subset)
+                assert metric.combine_reference_statistics(statistics[:i] + statistics[i + 1:]) == expected
+
     def test_python_rouge_order_invariant(self):
         metric = PythonRouge()
         self.assert_order_invariant(metric)
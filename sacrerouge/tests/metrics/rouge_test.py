@@ -1,3 +1,4 @@
+import gc
 import os
 import pytest
 
@@ -190,4 +191,45 @@ class TestRouge(ReferenceBasedMetricTestCase):
         assert sacrerouge_command_exists(['rouge'])
 
     def test_setup_command_exists(self):
-        assert sacrerouge_command_exists(['setup-metric', 'rouge'])
\ No newline at end of file
+        assert sacrerouge_command_exists(['setup-metric', 'rouge'])
+
+    def test_worker(self):
+        # The worker should return the same scores as running a new process, including for repeated calls
+        metric = Rouge(max_ngram=2, compute_rouge_l=True)
+        worker_metric = Rouge(max_ngram=2, compute_rouge_l=True, use_worker=True)
+        expected = metric.score_all(self.summaries, self.references_list)
+        for _ in range(2):
+            actual = worker_metric.score_all(self.summaries, self.references_list)
+            assert len(actual) == len(expected)
+            for expected_metrics, actual_metrics in zip(expected, actual):
+                assert actual_metrics.approx_equal(expected_metrics, abs=1e-4)
+
+        expected = metric.evaluate(self.summaries, self.references_list)
+        actual = worker_metric.evaluate(self.summaries, self.references_list)
+        assert actual[0].approx_equal(expected[0], abs=1e-4)
+
+    def test_worker_stopped(self):
+        # The worker's process should be stopped when it is closed or when the metric is garbage collected
+        metric = Rouge(use_worker=True)
+        metric.worker._start()
+        process = metric.worker.process
+        assert process.poll() is None
+        metric.worker.close()
+        assert process.poll() is not None
+        assert metric.worker.process is None
+
+        metric.worker._start()
+        process = metric.worker.process
+        assert process.poll() is None
+        del metric
+        gc.collect()
+        assert process.poll() is not None
+
+    def test_skip_bootstrap(self):
+        # The bootstrap only changes the macro scores, so the per-summary scores should be identical
+        metric = Rouge(max_ngram=2, compute_rouge_l=True)
+        skip_metric = Rouge(max_ngram=2, compute_rouge_l=True, skip_bootstrap=True)
+        expected = metric.score_all(self.summaries, self.references_list)
+        actual = skip_metric.score_all(self.summaries, self.references_list)
+        for expected_metrics, actual_metrics in zip(expected, actual):
+            assert actual_metrics.approx_equal(expected_metrics, abs=1e-4)
@@ -0,0 +1,49 @@
+from sacrerouge.common import Params
+from sacrerouge.common.testing.metric_test_cases import ReferenceBasedMetricTestCase
+from sacrerouge.common.testing.util import sacrerouge_command_exists
+from sacrerouge.metrics import Metric, PythonRouge, ShardedMetric
+
+
+class TestShardedMetric(ReferenceBasedMetricTestCase):
+    def test_from_params(self):
+        params = Params({'type': 'sharded', 'num_shards': 3, 'metric': {'type': 'python-rouge', 'ngram_orders': [1]}})
+        metric = Metric.from_params(params)
+        assert isinstance(metric, ShardedMetric)
+        assert len(metric.metrics) == 3
+        assert all(isinstance(wrapped, PythonRouge) for wrapped in metric.metrics)
+        assert len(set(id(wrapped) for wrapped in metric.metrics)) == 3
+        assert metric.metrics[0].ngram_orders == [1]
+        assert metric.required_summary_fields == ['summary']
+        assert metric.required_context_fields == ['references']
+        assert metric.requires_jackknifing()
+
+    def test_get_shards(self):
+        metric = ShardedMetric({'type': 'python-rouge'}, num_shards=3)
+        assert metric._get_shards([1, 1, 1, 1, 1, 1]) == [(0, 2), (2, 4), (4, 6)]
+        assert metric._get_shards([4, 1, 1, 1, 1]) == [(0, 1), (1, 3), (3, 5)]
+        assert metric._get_shards([1, 1]) == [(0, 1), (1, 2)]
+        assert metric._get_shards([5]) == [(0, 1)]
+        assert metric._get_shards([]) == []
+        # There should never be more than `num_shards` shards, even with empty groups
+        assert metric._get_shards([0, 0, 0, 0, 0]) == [(0, 5)]
+        assert metric._get_shards([1, 1, 1, 0, 0]) == [(0, 1), (1, 2), (2, 5)]
+        assert ShardedMetric({'type': 'python-rouge'}, num_shards=1)._get_shards([5, 0, 0]) == [(0, 3)]
+
+    def test_same_as_wrapped(self):
+        expected_metric = PythonRouge(compute_rouge_l=True)
+        metric = ShardedMetric({'type': 'python-rouge', 'compute_rouge_l': True}, num_shards=4)
+
+        expected = expected_metric.score_all(self.summaries, self.references_list)
+        self.assert_expected_output(metric, expected)
+
+        expected_macro, expected_micro = expected_metric.evaluate(self.summaries, self.references_list)
+        macro, micro = metric.evaluate(self.summaries, self.references_list)
+        assert macro.approx_equal(expected_macro)
+        assert micro == expected_micro
+
+    def test_order_invariant(self):
+        metric = ShardedMetric({'type': 'python-rouge', 'compute_rouge_l': True}, num_shards=4)
+        self.assert_order_invariant(metric)
+
+    def test_command_exists(self):
+        assert sacrerouge_command_exists(['sharded'])
@@ -4,10 +4,10 @@ import unittest
 from scipy.stats import kendalltau, pearsonr, spearmanr
 
 from sacrerouge.data import Metrics
-from sacrerouge.stats import convert_to_matrices, summary_level_corr, system_level_corr, global_corr, \
-    bootstrap_system_sample, bootstrap_input_sample, bootstrap_both_sample, bootstrap_ci, fisher_ci, corr_ci, \
+from sacrerouge.stats import convert_to_matrices, column_corrs, summary_level_corr, system_level_corr, global_corr, \
+    bootstrap_system_sample, bootstrap_input_sample, bootstrap_both_sample, batch_corr, bootstrap_batches, bootstrap_ci, fisher_ci, corr_ci, \
     random_bool_mask, permute_systems, permute_inputs, permute_both, bootstrap_diff_test, permutation_diff_test, \
-    williams_diff_test, corr_diff_test, bonferroni_partial_conjunction_pvalue_test
+    williams_diff_test, corr_diff_test, all_pairs_diff_test, bonferroni_partial_conjunction_pvalue_test
 
 
 class TestStats(unittest.TestCase):
@@ -37,6 +37,78 @@ class TestStats(unittest.TestCase):
         m1 = convert_to_matrices(metrics_list, 'm1')
         np.testing.assert_array_equal(m1, [[1, 4, np.nan], [6, np.nan, 2]])
 
+        # The missing scores are masked instead of NaN
+        m1, m2 = convert_to_matrices(metrics_list, 'm1', 'm2', masked=True)
+        assert isinstance(m1, np.ma.MaskedArray)
+        np.testing.assert_array_equal(m1.mask, [[False, False, True], [False, True, False]])
+        np.testing.assert_array_equal(m2.filled(np.nan), [[2, 5, np.nan], [7, np.nan, 9]])
+
+        # The ids are sorted, and the last score is used if a summary appears more than once
+        metrics_list = [
+            Metrics('2', 'B', 'peer', {'m1': 1}),
+            Metrics('1', 'A', 'peer', {'m1': 2}),
+            Metrics('2', 'B', 'peer', {'m1': 3}),
+            Metrics('1', 'C', 'peer', {}),
+        ]
+        m1 = convert_to_matrices(metrics_list, 'm1')
+        np.testing.assert_array_equal(m1, [[2, np.nan], [np.nan, 3], [np.nan, np.nan]])
+
+        assert convert_to_matrices([], 'm1').shape == (0, 0)
+
+    def test_column_corrs(self):
+        # Compares the vectorized correlations against running scipy on each column
+        np.random.seed(4)
+        X = np.random.randint(0, 4, (8, 40)).astype(float)
+        Y = np.random.rand(8, 40)
+        nan_mask = np.random.rand(8, 40) < 0.3
+        X[nan_mask] = np.nan
+        Y[nan_mask] = np.nan
+        # A column with a constant input and a column with only 1 input should be NaN
+        X[~nan_mask[:, 0], 0] = 1
+        X[1:, 1] = np.nan
+        Y[1:, 1] = np.nan
+        nan_mask[1:, 1] = True
+
+        for corr_func in [pearsonr, spearmanr, kendalltau]:
+            correlations, num_inputs = column_corrs(corr_func, X, Y)
+            assert np.isnan(correlations[0])
+            assert np.isnan(correlations[1])
+            assert num_inputs[1] == 1
+            for j in range(2, X.shape[1]):
+                x = X[:, j][~nan_mask[:, j]]
+                y = Y[:, j][~nan_mask[:, j]]
+                assert num_inputs[j] == len(x)
+                expected, _ = corr_func(x, y)
+                if np.isnan(expected):
+                    assert np.isnan(correlations[j])
+                else:
+                    self.assertAlmostEqual(correlations[j], expected, places=8)
+
+    def test_column_corrs_masked(self):
+        # The masked matrices and the inputs without any scores should not change the correlations
+        np.random.seed(5)
+        X = np.random.rand(6, 20)
+        Y = np.random.rand(6, 20)
+        nan_mask = np.random.rand(6, 20) < 0.3
+        nan_mask[:, [3, 7]] = True
+        X[nan_mask] = np.nan
+        Y[nan_mask] = np.nan
+
+        for corr_func in [pearsonr, spearmanr, kendalltau]:
+            correlations, num_inputs = column_corrs(corr_func, X, Y)
+            assert np.isnan(correlations[[3, 7]]).all()
+            np.testing.assert_array_equal(num_inputs[[3, 7]], [0, 0])
+            for j in range(X.shape[1]):
+                if num_inputs[j] > 0:
+                    expected, _ = column_corrs(corr_func, X[:, j:j + 1], Y[:, j:j + 1])
+                    np.testing.assert_array_equal(correlations[j], expected[0])
+
+            masked_correlations, masked_num_inputs = column_corrs(corr_func, np.ma.masked_invalid(X), np.ma.masked_invalid(Y))
+            np.testing.assert_array_equal(masked_correlations, correlations)
+            np.testing.assert_array_equal(masked_num_inputs, num_inputs)
+            assert summary_level_corr(corr_func, np.ma.masked_invalid(X), np.ma.masked_invalid(Y)) == \
+                summary_level_corr(corr_func, X, Y)
+
     def test_summary_level_corr(self):
         # This will end up skipping the last column because the scores are identical,
         # so the correlation is NaN
@@ -288,6 +360,43 @@ class TestStats(unittest.TestCase):
         np.testing.assert_array_equal(A_s, [[10, 9, 12, 9], [10, 9, 12, 9], [6, 5, 8, 5]])
         np.testing.assert_array_equal(B_s, [[22, 21, 24, 21], [22, 21, 24, 21], [18, 17, 20, 17]])
 
+    def test_bootstrap_batches(self):
+        A = np.arange(12).reshape(3, 4)
+        B = -np.arange(12).reshape(3, 4)
+
+        # The batches should contain the same samples as the sample functions in the same order
+        for sample_func in [bootstrap_system_sample, bootstrap_input_sample, bootstrap_both_sample]:
+            np.random.seed(4)
+            expected = [sample_func(A, B) for _ in range(5)]
+
+            np.random.seed(4)
+            batches = list(bootstrap_batches(sample_func, 5, 2, A, B))
+            assert [len(A_b) for A_b, _ in batches] == [2, 2, 1]
+            A_s = np.concatenate([A_b for A_b, _ in batches])
+            B_s = np.concatenate([B_b for _, B_b in batches])
+            for i, (A_e, B_e) in enumerate(expected):
+                np.testing.assert_array_equal(A_s[i], A_e)
+                np.testing.assert_array_equal(B_s[i], B_e)
+
+    def test_batch_corr(self):
+        np.random.seed(9)
+        X = np.random.rand(4, 6, 5)
+        Y = np.random.rand(4, 6, 5)
+        nan_mask = np.random.rand(4, 6, 5) < 0.2
+        X[nan_mask] = np.nan
+        Y[nan_mask] = np.nan
+
+        for level_func in [summary_level_corr, system_level_corr, global_corr]:
+            for coef_func in [pearsonr, spearmanr, kendalltau]:
+                corr_func = functools.partial(level_func, coef_func)
+                correlations = batch_corr(corr_func, X, Y)
+                for i in range(X.shape[0]):
+                    expected = corr_func(X[i], Y[i])
+                    if expected is None:
+                        assert np.isnan(correlations[i])
+                    else:
+                        self.assertAlmostEqual(correlations[i], expected, places=8)
+
     def test_bootstrap_ci(self):
         # Regression test
         np.random.seed(3)
@@ -319,6 +428,13 @@ class TestStats(unittest.TestCase):
         self.assertAlmostEqual(lower, -1.0, places=4)
         self.assertAlmostEqual(upper, 1.0, places=4)
 
+        # The chunk size should not change the result
+        for chunk_size in [1, 7, 1000]:
+            np.random.seed(3)
+            lower, upper = bootstrap_ci(corr_func, X, Y, bootstrap_system_sample, chunk_size=chunk_size)
+            self.assertAlmostEqual(lower, -0.8660254037844388, places=4)
+            self.assertAlmostEqual(upper, 0.39735970711951324, places=4)
+
     def test_fisher_ci(self):
         pearson_global = functools.partial(global_corr, pearsonr)
         spearman_global = functools.partial(global_corr, spearmanr)
@@ -519,6 +635,39 @@ class TestStats(unittest.TestCase):
         np.random.seed(2)
         self.assertAlmostEqual(permutation_diff_test(corr_func, Y, X, Z, permute_both, False), 0.030969030969030968, places=4)
 
+    def test_num_workers(self):
+        # The results should only depend on the random seed, not the number of workers
+        np.random.seed(12)
+        X = np.random.random((9, 5))
+        Y = np.random.random((9, 5))
+        Z = np.random.random((9, 5))
+        corr_func = functools.partial(summary_level_corr, kendalltau)
+
+        for test_func, resample_func in [(bootstrap_diff_test, bootstrap_both_sample),
+                                         (permutation_diff_test, permute_both)]:
+            results = []
+            for num_workers in [1, 3]:
+                np.random.seed(2)
+                results.append(test_func(corr_func, X, Y, Z, resample_func, True, 120,
+                                         return_deltas=True, num_workers=num_workers))
+            assert results[0][0] == results[1][0]
+            np.testing.assert_array_equal(results[0][1], results[1][1])
+            assert len(results[0][1]) == 120
+
+        intervals = []
+        for num_workers in [1, 2]:
+            np.random.seed(2)
+            intervals.append(bootstrap_ci(corr_func, X, Z, bootstrap_input_sample, num_workers=num_workers))
+        assert intervals[0] == intervals[1]
+
+        # The caller's random state is only advanced by drawing the block seeds
+        np.random.seed(4)
+        np.random.randint(0, 2 ** 32 - 1, size=3, dtype=np.int64)
+        state = np.random.get_state()
+        np.random.seed(4)
+        bootstrap_diff_test(corr_func, X, Y, Z, bootstrap_both_sample, True, 120, num_workers=1)
+        np.testing.assert_array_equal(np.random.get_state()[1], state[1])
+
     def test_williams_diff_test(self):
         # This test verifies that the output is the same as the psych package for
         # several different randomly generated inputs
@@ -633,6 +782,36 @@ class TestStats(unittest.TestCase):
         with self.assertRaises(Exception):
             corr_diff_test(corr_func, X, Y, Z, 'does-not-exist', False)
 
+    def test_all_pairs_diff_test(self):
+        # Every entry should be the same as running the test on that pair with the same random seed
+        np.random.seed(7)
+        matrices = [np.random.random((9, 5)) for _ in range(3)]
+        Z = np.random.random((9, 5))
+        for X in matrices + [Z]:
+            X[2, 3] = np.nan
+
+        for corr_func, method in [(functools.partial(summary_level_corr, kendalltau), 'bootstrap-both'),
+                                  (functools.partial(system_level_corr, pearsonr), 'bootstrap-input'),
+                                  (functools.partial(global_corr, pearsonr), 'permutation-both'),
+                                  (functools.partial(global_corr, spearmanr), 'williams')]:
+            for two_tailed in [True, False]:
+                np.random.seed(4)
+                pvalues = all_pairs_diff_test(corr_func, matrices, Z, method, two_tailed, num_samples=200)
+                assert pvalues.shape == (3, 3)
+                assert np.isnan(np.diag(pvalues)).all()
+                for i in range(3):
+                    for j in range(3):
+                        if i != j:
+                            np.random.seed(4)
+                            kwargs = {}
+                            if method.startswith('bootstrap'):
+                                kwargs = {'num_samples': 200}
+                            elif method.startswith('permutation'):
+                                kwargs = {'num_permutations': 200}
+                            expected = corr_diff_test(corr_func, matrices[i], matrices[j], Z, method, two_tailed,
+                                                      kwargs=kwargs)
+                            self.assertAlmostEqual(pvalues[i, j], expected, places=8)
+
     def test_bonferroni_partial_conjunction_pvalue_test(self):
         # Tests against https://github.com/rtmdrr/replicability-analysis-NLP/blob/master/Replicability_Analysis.py
         pvalues = [0.168, 0.297, 0.357, 0.019, 0.218, 0.001]
@@ -19,6 +19,8 @@ setuptools.setup(
     description='An open-source library for summarization evaluation metrics',
     url='https://github.com/danieldeutsch/sacrerouge',
     packages=setuptools.find_packages(),
+    # The registry manifest lets the command line import only the modules it needs
+    package_data={'sacrerouge': ['common/registry_manifest.json']},
     entry_points={'console_scripts': ['sacrerouge=sacrerouge.__main__:main']},
     python_requires='>=3.6',
     install_requires=requirements,